@@ -0,0 +1,45 @@
+"""Business geo band column and nearby-search index
+
+Revision ID: 7c1e9a4b2d3f
+Revises: 480d773a5712
+Create Date: 2026-10-18 10:12:31.504118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e9a4b2d3f"
+down_revision: Union[str, None] = "480d773a5712"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Stored generated column, so existing rows are filled in by Postgres
+    op.add_column(
+        "businesses",
+        sa.Column(
+            "geo_band",
+            sa.Integer(),
+            sa.Computed("floor(location_latitude * 10)::integer", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_businesses_geo_band_longitude",
+        "businesses",
+        ["geo_band", "location_longitude"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_businesses_geo_band_longitude", table_name="businesses")
+    op.drop_column("businesses", "geo_band")
@@ -0,0 +1,90 @@
+"""Move inline display pictures into the blob store
+
+Revision ID: b5d2f0c8a917
+Revises: 7c1e9a4b2d3f
+Create Date: 2026-10-18 13:20:04.118345
+
+"""
+
+import base64
+import binascii
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.blob_store import blob_store
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5d2f0c8a917"
+down_revision: Union[str, None] = "7c1e9a4b2d3f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 200
+
+businesses = sa.table(
+    "businesses",
+    sa.column("id", sa.UUID()),
+    sa.column("display_picture", sa.Text()),
+)
+
+
+def _decode_inline(value: str) -> bytes:
+    """Inline pictures are base64, optionally wrapped in a data: URL."""
+    if value.startswith("data:") and "," in value:
+        value = value.split(",", 1)[1]
+    try:
+        return base64.b64decode(value, validate=True)
+    except binascii.Error:
+        return value.encode()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    connection = op.get_bind()
+    inline = sa.not_(businesses.c.display_picture.regexp_match("^[0-9a-f]{64}$"))
+    while True:
+        rows = connection.execute(
+            sa.select(businesses.c.id, businesses.c.display_picture)
+            .where(inline)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            businesses.update()
+            .where(businesses.c.id == sa.bindparam("row_id"))
+            .values(display_picture=sa.bindparam("digest")),
+            [
+                {
+                    "row_id": row.id,
+                    "digest": (
+                        blob_store.put_bytes(_decode_inline(row.display_picture))
+                        if row.display_picture
+                        else None
+                    ),
+                }
+                for row in rows
+            ],
+        )
+    op.alter_column(
+        "businesses",
+        "display_picture",
+        type_=sa.String(length=64),
+        existing_type=sa.Text(),
+        existing_nullable=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rows keep their blob hashes; the pictures stay in the blob store
+    op.alter_column(
+        "businesses",
+        "display_picture",
+        type_=sa.Text(),
+        existing_type=sa.String(length=64),
+        existing_nullable=True,
+    )
@@ -0,0 +1,56 @@
+"""Cleaner check-ins, partitioned by day
+
+Revision ID: c6f1be9c5bda
+Revises: d8a3c61f0e54
+Create Date: 2026-10-18 14:32:17.402816
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c6f1be9c5bda"
+down_revision: Union[str, None] = "d8a3c61f0e54"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "check_ins",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("checked_in_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("business_id", sa.UUID(), nullable=False),
+        sa.Column("latitude", sa.Float(), nullable=False),
+        sa.Column("longitude", sa.Float(), nullable=False),
+        sa.Column("accuracy_m", sa.Float(), nullable=True),
+        sa.Column("distance_m", sa.Float(), nullable=False),
+        sa.Column("within_geofence", sa.Boolean(), nullable=False),
+        sa.Column("received_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", "checked_in_at"),
+        postgresql_partition_by="RANGE (checked_in_at)",
+    )
+    op.create_index(
+        "ix_check_ins_business_id_checked_in_at",
+        "check_ins",
+        ["business_id", "checked_in_at"],
+    )
+    op.create_index(
+        "ix_check_ins_user_id_checked_in_at",
+        "check_ins",
+        ["user_id", "checked_in_at"],
+    )
+    # Daily partitions are created by the application at startup
+    # (app/services/check_ins.py); this one catches anything outside them
+    op.execute("CREATE TABLE check_ins_default PARTITION OF check_ins DEFAULT")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Drops every partition with it
+    op.drop_table("check_ins")
@@ -0,0 +1,64 @@
+"""Secondary indexes for owner listings, memberships and active users
+
+Revision ID: d8a3c61f0e54
+Revises: b5d2f0c8a917
+Create Date: 2026-10-18 13:41:52.730911
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d8a3c61f0e54"
+down_revision: Union[str, None] = "b5d2f0c8a917"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the tables writable while the indexes build; it
+    # cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_businesses_owner_id_created_at",
+            "businesses",
+            ["owner_id", "created_at", "id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_business_association_business_id",
+            "user_business_association",
+            ["business_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_email_active",
+            "users",
+            ["email"],
+            postgresql_where=sa.text("is_active"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_users_email_active",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_user_business_association_business_id",
+            table_name="user_business_association",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_businesses_owner_id_created_at",
+            table_name="businesses",
+            postgresql_concurrently=True,
+        )
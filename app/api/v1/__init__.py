@@ -1,15 +1,24 @@
 from fastapi import APIRouter
-from app.schemas.users import ReturnUser, Token
-from .auth import invite_user, swagger_login, get_token, refresh_token
+from app.schemas.users import ReturnUser, Token, BatchInviteResult, UserProfile
+from .auth import invite_user, invite_users, swagger_login, get_token, refresh_token
 from .users import get_profile
+from .admin import get_cache_stats, get_redis_stats, get_db_pool_stats, get_job_stats
+from .blobs import upload_blob, get_blob
+from .check_ins import create_check_in
 from .business import (
     create_business,
     get_business,
     get_all_businesses,
+    get_nearby_businesses,
+    import_businesses,
     update_business,
     delete_business,
+    get_business_members,
+    add_member,
+    remove_member,
 )
-from app.schemas.business import BusinessBase
+from app.schemas.business import BusinessBase, NearbyBusiness
+from app.schemas.check_ins import CheckInAccepted
 
 v1router = APIRouter(prefix="/api/v1")
 
@@ -30,6 +39,14 @@ v1router.add_api_route(
     response_model=ReturnUser,
 )
 
+v1router.add_api_route(
+    "/users/batch",
+    endpoint=invite_users,
+    methods=["POST"],
+    tags=["Admin"],
+    response_model=list[BatchInviteResult],
+)
+
 v1router.add_api_route(
     "/token", endpoint=get_token, methods=["POST"], tags=["Auth"], response_model=Token
 )
@@ -41,13 +58,39 @@ v1router.add_api_route(
     response_model=Token,
 )
 
+# Admin
+v1router.add_api_route(
+    "/admin/cache-stats",
+    endpoint=get_cache_stats,
+    methods=["GET"],
+    tags=["Admin"],
+)
+v1router.add_api_route(
+    "/admin/redis-stats",
+    endpoint=get_redis_stats,
+    methods=["GET"],
+    tags=["Admin"],
+)
+v1router.add_api_route(
+    "/admin/db-pool-stats",
+    endpoint=get_db_pool_stats,
+    methods=["GET"],
+    tags=["Admin"],
+)
+v1router.add_api_route(
+    "/admin/job-stats",
+    endpoint=get_job_stats,
+    methods=["GET"],
+    tags=["Admin"],
+)
+
 # Users
 v1router.add_api_route(
     "/profile",
     endpoint=get_profile,
     methods=["GET"],
     tags=["User"],
-    response_model=ReturnUser,
+    response_model=UserProfile,
 )
 
 
@@ -60,6 +103,23 @@ v1router.add_api_route(
     response_model=BusinessBase,
 )
 
+v1router.add_api_route(
+    "/businesses/import",
+    endpoint=import_businesses,
+    methods=["POST"],
+    tags=["Business"],
+    response_model=None,
+)
+
+# Registered before /businesses/{business_id} so "nearby" is not taken as an id
+v1router.add_api_route(
+    "/businesses/nearby",
+    endpoint=get_nearby_businesses,
+    methods=["GET"],
+    tags=["Business"],
+    response_model=list[NearbyBusiness],
+)
+
 v1router.add_api_route(
     "/businesses/{business_id}",
     endpoint=get_business,
@@ -89,3 +149,66 @@ v1router.add_api_route(
     tags=["Business"],
     response_model=None,
 )
+
+v1router.add_api_route(
+    "/businesses/{business_id}/members",
+    endpoint=get_business_members,
+    methods=["GET"],
+    tags=["Business"],
+    response_model=list[ReturnUser],
+)
+v1router.add_api_route(
+    "/businesses/{business_id}/members/{user_id}",
+    endpoint=add_member,
+    methods=["PUT"],
+    tags=["Business"],
+    status_code=204,
+    response_model=None,
+)
+v1router.add_api_route(
+    "/businesses/{business_id}/members/{user_id}",
+    endpoint=remove_member,
+    methods=["DELETE"],
+    tags=["Business"],
+    status_code=204,
+    response_model=None,
+)
+
+v1router.add_api_route(
+    "/businesses/{business_id}/check-ins",
+    endpoint=create_check_in,
+    methods=["POST"],
+    tags=["Business"],
+    status_code=202,
+    response_model=CheckInAccepted,
+)
+
+# Blobs
+v1router.add_api_route(
+    "/blobs",
+    endpoint=upload_blob,
+    methods=["POST"],
+    tags=["Blobs"],
+    # upload_blob parses the body itself, so FastAPI cannot describe it
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
+)
+v1router.add_api_route(
+    "/blobs/{digest}",
+    endpoint=get_blob,
+    methods=["GET"],
+    tags=["Blobs"],
+    response_model=None,
+)
@@ -0,0 +1,83 @@
+from fastapi import Depends
+from starlette.requests import Request
+
+from app.core.cache import redis_pool_metrics
+from app.core.jobs import job_queue
+from app.core.rate_limit import rate_limiter
+from app.db.engine import pool_metrics, server_connection_limits
+from app.db.replica import replica_router
+from app.db.models import User
+from app.services.business_cache import business_cache
+from app.services.business_encoder import business_encoder
+from app.services.check_ins import geofence
+from app.services.membership_cache import membership_cache
+from app.services.principal_cache import principal_cache
+from app.utils.users import is_admin_user
+
+
+async def get_cache_stats(admin_user: User = Depends(is_admin_user)) -> dict:
+    """
+    Hit/miss counters for the in-process caches.
+    Only accessible by admin users.
+    """
+    return {
+        "principal": principal_cache.stats,
+        "business": business_cache.stats,
+        "business_encoded": business_encoder.stats,
+        "membership": membership_cache.stats,
+        "geofence": geofence.stats,
+    }
+
+
+async def get_redis_stats(
+    request: Request, admin_user: User = Depends(is_admin_user)
+) -> dict:
+    """
+    Redis connection pool and health probe metrics, and the auth rate
+    limiter's rejections and in-process fallbacks.
+    Only accessible by admin users.
+    """
+    return {**redis_pool_metrics(request.app), "rate_limit": rate_limiter.stats}
+
+
+async def get_db_pool_stats(
+    request: Request, admin_user: User = Depends(is_admin_user)
+) -> dict:
+    """
+    Database connection pool metrics alongside the server's connection limits,
+    and the read replica's routing state.
+    Only accessible by admin users.
+    """
+    engine = request.app.state.db_engine
+    replica_engine = getattr(request.app.state, "db_replica_engine", None)
+    return {
+        "pool": pool_metrics(engine),
+        "server": await server_connection_limits(engine),
+        "replica": {
+            **replica_router.stats,
+            "pool": pool_metrics(replica_engine) if replica_engine else None,
+        },
+    }
+
+
+async def get_job_stats(
+    dead_letters: int = 10, admin_user: User = Depends(is_admin_user)
+) -> dict:
+    """
+    Depth, outcomes and latency of every background job queue, with its
+    most recent dead-lettered jobs.
+    Only accessible by admin users.
+    """
+    stats = await job_queue.stats()
+    for queue, queue_stats in stats.items():
+        queue_stats["latency"] = queue_stats["latency"].stats
+        queue_stats["dead_letters"] = [
+            {
+                "id": job.id,
+                "name": job.name,
+                "attempts": job.attempts,
+                "error": job.error,
+            }
+            for job in await job_queue.backend.dead_letters(queue, dead_letters)
+        ]
+    return stats
@@ -1,21 +1,34 @@
-from fastapi import Depends, HTTPException
+from fastapi import Body, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.requests import Request
+from starlette.responses import Response
 from typing import Annotated
 from sqlalchemy.ext.asyncio import AsyncSession
-import jwt
 
-from app.schemas.users import Token, UserLogin, CreateUser
-from app.services.auth_services import create_user, authenticate_user, get_user
+from app.schemas.users import (
+    Token,
+    UserLogin,
+    CreateUser,
+    BatchInviteResult,
+    InviteStatus,
+)
+from app.services.auth_services import (
+    create_user,
+    create_users,
+    authenticate_user,
+    get_user,
+)
 from app.utils.auth_utils import create_access_token, create_refresh_token
 from app.utils.users import is_admin_user
 from app.db.models import User
 from app.db.dependencies import get_db_session
 from app.core.config import settings
+from app.core.rate_limit import limit_auth
+from app.core.timing import timed
 from app.core.logger import get_logger
 
 logger = get_logger("auth")
 
-# TODO: Send email notification to the invited user with id, password
 # Todo: Add password reset link
 
 
@@ -29,18 +42,50 @@ async def invite_user(
     except HTTPException:
         created_user = await create_user(user_data.model_dump(), session)
         return created_user
-    logger.warning(f"User with email {user_data.email} already registered")
+    logger.warning("User with email {} already registered", user_data.email)
     raise HTTPException(
         status_code=400, detail=f"User with email {user_data.email} already registered"
     )
 
+
+async def invite_users(
+    users_data: Annotated[
+        list[CreateUser],
+        Body(min_length=1, max_length=settings.USER_INVITE_BATCH_SIZE),
+    ],
+    admin_user: User = Depends(is_admin_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> list[BatchInviteResult]:
+    """
+    Invite several users at once.
+    Reports per email whether the user was created or already registered.
+    """
+    outcomes = await create_users(users_data, session)
+    results = []
+    for email in dict.fromkeys(user_data.email for user_data in users_data):
+        user = outcomes[email]
+        if user is None:
+            logger.warning("User with email {} already registered", email)
+        results.append(
+            BatchInviteResult(
+                email=email,
+                status=InviteStatus.CREATED if user else InviteStatus.EXISTS,
+                user=user,
+            )
+        )
+    return results
+
+
 # Todo: check custom cookie, apply this token in header
 async def swagger_login(
+    request: Request,
+    response: Response,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: AsyncSession = Depends(get_db_session),
 ) -> Token:
+    await limit_auth(request, response, form_data.username)
     user = await authenticate_user(form_data.username, form_data.password, session)
-    logger.info(f"User with email {user.email} signed in successfully")
+    logger.info("User with email {} signed in successfully", user.email)
     return Token(
         **{
             "access_token": create_access_token(user),
@@ -50,9 +95,16 @@ async def swagger_login(
     )
 
 
-async def get_token(data: UserLogin, session: AsyncSession = Depends(get_db_session)):
+async def get_token(
+    request: Request,
+    response: Response,
+    data: UserLogin,
+    session: AsyncSession = Depends(get_db_session),
+):
+    # Before anything touches the database or the hashing pool
+    await limit_auth(request, response, data.email)
     user = await authenticate_user(data.email, data.password, session)
-    logger.info(f"User with email {user.email} signed in successfully")
+    logger.info("User with email {} signed in successfully", user.email)
     return {
         "access_token": create_access_token(user),
         "refresh_token": create_refresh_token(user),
@@ -60,20 +112,28 @@ async def get_token(data: UserLogin, session: AsyncSession = Depends(get_db_sess
 
 
 async def refresh_token(
-    refresh_token: str, session: AsyncSession = Depends(get_db_session)
+    request: Request,
+    response: Response,
+    refresh_token: str,
+    session: AsyncSession = Depends(get_db_session),
 ):
+    await limit_auth(request, response)
+
+    import jwt
+
     try:
-        payload = jwt.decode(
-            refresh_token,
-            settings.SECRET_KEY.get_secret_value(),
-            algorithms=[settings.ALGORITHM],
-        )
+        with timed("jwt"):
+            payload = jwt.decode(
+                refresh_token,
+                settings.SECRET_KEY.get_secret_value(),
+                algorithms=[settings.ALGORITHM],
+            )
         email: str = payload.get("email")
     except jwt.ExpiredSignatureError as e:
-        logger.debug(f"Refresh Token Expired: {str(e)}")
+        logger.debug("Refresh Token Expired: {}", e)
         raise HTTPException(detail="Refresh Token Expired", status_code=400)
     except Exception as e:
-        logger.debug(f"Unable to refresh token: {str(e)}")
+        logger.debug("Unable to refresh token: {}", e)
         raise HTTPException(detail="Invalid Refresh Token", status_code=400)
 
     user = await get_user(email, session)
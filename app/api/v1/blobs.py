@@ -0,0 +1,183 @@
+from collections.abc import AsyncGenerator
+
+from fastapi import Depends, HTTPException, Path, Query
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.db.models import User
+from app.schemas.business import BLOB_HASH_PATTERN
+from app.services.blob_store import (
+    BlobTooLarge,
+    ImageTooLarge,
+    blob_store,
+    sniff_media_type,
+)
+from app.utils.users import get_current_user
+
+logger = get_logger("blobs")
+
+# Enough of a file to tell its type by (see sniff_media_type)
+SNIFF_BYTES = 12
+# Allowance for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+UPLOAD_FIELD = "file"
+
+
+def _multipart_boundary(request: Request) -> bytes:
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise HTTPException(
+            status_code=422, detail="Expected a multipart/form-data body"
+        )
+    return params[b"boundary"]
+
+
+async def _file_chunks(request: Request, field: str) -> AsyncGenerator[bytes, None]:
+    """
+    The data of the multipart part named ``field``, as the body arrives.
+
+    The body is parsed as it is received rather than spooled first, so an
+    oversized upload is refused once BLOB_MAX_BYTES (plus the multipart
+    framing) has been read, not after all of it. Other parts are skipped.
+    """
+    max_body = settings.BLOB_MAX_BYTES + MULTIPART_OVERHEAD
+    data: list[bytes] = []
+    headers: dict[bytes, bytes] = {}
+    name, value = bytearray(), bytearray()
+    in_file = found = False
+
+    def on_part_begin() -> None:
+        nonlocal in_file
+        headers.clear()
+        in_file = False
+
+    def on_header_field(chunk: bytes, start: int, end: int) -> None:
+        name.extend(chunk[start:end])
+
+    def on_header_value(chunk: bytes, start: int, end: int) -> None:
+        value.extend(chunk[start:end])
+
+    def on_header_end() -> None:
+        headers[bytes(name).lower()] = bytes(value)
+        name.clear()
+        value.clear()
+
+    def on_headers_finished() -> None:
+        nonlocal in_file, found
+        _, params = parse_options_header(headers.get(b"content-disposition", b""))
+        # Only the first part with the name is the file
+        in_file = not found and params.get(b"name") == field.encode()
+        found = found or in_file
+
+    def on_part_data(chunk: bytes, start: int, end: int) -> None:
+        if in_file:
+            data.append(chunk[start:end])
+
+    parser = MultipartParser(
+        _multipart_boundary(request),
+        callbacks={
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+        },
+    )
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_body:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Blob exceeds {settings.BLOB_MAX_BYTES} bytes",
+                )
+            parser.write(chunk)
+            if data:
+                yield b"".join(data)
+                data.clear()
+        parser.finalize()
+    except MultipartParseError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+    if not found:
+        raise HTTPException(status_code=422, detail=f"No {field} part in the body")
+
+
+async def upload_blob(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """
+    Upload an image (PNG, JPEG, GIF or WebP) to the blob store, as the
+    ``file`` part of a multipart/form-data body.
+    The returned hash is what business display_picture fields refer to.
+    """
+    content_length = request.headers.get("content-length", "")
+    if (
+        content_length.isdigit()
+        and int(content_length) > settings.BLOB_MAX_BYTES + MULTIPART_OVERHEAD
+    ):
+        raise HTTPException(
+            status_code=413, detail=f"Blob exceeds {settings.BLOB_MAX_BYTES} bytes"
+        )
+
+    chunks = _file_chunks(request, UPLOAD_FIELD)
+    head = b""
+    async for chunk in chunks:
+        head += chunk
+        if len(head) >= SNIFF_BYTES:
+            break
+    if sniff_media_type(head) is None:
+        await chunks.aclose()
+        raise HTTPException(status_code=415, detail="Unsupported image type")
+
+    async def file_chunks() -> AsyncGenerator[bytes, None]:
+        yield head
+        async for chunk in chunks:
+            yield chunk
+
+    try:
+        digest = await blob_store.save(file_chunks())
+    except BlobTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    logger.info("Blob {} uploaded by {}", digest, current_user.email)
+    return {"hash": digest, "url": f"/api/v1/blobs/{digest}"}
+
+
+async def get_blob(
+    request: Request,
+    digest: str = Path(pattern=BLOB_HASH_PATTERN),
+    size: int | None = Query(None, description="Thumbnail size in pixels"),
+) -> Response:
+    """
+    Download a blob, or a thumbnail of it when size is given.
+    Supports If-None-Match and Range requests.
+    """
+    if not blob_store.exists(digest):
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    if size is None:
+        path, etag = blob_store.path(digest), f'"{digest}"'
+    elif size in settings.BLOB_THUMBNAIL_SIZES:
+        try:
+            path = await blob_store.thumbnail(digest, size)
+        except ImageTooLarge as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        etag = f'"{digest}-{size}"'
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail=f"size must be one of {settings.BLOB_THUMBNAIL_SIZES}",
+        )
+
+    # Content never changes for a given hash
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=blob_store.media_type(path), headers=headers)
@@ -1,116 +1,325 @@
-from fastapi import Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+import base64
+import tempfile
+from collections.abc import AsyncGenerator, Iterator
+from datetime import datetime
+from functools import partial
+from uuid import UUID
+
+import orjson
+from fastapi import Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.future import select
+from starlette.requests import Request
+from starlette.responses import Response
 
 from app.schemas.business import BusinessBase
 from app.db.models import User, Business
-from app.db.dependencies import get_db_session
+from app.db.replica import replica_router
+from app.db.dependencies import (
+    get_db_session,
+    get_read_session,
+    get_read_session_factory,
+)
+from app.core.conditional import conditional_response, pack, unpack
+from app.core.config import settings
 from app.core.logger import get_logger
-from app.utils.users import is_admin_user
+from app.services.business_cache import business_cache, business_key, owner_key
+from app.services.business_encoder import (
+    JSON_MEDIA_TYPE,
+    business_encoder,
+    encode_nearby,
+)
+from app.services.business_import import (
+    CSV_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    BusinessImporter,
+)
+from app.services.business_services import (
+    add_business_member,
+    business_exists,
+    business_members,
+    delete_owned_business,
+    insert_business,
+    load_business_payload,
+    owns_business,
+    remove_business_member,
+    update_owned_business,
+)
+from app.services.check_ins import geofence
+from app.services.geo_services import find_nearby_businesses, find_nearest_businesses
+from app.services.membership_cache import membership_cache
+from app.services.principal_cache import principal_cache
+from app.utils.users import get_business_member, get_current_user, is_admin_user
 
 logger = get_logger("business")
 
 
+def _encode_cursor(row) -> str:
+    return base64.urlsafe_b64encode(
+        orjson.dumps([row.created_at.isoformat(), str(row.id)])
+    ).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        created_at, business_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(created_at), UUID(business_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _owner_businesses_query(owner_id, after: tuple[datetime, UUID] | None = None):
+    # Plain rows rather than ORM entities keep the identity map out of the way
+    query = (
+        select(Business.__table__)
+        .where(Business.owner_id == owner_id)
+        .order_by(Business.created_at, Business.id)
+    )
+    if after is not None:
+        query = query.where(tuple_(Business.created_at, Business.id) > after)
+    return query
+
+
+async def _load_owner_page(
+    session_factory: async_sessionmaker,
+    owner_id,
+    limit: int,
+    after: tuple[datetime, UUID] | None,
+) -> bytes:
+    async with session_factory() as session:
+        result = await session.execute(
+            _owner_businesses_query(owner_id, after).limit(limit + 1)
+        )
+        rows = result.all()
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else "-"
+    # No Last-Modified: a deleted business leaves no trace in the remaining
+    # rows' updated_at, and the time the page was built is only as fine as
+    # an HTTP date, so a page evicted and rebuilt within the same second
+    # would wrongly answer If-Modified-Since with a 304. The ETag covers it.
+    return pack(
+        business_encoder.encode_list(rows[:limit]),
+        None,
+        str(min(len(rows), limit)),
+        next_cursor,
+    )
+
+
+async def _stream_owner_businesses(
+    session_factory: async_sessionmaker, owner_id
+) -> AsyncGenerator[bytes, None]:
+    async with session_factory() as session:
+        result = await session.stream(
+            _owner_businesses_query(owner_id).execution_options(
+                yield_per=settings.BUSINESS_STREAM_BATCH_SIZE
+            )
+        )
+        async for rows in result.partitions():
+            yield business_encoder.encode_lines(rows)
+
+
 async def create_business(
     business_data: BusinessBase,
     admin_user: User = Depends(is_admin_user),
     session: AsyncSession = Depends(get_db_session),
-) -> Business:
+) -> Response:
     """
     Create a new business.
     Only accessible by admin users.
     """
-    query = select(Business).where(Business.name == business_data.name)
-
-    existing_business = await session.execute(query)
-    if existing_business.scalar_one_or_none():
-        logger.warning(f"Business with name {business_data.name} already exists")
+    business_data.owner_id = admin_user.id
+    new_business = await insert_business(session, business_data.to_model_fields())
+    if not new_business:
+        logger.warning("Business with name {} already exists", business_data.name)
         raise HTTPException(
             status_code=400,
             detail=f"Business with name {business_data.name} already exists",
         )
-    business_data.owner_id = admin_user.id
-
-    new_business = Business(**business_data.model_dump())
-    session.add(new_business)
     await session.commit()
+    await business_cache.invalidate(owner_key(admin_user.id))
+
+    logger.info("Business {} created successfully", new_business.name)
+    return Response(business_encoder.encode(new_business), media_type=JSON_MEDIA_TYPE)
 
-    logger.info(f"Business {new_business.name} created successfully")
-    return new_business
+
+async def import_businesses(
+    request: Request,
+    admin_user: User = Depends(is_admin_user),
+) -> StreamingResponse:
+    """
+    Bulk-create businesses from a streamed CSV (text/csv, with a header
+    row) or NDJSON (application/x-ndjson) body.
+    Responds with an NDJSON line per row (created, duplicate or invalid)
+    followed by a summary line.
+    Only accessible by admin users.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type not in (CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Expected {CSV_MEDIA_TYPE} or {NDJSON_MEDIA_TYPE} body",
+        )
+    importer = BusinessImporter(request.app.state.db_session_factory, admin_user.id)
+
+    # The body is consumed before responding; the report is spooled to disk
+    # past 1 MB so memory stays flat however large the upload is.
+    report = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        async for chunk in importer.run(request.stream(), media_type):
+            report.write(chunk)
+    finally:
+        await business_cache.invalidate(owner_key(admin_user.id))
+        # Writes went through the importer's own sessions, not get_db_session
+        await replica_router.record_write(admin_user.id)
+    report.seek(0)
+
+    def read_report() -> Iterator[bytes]:
+        with report:
+            yield from iter(partial(report.read, 64 * 1024), b"")
+
+    return StreamingResponse(read_report(), media_type=NDJSON_MEDIA_TYPE)
 
 
 async def get_business(
-    business_id: str,
-    session: AsyncSession = Depends(get_db_session),
-) -> BusinessBase:
+    request: Request,
+    business_id: UUID,
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+) -> Response:
     """
     Retrieve a business by its ID.
+    The cached JSON is sent as is, without being parsed or validated again,
+    or not at all when If-None-Match / If-Modified-Since show the client
+    has it already.
     """
-    query = select(Business).where(Business.id == business_id)
-    result = await session.execute(query)
-    business = result.scalar_one_or_none()
+    payload = await business_cache.get(
+        business_key(business_id),
+        partial(load_business_payload, session_factory, business_id),
+    )
 
-    if not business:
-        logger.error(f"Business with ID {business_id} not found")
+    if not payload:
+        logger.error("Business with ID {} not found", business_id)
         raise HTTPException(status_code=404, detail="Business not found")
 
-    logger.info(f"Business {business.name} retrieved successfully")
-    return BusinessBase.model_validate(business)
+    etag, modified, _, body = unpack(payload)
+    logger.info("Business {} retrieved successfully", business_id)
+    return conditional_response(request, body, etag, modified, JSON_MEDIA_TYPE)
 
 
 async def get_all_businesses(
-    session: AsyncSession = Depends(get_db_session),
+    request: Request,
+    limit: int = Query(
+        settings.BUSINESS_PAGE_SIZE, ge=1, le=settings.BUSINESS_MAX_PAGE_SIZE
+    ),
+    cursor: str | None = None,
     admin_user: User = Depends(is_admin_user),
-) -> list[BusinessBase]:
+    session_factory: async_sessionmaker = Depends(get_read_session_factory),
+) -> Response:
     """
-    Retrieve all businesses.
+    Retrieve the admin's businesses one page at a time, oldest first.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    Pages carry an ETag, and are answered with a 304 when the client's copy
+    is current.
+    Clients sending ``Accept: application/x-ndjson`` get every business
+    streamed as newline-delimited JSON instead.
     """
-    query = select(Business).where(Business.owner_id == admin_user.id)
-    result = await session.execute(query)
-    businesses = result.scalars().all()
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_owner_businesses(session_factory, admin_user.id),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
 
-    if not businesses:
+    after = _decode_cursor(cursor) if cursor else None
+    load = partial(_load_owner_page, session_factory, admin_user.id, limit, after)
+    # Only the default first page is cached; it is what clients poll
+    if after is None and limit == settings.BUSINESS_PAGE_SIZE:
+        payload = await business_cache.get(owner_key(admin_user.id), load)
+    else:
+        payload = await load()
+    etag, modified, (count, next_cursor), body = unpack(payload)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor != "-" else None
+
+    if count == "0":
         logger.warning("No businesses found")
-        return []
+    else:
+        logger.info("Retrieved {} businesses successfully", count)
+    return conditional_response(
+        request,
+        body,
+        etag,
+        modified,
+        JSON_MEDIA_TYPE,
+        headers=headers,
+        cache_control="private, no-cache",
+    )
+
 
-    logger.info(f"Retrieved {len(businesses)} businesses successfully")
-    return [BusinessBase.model_validate(business) for business in businesses]
+async def get_nearby_businesses(
+    latitude: float = Query(ge=-90, le=90),
+    longitude: float = Query(ge=-180, le=180),
+    radius_m: float | None = Query(None, gt=0, le=settings.NEARBY_MAX_RADIUS_M),
+    limit: int = Query(20, ge=1, le=settings.NEARBY_MAX_RESULTS),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    """
+    Businesses near a point, nearest first.
+    With radius_m, returns up to ``limit`` businesses inside that radius;
+    without it, returns the ``limit`` nearest businesses.
+    """
+    if radius_m is not None:
+        rows = await find_nearby_businesses(
+            session, latitude, longitude, radius_m, limit
+        )
+    else:
+        rows = await find_nearest_businesses(
+            session,
+            latitude,
+            longitude,
+            limit,
+            initial_radius_m=settings.NEARBY_INITIAL_RADIUS_M,
+            max_radius_m=settings.NEARBY_MAX_RADIUS_M,
+        )
+    return Response(encode_nearby(rows), media_type=JSON_MEDIA_TYPE)
 
 
 async def update_business(
-    business_id: str,
+    business_id: UUID,
     business_data: BusinessBase,
     admin_user: User = Depends(is_admin_user),
     session: AsyncSession = Depends(get_db_session),
-) -> Business:
+) -> Response:
     """
     Update an existing business.
     Only accessible by admin users.
     """
-    query = select(Business).where(Business.id == business_id)
-    result = await session.execute(query)
-    business = result.scalar_one_or_none()
-
-    if not business:
-        logger.error(f"Business with ID {business_id} not found")
-        raise HTTPException(status_code=404, detail="Business not found")
-
-    if business.owner_id != admin_user.id:
-        logger.error("Unauthorized attempt to update business")
+    try:
+        business = await update_owned_business(
+            session,
+            business_id,
+            admin_user.id,
+            business_data.to_model_fields(exclude={"owner_id"}),
+        )
+    except IntegrityError:
+        logger.warning("Business with name {} already exists", business_data.name)
         raise HTTPException(
-            status_code=403, detail="Not authorized to update this business"
+            status_code=400,
+            detail=f"Business with name {business_data.name} already exists",
         )
 
-    for key, value in business_data.model_dump().items():
-        setattr(business, key, value)
+    if not business:
+        await _raise_not_found_or_forbidden(session, business_id, "update")
 
     await session.commit()
-    logger.info(f"Business {business.name} updated successfully")
-    return business
+    await business_cache.invalidate(business_key(business_id), owner_key(admin_user.id))
+    await geofence.invalidate(business_id)
+    logger.info("Business {} updated successfully", business.name)
+    return Response(business_encoder.encode(business), media_type=JSON_MEDIA_TYPE)
 
 
 async def delete_business(
-    business_id: str,
+    business_id: UUID,
     admin_user: User = Depends(is_admin_user),
     session: AsyncSession = Depends(get_db_session),
 ) -> None:
@@ -118,21 +327,85 @@ async def delete_business(
     Delete a business.
     Only accessible by admin users.
     """
-    query = select(Business).where(Business.id == business_id)
-    result = await session.execute(query)
-    business = result.scalar_one_or_none()
+    business = await delete_owned_business(session, business_id, admin_user.id)
 
     if not business:
-        logger.error(f"Business with ID {business_id} not found")
-        raise HTTPException(status_code=404, detail="Business not found")
+        await _raise_not_found_or_forbidden(session, business_id, "delete")
+
+    await session.commit()
+    await business_cache.invalidate(business_key(business_id), owner_key(admin_user.id))
+    await geofence.invalidate(business_id)
+
+    logger.info("Business {} deleted successfully", business.name)
+
+
+async def get_business_members(
+    business_id: UUID,
+    current_user: User = Depends(get_business_member),
+    session: AsyncSession = Depends(get_read_session),
+) -> list:
+    """
+    The users assigned to a business.
+    Accessible by admin users and by the business's own members.
+    """
+    return await business_members(session, business_id)
 
-    if business.owner_id != admin_user.id:
-        logger.error("Unauthorized attempt to delete business")
+
+async def add_member(
+    business_id: UUID,
+    user_id: UUID,
+    admin_user: User = Depends(is_admin_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> None:
+    """
+    Assign a user to a business; assigning them again does nothing.
+    Only accessible by the admin who owns the business.
+    """
+    if not await owns_business(session, business_id, admin_user.id):
+        await _raise_not_found_or_forbidden(session, business_id, "update")
+    try:
+        added = await add_business_member(session, business_id, user_id)
+    except IntegrityError:
+        logger.warning("User {} not found", user_id)
+        raise HTTPException(status_code=404, detail="User not found")
+    await session.commit()
+    if added:
+        await membership_cache.invalidate(user_id)
+        await principal_cache.invalidate(user_id)
+        logger.info("User {} assigned to business {}", user_id, business_id)
+
+
+async def remove_member(
+    business_id: UUID,
+    user_id: UUID,
+    admin_user: User = Depends(is_admin_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> None:
+    """
+    Unassign a user from a business.
+    Only accessible by the admin who owns the business.
+    """
+    if not await owns_business(session, business_id, admin_user.id):
+        await _raise_not_found_or_forbidden(session, business_id, "update")
+    if not await remove_business_member(session, business_id, user_id):
         raise HTTPException(
-            status_code=403, detail="Not authorized to delete this business"
+            status_code=404, detail="User is not assigned to this business"
         )
-
-    await session.delete(business)
     await session.commit()
+    await membership_cache.invalidate(user_id)
+    await principal_cache.invalidate(user_id)
+    logger.info("User {} removed from business {}", user_id, business_id)
+
 
-    logger.info(f"Business {business.name} deleted successfully")
+async def _raise_not_found_or_forbidden(
+    session: AsyncSession, business_id: UUID, action: str
+) -> None:
+    # Only reached when the write matched no row, so the happy path stays at
+    # one statement
+    if not await business_exists(session, business_id):
+        logger.error("Business with ID {} not found", business_id)
+        raise HTTPException(status_code=404, detail="Business not found")
+    logger.error("Unauthorized attempt to {} business", action)
+    raise HTTPException(
+        status_code=403, detail=f"Not authorized to {action} this business"
+    )
@@ -0,0 +1,56 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Depends, HTTPException
+
+from app.core.config import settings
+from app.db.models import User
+from app.schemas.check_ins import CreateCheckIn
+from app.services.check_ins import check_in_buffer
+from app.utils.users import get_business_member
+
+
+async def create_check_in(
+    business_id: uuid.UUID,
+    check_in: CreateCheckIn,
+    current_user: User = Depends(get_business_member),
+) -> dict:
+    """
+    Record that the current user is at a business.
+    The check-in is stored shortly afterwards, in a batch, with its distance
+    from the business and whether that is inside the geofence.
+    Accessible by admin users and by the business's own members.
+    """
+    received_at = datetime.now(timezone.utc)
+    checked_in_at = check_in.checked_in_at or received_at
+    if checked_in_at > received_at + timedelta(
+        seconds=settings.CHECK_IN_MAX_CLOCK_SKEW_SECONDS
+    ):
+        raise HTTPException(status_code=422, detail="checked_in_at is in the future")
+    if checked_in_at < received_at - timedelta(days=settings.CHECK_IN_MAX_AGE_DAYS):
+        raise HTTPException(
+            status_code=422,
+            detail=f"checked_in_at is more than {settings.CHECK_IN_MAX_AGE_DAYS} days ago",
+        )
+
+    check_in_id = uuid.uuid4()
+    if not check_in_buffer.add(
+        (
+            check_in_id,
+            checked_in_at,
+            current_user.id,
+            business_id,
+            check_in.latitude,
+            check_in.longitude,
+            check_in.accuracy_m,
+            received_at,
+        )
+    ):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many check-ins waiting to be stored",
+            headers={
+                "Retry-After": str(max(1, round(settings.CHECK_IN_FLUSH_SECONDS)))
+            },
+        )
+    return {"id": check_in_id, "checked_in_at": checked_in_at}
@@ -1,14 +1,62 @@
 from fastapi import Depends
+from starlette.requests import Request
+from starlette.responses import Response
 
 from app.utils.users import get_current_user
 from app.db.models import User
+from app.core.conditional import (
+    conditional_response,
+    not_modified_response,
+    strong_etag,
+)
 from app.core.logger import get_logger
+from app.schemas.users import MemberBusiness, ReturnUser, UserProfile
+from app.services.auth_services import get_active_user_with_businesses
+from app.services.business_services import member_business_versions
 
 logger = get_logger("users")
 
 
-# Todo: get assigned businesses
 async def get_profile(
+    request: Request,
     current_user: User = Depends(get_current_user),
-) -> User:
-    return current_user
+) -> Response:
+    """
+    The signed-in user's profile and the businesses they are assigned to,
+    with an ETag and Last-Modified; answered with a 304 when the client's
+    copy is current.
+
+    The validators are the user's updated_at, which assignments touch, and
+    the id and updated_at of each assigned business, read in one query; a
+    304 is sent before the profile is loaded or serialized.
+    """
+    # The primary rather than the replica, so a new assignment shows at once
+    async with request.app.state.db_read_session_factory() as session:
+        versions = await member_business_versions(session, current_user.id)
+        validators = [str(current_user.id), current_user.updated_at.isoformat()]
+        validators += [f"{id_}={at.isoformat()}" for id_, at in versions]
+        etag = strong_etag(" ".join(validators).encode())
+        modified = max([current_user.updated_at, *(at for _, at in versions)])
+        cache_control = "private, no-cache"
+        not_modified = not_modified_response(
+            request, etag, modified, cache_control=cache_control
+        )
+        if not_modified is not None:
+            return not_modified
+        user = await get_active_user_with_businesses(current_user.id, session)
+    businesses = sorted(
+        (membership.business for membership in user.businesses),
+        key=lambda business: business.name,
+    )
+    profile = UserProfile(
+        **ReturnUser.model_validate(user).model_dump(),
+        businesses=[MemberBusiness.model_validate(b) for b in businesses],
+    )
+    return conditional_response(
+        request,
+        profile.model_dump_json().encode(),
+        etag,
+        modified,
+        "application/json",
+        cache_control=cache_control,
+    )
@@ -0,0 +1,52 @@
+"""
+One-time data bootstrap, safe to run any number of times.
+
+Creates the admin user if it does not exist. Run it as a deploy step
+(e.g. Render's pre-deploy command, after ``alembic upgrade head``) and set
+``BOOTSTRAP_ON_STARTUP=false`` so the API skips it on every start:
+
+    python -m app.bootstrap
+"""
+
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.engine import build_engine, ssl_context
+from app.db.models import User
+from app.schemas.users import UserRole
+
+
+async def create_admin_user_if_not_exists(session: AsyncSession) -> None:
+    result = await session.execute(
+        select(User).where(User.email == "admin@complycenter.com")
+    )
+    admin_user = result.scalar_one_or_none()
+
+    if not admin_user:
+        admin = User(
+            email="admin@complycenter.com",
+            full_name="admin",
+            password=User.hash_password("AdminPassword123!"),
+            user_role=UserRole.ADMIN,
+        )
+        session.add(admin)
+        await session.commit()
+        print("✅ Admin user created")
+    else:
+        print("ℹ️ Admin user already exists")
+
+
+async def main() -> None:
+    engine = build_engine(str(settings.db_url), connect_args={"ssl": ssl_context()})
+    try:
+        async with async_sessionmaker(engine)() as session:
+            await create_admin_user_if_not_exists(session)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
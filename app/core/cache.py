@@ -1,39 +1,115 @@
-import redis
-from redis.exceptions import RedisError, ConnectionError, AuthenticationError
-from fastapi import HTTPException
-from core.logger import get_logger
-from core.config import settings
+import asyncio
+import time
+
+from fastapi import FastAPI, HTTPException
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.utils import HIREDIS_AVAILABLE
+from starlette.requests import Request
+
+from app.core.logger import get_logger
+from app.core.config import settings
 
 logger = get_logger("redis")
 
 
-def get_redis():
+class RedisHealth:
+    """Result of the most recent background probe."""
+
+    def __init__(self):
+        self.healthy = False
+        self.last_ping_ms: float | None = None
+        self.last_checked: float | None = None
+        self.failures = 0
+
+
+def _setup_redis(app: FastAPI) -> None:
     """
-    FastAPI dependency to provide a Redis connection.
-    Yields a Redis client and ensures proper cleanup.
+    Creates the application-wide Redis connection pool.
+
+    Connections are opened lazily, so this does not touch the network. The
+    parser is hiredis whenever it is installed.
+
+    :param app: fastAPI application.
     """
+    pool = BlockingConnectionPool(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=(
+            settings.REDIS_PASSWORD.get_secret_value()
+            if settings.REDIS_PASSWORD
+            else None
+        ),
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        decode_responses=True,
+    )
+    app.state.redis_pool = pool
+    app.state.redis = Redis(connection_pool=pool)
+    app.state.redis_health = RedisHealth()
+    app.state.redis_probe = asyncio.create_task(_probe_redis(app))
+    logger.debug("Redis pool created (hiredis={})", HIREDIS_AVAILABLE)
+
+
+async def _probe_redis(app: FastAPI) -> None:
+    """Ping Redis periodically so requests never have to."""
+    health: RedisHealth = app.state.redis_health
+    while True:
+        start = time.perf_counter()
+        try:
+            await app.state.redis.ping()
+        except Exception as e:
+            # Not just RedisError: anything escaping here (an OSError, the
+            # pool's TimeoutError) would end the probe and freeze the health
+            # state for good. Cancellation is a BaseException and still stops it.
+            if health.healthy or health.failures == 0:
+                logger.error("Redis health check failed: {!r}", e)
+            health.healthy = False
+            health.failures += 1
+        else:
+            if not health.healthy:
+                logger.info("Redis connection healthy")
+            health.healthy = True
+            health.failures = 0
+            health.last_ping_ms = (time.perf_counter() - start) * 1000
+        health.last_checked = time.time()
+        await asyncio.sleep(settings.REDIS_HEALTH_CHECK_INTERVAL)
+
+
+async def _shutdown_redis(app: FastAPI) -> None:
+    app.state.redis_probe.cancel()
     try:
-        r = redis.Redis(
-            host=settings.REDIS_HOST, port=settings.REDIS_PORT, decode_responses=True
-        )
-        # Test connection
-        r.ping()
-        logger.debug("Redis connection established")
-        yield r
-    except ConnectionError as e:
-        logger.error(f"Redis connection error: {str(e)}")
+        await app.state.redis_probe
+    except asyncio.CancelledError:
+        pass
+    await app.state.redis.aclose()
+    await app.state.redis_pool.aclose()
+
+
+def redis_pool_metrics(app: FastAPI) -> dict:
+    pool: BlockingConnectionPool = app.state.redis_pool
+    health: RedisHealth = app.state.redis_health
+    return {
+        "max_connections": pool.max_connections,
+        "in_use": len(pool._in_use_connections),
+        "idle": len(pool._available_connections),
+        "healthy": health.healthy,
+        "last_ping_ms": health.last_ping_ms,
+        "last_checked": health.last_checked,
+        "consecutive_failures": health.failures,
+        "hiredis": HIREDIS_AVAILABLE,
+    }
+
+
+def get_redis(request: Request) -> Redis:
+    """
+    FastAPI dependency to provide the pooled Redis client.
+    Fails fast with 503 while the background probe reports Redis as down.
+    """
+    if not request.app.state.redis_health.healthy:
         raise HTTPException(
             status_code=503, detail="Redis unavailable, please try again later"
         )
-    except AuthenticationError as e:
-        logger.error(f"Redis authentication error: {str(e)}")
-        raise HTTPException(status_code=401, detail="Redis authentication failed")
-    except RedisError as e:
-        logger.error(f"Unexpected Redis error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        try:
-            r.close()
-            logger.debug("Redis connection closed")
-        except Exception as e:
-            logger.warning(f"Error closing Redis connection: {str(e)}")
+    return request.app.state.redis
@@ -0,0 +1,122 @@
+import hashlib
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def strong_etag(body: bytes) -> str:
+    """ETag of the exact bytes sent, so equal tags mean identical bodies."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def pack(body: bytes, modified: float | None, *fields: str) -> bytes:
+    """
+    Prefix a response body with its ETag, modification time (epoch seconds,
+    or None for none) and any extra space-free fields, for caching.
+
+    A cached payload can then be answered with a 304 or sent as is without
+    parsing or hashing it again.
+    """
+    stamp = "-" if modified is None else str(int(modified))
+    header = " ".join((strong_etag(body), stamp, *fields))
+    return header.encode() + b"\n" + body
+
+
+def unpack(payload: str | bytes) -> tuple[str, int | None, list[str], bytes]:
+    """Split a payload made by pack() into (etag, modified, fields, body)."""
+    if isinstance(payload, str):
+        payload = payload.encode()
+    header, _, body = payload.partition(b"\n")
+    etag, modified, *fields = header.decode().split(" ")
+    return etag, None if modified == "-" else int(modified), fields, body
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, modified: int | None) -> bool:
+    """
+    Whether the client's cached copy is current (RFC 9110 section 13).
+
+    If-None-Match wins when both validators are sent; If-Modified-Since is
+    compared at one-second resolution, that of HTTP dates.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(etag, if_none_match)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return modified <= since.timestamp()
+
+
+def _validators(
+    etag: str,
+    modified: int | float | datetime | None,
+    headers: dict[str, str] | None,
+    cache_control: str,
+) -> tuple[dict[str, str], int | None]:
+    if isinstance(modified, datetime):
+        modified = modified.timestamp()
+    if modified is not None:
+        modified = int(modified)
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": cache_control}
+    if modified is not None:
+        headers["Last-Modified"] = formatdate(modified, usegmt=True)
+    return headers, modified
+
+
+def not_modified_response(
+    request: Request,
+    etag: str,
+    modified: int | float | datetime | None,
+    headers: dict[str, str] | None = None,
+    cache_control: str = "no-cache",
+) -> Response | None:
+    """
+    An empty 304 when the client's validators show it has the current
+    representation, else None.
+
+    For routes whose validators cost less than their body: check this first
+    and only build the body when it returns None.
+    """
+    headers, modified = _validators(etag, modified, headers, cache_control)
+    if is_not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    modified: int | float | datetime | None,
+    media_type: str,
+    headers: dict[str, str] | None = None,
+    cache_control: str = "no-cache",
+) -> Response:
+    """
+    The body with ETag and Last-Modified, or an empty 304 when the client's
+    validators show it already has it.
+
+    ``no-cache`` lets clients keep the response but makes them revalidate
+    before every use, which is what polling clients want.
+    """
+    headers, modified = _validators(etag, modified, headers, cache_control)
+    if is_not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
@@ -1,8 +1,8 @@
+from functools import cached_property
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import SecretStr
 from yarl import URL
-import pytz
-from passlib.context import CryptContext
 
 
 class Settings(BaseSettings):
@@ -13,19 +13,206 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_HOST: str = "complycenter-database"
     POSTGRES_PORT: int = 5432
+    # TLS with the bundled CA; turn off for a local database without TLS
+    POSTGRES_SSL: bool = True
     DB_ECHO: bool = False
+    # Connection pool, per worker process: size it so that
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays under max_connections
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds a request waits for a free connection before failing
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Prepared statements kept per connection; 0 when behind PgBouncer
+    DB_STATEMENT_CACHE_SIZE: int = 500
+    DB_STATEMENT_CACHE_LIFETIME: int = 300
+    DB_COMMAND_TIMEOUT: float = 30.0
+
+    # Optional streaming replica serving read-only routes; same credentials
+    POSTGRES_REPLICA_HOST: str | None = None
+    POSTGRES_REPLICA_PORT: int | None = None
+    # Reads stay on the primary this long after a user's write
+    REPLICA_STICKY_SECONDS: float = 5.0
+    # Replica lag above which reads fall back to the primary
+    REPLICA_MAX_LAG_SECONDS: float = 2.0
+    REPLICA_LAG_CHECK_INTERVAL: float = 1.0
 
     SECRET_KEY: SecretStr = SecretStr("default-secret-key")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_DAYS: int = 7
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
 
+    # Create the admin user while starting up. Turn off once
+    # ``python -m app.bootstrap`` runs as a deploy step, so restarts and new
+    # instances skip the lookup (and the password hash on a fresh database)
+    BOOTSTRAP_ON_STARTUP: bool = True
+    # Connections opened concurrently with the rest of startup; 0 disables
+    DB_POOL_WARMUP_CONNECTIONS: int = 4
+    # Spawn the password hashing workers during startup
+    PASSWORD_HASHING_WARMUP: bool = True
+
+    # Production launcher (python -m app.serve)
+    SERVER_HOST: str = "0.0.0.0"
+    # Overridden by $PORT when the platform sets it
+    SERVER_PORT: int = 8000
+    # Worker processes; 0 starts one per available CPU
+    SERVER_WORKERS: int = 0
+    # Requests after which a worker is replaced, plus up to the jitter more
+    # per worker so they are not all replaced at once; 0 never replaces them
+    SERVER_MAX_REQUESTS: int = 10_000
+    SERVER_MAX_REQUESTS_JITTER: int = 1_000
+    # Seconds in-flight requests get to finish when a worker stops
+    SERVER_GRACEFUL_TIMEOUT: float = 30
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    # Proxies trusted for X-Forwarded-For/-Proto; the auth rate limiter keys
+    # on the client address, so list the load balancer's addresses here
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # Background jobs (app.core.jobs): "redis", or "memory" to keep the
+    # queues in process and consume them inside the API (tests, local runs)
+    JOBS_BACKEND: str = "redis"
+    # Attempts before a job is dead-lettered; retries back off exponentially
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_BASE_SECONDS: float = 5
+    JOBS_RETRY_MAX_SECONDS: float = 600
+    # Dead-lettered jobs kept per queue
+    JOBS_DEAD_LETTER_SIZE: int = 1_000
+    # Longest a worker blocks waiting for a job
+    JOBS_POLL_SECONDS: float = 1.0
+    # A worker missing three heartbeats is presumed dead and its jobs are
+    # requeued by the next recovery pass
+    JOBS_HEARTBEAT_SECONDS: float = 10
+    JOBS_RECOVERY_SECONDS: float = 60
+    # Processes started by python -m app.worker
+    JOBS_WORKER_PROCESSES: int = 1
+
+    # Outbound email
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: str | None = None
+    SMTP_PASSWORD: SecretStr | None = None
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT: float = 10
+    # An open connection is reused until it has been idle this long
+    SMTP_IDLE_SECONDS: float = 30
+    EMAIL_FROM: str = "ComplyCentre <no-reply@complycenter.com>"
+    # Messages sent per job batch, over one connection
+    EMAIL_BATCH_SIZE: int = 50
+
+    # Cleaner check-ins are buffered per worker and copied into the
+    # partitioned check_ins table in batches; when the buffer is full new
+    # check-ins are refused with 503
+    CHECK_IN_BATCH_SIZE: int = 1_000
+    CHECK_IN_BUFFER_SIZE: int = 50_000
+    CHECK_IN_FLUSH_SECONDS: float = 1.0
+    # Check-ins farther than this from the business are stored as outside
+    CHECK_IN_GEOFENCE_METERS: float = 150
+    CHECK_IN_GEOFENCE_CACHE_SIZE: int = 10_000
+    CHECK_IN_GEOFENCE_CACHE_TTL_SECONDS: float = 600
+    # Devices may upload check-ins recorded offline up to this old, and
+    # clocks may run this far ahead
+    CHECK_IN_MAX_AGE_DAYS: int = 7
+    CHECK_IN_MAX_CLOCK_SKEW_SECONDS: float = 300
+    # Daily partitions created in advance
+    CHECK_IN_PARTITIONS_AHEAD_DAYS: int = 7
+
+    # Send per-request Server-Timing headers (db, pool, hash, jwt durations)
+    SERVER_TIMING_HEADER: bool = True
+
     LOG_LEVEL: str = "INFO"
     LOG_BACKUP_COUNT: int = 5
+    # Also write logs/complycentre.log. Processes must not rotate one file
+    # together, so app.serve turns it off for more than one worker unless
+    # it is set explicitly
+    LOG_FILE_ENABLED: bool = True
+    # "text" or "json" (one object per line)
+    LOG_FORMAT: str = "text"
+    # Records are queued and written by a background thread in batches
+    LOG_BATCH_SIZE: int = 256
+    LOG_QUEUE_SIZE: int = 10_000
+    # Fraction of DEBUG/INFO records kept per route template
+    LOG_SAMPLE_RATES: dict[str, float] = {
+        "/api/v1/businesses/{business_id}": 0.1,
+        "/api/v1/businesses": 0.1,
+        "/api/v1/profile": 0.1,
+    }
+    # Routes whose DEBUG/INFO records are dropped, e.g. health probes
+    LOG_SKIP_ROUTES: list[str] = ["/health", "/metrics"]
+    # Non-error records allowed per call site per second; 0 disables
+    LOG_RATE_LIMIT_PER_SECOND: int = 100
 
     REDIS_HOST: str = "complycenter-cache"
     REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_PASSWORD: SecretStr | None = None
+    REDIS_MAX_CONNECTIONS: int = 50
+    # Seconds to wait for a free pooled connection before failing
+    REDIS_POOL_TIMEOUT: float = 2.0
+    REDIS_SOCKET_TIMEOUT: float = 1.0
+    REDIS_CONNECT_TIMEOUT: float = 1.0
+    REDIS_HEALTH_CHECK_INTERVAL: float = 15.0
     PASSWORD_HASHING_ALGORITHM : str =  "sha256_crypt"
+    # Process pool used for password hashing / verification
+    PASSWORD_HASHING_WORKERS: int = 2
+    # Requests allowed to wait for a free worker before answering 503
+    PASSWORD_HASHING_QUEUE_SIZE: int = 32
+
+    # Token-bucket admission control for the sign-in and refresh routes,
+    # shared across workers through Redis (per worker while it is down)
+    AUTH_RATE_LIMIT_ENABLED: bool = True
+    AUTH_RATE_LIMIT_GLOBAL_BURST: int = 50
+    AUTH_RATE_LIMIT_GLOBAL_PER_SECOND: float = 20
+    AUTH_RATE_LIMIT_IP_BURST: int = 20
+    AUTH_RATE_LIMIT_IP_PER_MINUTE: float = 30
+    # Attempts against one account, whichever addresses they come from
+    AUTH_RATE_LIMIT_EMAIL_BURST: int = 5
+    AUTH_RATE_LIMIT_EMAIL_PER_MINUTE: float = 5
+    # Buckets kept by the in-process fallback
+    AUTH_RATE_LIMIT_FALLBACK_SIZE: int = 10_000
+
+    # Authenticated principal cache used by get_current_user
+    PRINCIPAL_CACHE_SIZE: int = 4096
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+
+    # Per-user business memberships used for authorization checks
+    MEMBERSHIP_CACHE_SIZE: int = 10_000
+    MEMBERSHIP_CACHE_TTL_SECONDS: int = 300
+
+    # Most users accepted by one POST /users/batch
+    USER_INVITE_BATCH_SIZE: int = 500
+
+    # Business read-through cache (in-process LRU in front of Redis)
+    BUSINESS_CACHE_SIZE: int = 2048
+    BUSINESS_CACHE_TTL_SECONDS: float = 30
+    BUSINESS_CACHE_REDIS_TTL_SECONDS: int = 300
+    # How long a locally expired entry may still be served while it is
+    # refreshed in the background; 0 disables stale-while-revalidate
+    BUSINESS_CACHE_STALE_SECONDS: float = 30
+    # Encoded JSON kept per business version, shared by pages and streams
+    BUSINESS_ENCODED_CACHE_SIZE: int = 10_000
+
+    # GET /businesses pagination
+    BUSINESS_PAGE_SIZE: int = 50
+    BUSINESS_MAX_PAGE_SIZE: int = 200
+    # Rows fetched per round trip when streaming NDJSON
+    BUSINESS_STREAM_BATCH_SIZE: int = 500
+    # Rows per INSERT when bulk importing
+    BUSINESS_IMPORT_BATCH_SIZE: int = 500
+    # Longest import record, in characters; a longer one (usually a CSV
+    # field missing its closing quote) is reported as an invalid row
+    BUSINESS_IMPORT_MAX_RECORD_CHARS: int = 64 * 1024
+
+    # GET /businesses/nearby
+    NEARBY_MAX_RADIUS_M: float = 100_000
+    # First radius tried by k-nearest searches before widening
+    NEARBY_INITIAL_RADIUS_M: float = 2_000
+    NEARBY_MAX_RESULTS: int = 100
+
+    # Content-addressed blob store for uploaded images
+    BLOB_STORE_PATH: str = "blobs"
+    BLOB_MAX_BYTES: int = 10 * 1024 * 1024
+    BLOB_THUMBNAIL_SIZES: list[int] = [64, 128, 256]
 
     @property
     def db_url(self) -> URL:
@@ -39,11 +226,24 @@ class Settings(BaseSettings):
         )
 
     @property
+    def replica_db_url(self) -> URL | None:
+        if not self.POSTGRES_REPLICA_HOST:
+            return None
+        return self.db_url.with_host(self.POSTGRES_REPLICA_HOST).with_port(
+            self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT
+        )
+
+    @cached_property
     def timezone(self):
+        # pytz and passlib are imported on first use to keep startup fast
+        import pytz
+
         return pytz.timezone(self.TIMEZONE)
-    
-    @property
+
+    @cached_property
     def pwd_context(self):
+        from passlib.context import CryptContext
+
         return CryptContext(schemes=[self.PASSWORD_HASHING_ALGORITHM])
 
     model_config = SettingsConfigDict(env_file=".env")
@@ -0,0 +1,131 @@
+import asyncio
+import uuid
+from collections.abc import Callable
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.logger import get_logger
+
+logger = get_logger("invalidation")
+
+
+class InvalidationBus:
+    """
+    Fans cache invalidations out to every worker over Redis pub/sub.
+
+    Each in-process cache subscribes under a name with a handler that drops
+    the given keys. Messages published by this process are skipped on
+    receipt because the publisher has already evicted locally.
+    """
+
+    CHANNEL = "complycenter:invalidate"
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self.redis: Redis | None = None
+        self._handlers: dict[str, Callable[[list[str]], None]] = {}
+        self._task: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    def subscribe(self, name: str, handler: Callable[[list[str]], None]) -> None:
+        self._handlers[name] = handler
+
+    async def start(self, redis: Redis) -> None:
+        self.redis = redis
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, name: str, keys: list[str]) -> None:
+        if self.redis is None:
+            return
+        message = orjson.dumps({"cache": name, "keys": keys, "origin": self.origin})
+        try:
+            await self.redis.publish(self.CHANNEL, message)
+        except RedisError as e:
+            logger.warning("Unable to publish invalidation for {}: {}", name, e)
+
+    def notify(self, name: str, keys: list[str]) -> None:
+        """
+        Drop keys from this worker's cache now and publish them to the others
+        in the background, for synchronous code running on the event loop.
+        """
+        handler = self._handlers.get(name)
+        if handler is not None:
+            handler(keys)
+        if self.redis is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.publish(name, keys))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _dispatch(self, data: bytes | str) -> None:
+        message = orjson.loads(data)
+        if message.get("origin") == self.origin:
+            return
+        handler = self._handlers.get(message.get("cache"))
+        if handler is not None:
+            handler(message.get("keys", []))
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    while True:
+                        # A read timeout keeps an idle channel from tripping
+                        # the pool's socket_timeout.
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=1.0
+                        )
+                        if message is not None:
+                            self._dispatch(message["data"])
+            except RedisError as e:
+                # Entries may have gone stale while disconnected; TTLs bound
+                # how long, so just reconnect.
+                logger.warning("Invalidation listener disconnected: {}", e)
+                await asyncio.sleep(1)
+
+
+invalidation_bus = InvalidationBus()
+
+_PENDING = "pending_invalidations"
+
+
+def invalidate_after_commit(session: Session | None, name: str, keys: list[str]):
+    """
+    Invalidate keys in every worker once the session's transaction commits.
+
+    Meant for ORM event hooks, which run at flush time: publishing then
+    would let another worker reload the old row before the commit is
+    visible, and keep it until the TTL.
+    """
+    if session is None:
+        return
+    session.info.setdefault(_PENDING, {}).setdefault(name, set()).update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for name, keys in session.info.pop(_PENDING, {}).items():
+        invalidation_bus.notify(name, sorted(keys))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
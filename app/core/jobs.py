@@ -0,0 +1,623 @@
+import asyncio
+import os
+import random
+import socket
+import time
+import uuid
+from bisect import bisect_left
+from collections import defaultdict, deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.metrics import SECONDS_BUCKETS, Histogram
+
+logger = get_logger("jobs")
+
+# Job latency, enqueue to completion, can include retries minutes apart
+JOB_LATENCY_BUCKETS = (*SECONDS_BUCKETS, 30, 60, 300, 900, 3600)
+
+
+class PermanentJobError(Exception):
+    """A failure retrying cannot fix; the job is dead-lettered at once."""
+
+
+@dataclass(slots=True)
+class Job:
+    name: str
+    payload: dict
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    error: str | None = None
+    # The job exactly as stored, so the backend can find it again
+    raw: str | None = None
+
+    def encode(self) -> str:
+        return orjson.dumps(
+            {
+                "name": self.name,
+                "payload": self.payload,
+                "id": self.id,
+                "attempts": self.attempts,
+                "enqueued_at": self.enqueued_at,
+                "error": self.error,
+            }
+        ).decode()
+
+    @classmethod
+    def decode(cls, raw: str | bytes) -> "Job":
+        if isinstance(raw, bytes):
+            raw = raw.decode()
+        return cls(**orjson.loads(raw), raw=raw)
+
+
+# Called with the payloads of a batch; returns None or the exception for
+# each, in order
+BatchHandler = Callable[[list[dict]], Awaitable[list[Exception | None]]]
+
+
+@dataclass(frozen=True, slots=True)
+class Handler:
+    fn: BatchHandler
+    queue: str
+    batch_size: int
+    max_attempts: int
+
+
+@dataclass(slots=True)
+class Outcome:
+    """What a worker did with one popped batch, recorded in one step."""
+
+    done: list[Job] = field(default_factory=list)
+    retry: list[tuple[Job, float]] = field(default_factory=list)
+    dead: list[Job] = field(default_factory=list)
+    # Enqueue to completion, in seconds, of each done job
+    latencies: list[float] = field(default_factory=list)
+
+
+class MemoryJobBackend:
+    """
+    Queues kept in process, for tests and local runs.
+
+    Only workers in this process see the jobs, and they are lost on restart.
+    """
+
+    def __init__(self, dead_letter_size: int):
+        self.dead_letter_size = dead_letter_size
+        self._ready: dict[str, deque[Job]] = defaultdict(deque)
+        self._scheduled: dict[str, list[tuple[float, Job]]] = defaultdict(list)
+        self._dead: dict[str, deque[Job]] = defaultdict(
+            lambda: deque(maxlen=dead_letter_size)
+        )
+        self._processing: dict[str, int] = defaultdict(int)
+        self._counters: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"completed": 0, "retried": 0, "dead_lettered": 0}
+        )
+        self._latency: dict[str, Histogram] = defaultdict(
+            lambda: Histogram(JOB_LATENCY_BUCKETS)
+        )
+        self._wakeup = asyncio.Event()
+
+    async def push(self, queue: str, jobs: list[Job]) -> None:
+        self._ready[queue].extend(jobs)
+        self._wakeup.set()
+
+    def _promote(self, queue: str) -> float:
+        # Returns how long until the next scheduled job is due
+        now = time.time()
+        scheduled = self._scheduled[queue]
+        due = [job for run_at, job in scheduled if run_at <= now]
+        if due:
+            scheduled[:] = [(run_at, job) for run_at, job in scheduled if run_at > now]
+            self._ready[queue].extend(due)
+        return min((run_at for run_at, _ in scheduled), default=now + 3600) - now
+
+    async def pop(
+        self, queue: str, worker_id: str, max_jobs: int, timeout: float
+    ) -> list[Job]:
+        next_due = self._promote(queue)
+        if not self._ready[queue]:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), min(timeout, next_due))
+            except asyncio.TimeoutError:
+                pass
+            self._promote(queue)
+        ready = self._ready[queue]
+        jobs = [ready.popleft() for _ in range(min(max_jobs, len(ready)))]
+        self._processing[queue] += len(jobs)
+        return jobs
+
+    async def finish(self, queue: str, worker_id: str, outcome: Outcome) -> None:
+        self._processing[queue] -= (
+            len(outcome.done) + len(outcome.retry) + len(outcome.dead)
+        )
+        self._scheduled[queue].extend((run_at, job) for job, run_at in outcome.retry)
+        self._dead[queue].extendleft(outcome.dead)
+        counters = self._counters[queue]
+        counters["completed"] += len(outcome.done)
+        counters["retried"] += len(outcome.retry)
+        counters["dead_lettered"] += len(outcome.dead)
+        for latency in outcome.latencies:
+            self._latency[queue].observe(latency)
+
+    async def heartbeat(self, worker_id: str) -> None:
+        pass
+
+    async def recover(self, queue: str) -> int:
+        return 0
+
+    async def stats(self, queue: str) -> dict:
+        return {
+            "ready": len(self._ready[queue]),
+            "scheduled": len(self._scheduled[queue]),
+            "processing": self._processing[queue],
+            "dead": len(self._dead[queue]),
+            **self._counters[queue],
+            "latency": self._latency[queue],
+        }
+
+    async def dead_letters(self, queue: str, limit: int) -> list[Job]:
+        return list(self._dead[queue])[:limit]
+
+
+# Moves scheduled jobs that are due onto the ready list, atomically so that
+# two workers never both move one
+PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+    redis.call('LPUSH', KEYS[2], unpack(due))
+end
+return #due
+"""
+
+
+class RedisJobBackend:
+    """
+    Queues in Redis, shared by the API and every worker process.
+
+    Per queue: a ready list, a sorted set of retries by due time, a
+    processing list per worker and a capped dead-letter list. Popping moves
+    a job onto the worker's processing list, and finishing removes it, so a
+    worker that dies mid-batch leaves its jobs where recover() finds them
+    once its heartbeat has expired.
+    """
+
+    PREFIX = "complycenter:jobs:"
+
+    def __init__(self, redis: Redis, dead_letter_size: int, heartbeat_ttl: float):
+        self.redis = redis
+        self.dead_letter_size = dead_letter_size
+        self.heartbeat_ttl = heartbeat_ttl
+        self._promote = redis.register_script(PROMOTE_SCRIPT)
+
+    def _key(self, queue: str, part: str) -> str:
+        return f"{self.PREFIX}{queue}:{part}"
+
+    def _worker_key(self, worker_id: str) -> str:
+        return f"{self.PREFIX}worker:{worker_id}"
+
+    async def push(self, queue: str, jobs: list[Job]) -> None:
+        await self.redis.lpush(
+            self._key(queue, "ready"), *(job.encode() for job in jobs)
+        )
+
+    async def pop(
+        self, queue: str, worker_id: str, max_jobs: int, timeout: float
+    ) -> list[Job]:
+        ready = self._key(queue, "ready")
+        processing = self._key(queue, f"processing:{worker_id}")
+        await self._promote(
+            keys=[self._key(queue, "scheduled"), ready], args=[time.time(), 1000]
+        )
+        # Block for the first job only; the rest of the batch is whatever
+        # is already waiting
+        first = await self.redis.blmove(ready, processing, timeout, "RIGHT", "LEFT")
+        if first is None:
+            return []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            # Registered where its processing list is made, so recover() and
+            # stats() find the list without scanning the keyspace
+            pipe.sadd(self._key(queue, "workers"), worker_id)
+            for _ in range(max_jobs - 1):
+                pipe.lmove(ready, processing, "RIGHT", "LEFT")
+            _, *more = await pipe.execute()
+        jobs, malformed = [], []
+        for raw in [first, *(raw for raw in more if raw is not None)]:
+            try:
+                jobs.append(Job.decode(raw))
+            except (ValueError, TypeError) as e:
+                logger.error("Malformed job on {} dead-lettered: {!r}", queue, e)
+                malformed.append(
+                    Job("", {"raw": raw}, error=f"{type(e).__name__}: {e}", raw=raw)
+                )
+        if malformed:
+            # A job that cannot be decoded would fail the same way on every
+            # pop; finish it as dead now rather than fail the whole batch
+            await self.finish(queue, worker_id, Outcome(dead=malformed))
+        return jobs
+
+    async def finish(self, queue: str, worker_id: str, outcome: Outcome) -> None:
+        processing = self._key(queue, f"processing:{worker_id}")
+        metrics = self._key(queue, "metrics")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for job in outcome.done:
+                pipe.lrem(processing, 1, job.raw)
+            for job, run_at in outcome.retry:
+                pipe.lrem(processing, 1, job.raw)
+                pipe.zadd(self._key(queue, "scheduled"), {job.encode(): run_at})
+            for job in outcome.dead:
+                pipe.lrem(processing, 1, job.raw)
+                pipe.lpush(self._key(queue, "dead"), job.encode())
+            if outcome.dead:
+                pipe.ltrim(self._key(queue, "dead"), 0, self.dead_letter_size - 1)
+            for counter, jobs in (
+                ("completed", outcome.done),
+                ("retried", outcome.retry),
+                ("dead", outcome.dead),
+            ):
+                if jobs:
+                    pipe.hincrby(metrics, counter, len(jobs))
+            for latency in outcome.latencies:
+                bucket = bisect_left(JOB_LATENCY_BUCKETS, latency)
+                pipe.hincrby(metrics, f"latency:{bucket}", 1)
+                pipe.hincrbyfloat(metrics, "latency_sum", latency)
+            await pipe.execute()
+
+    async def heartbeat(self, worker_id: str) -> None:
+        await self.redis.set(
+            self._worker_key(worker_id), 1, px=int(self.heartbeat_ttl * 1000)
+        )
+
+    async def _processing_keys(self, queue: str) -> dict[str, str]:
+        """Processing list of each worker that has popped from the queue."""
+        workers = await self.redis.smembers(self._key(queue, "workers"))
+        return {
+            worker_id: self._key(queue, f"processing:{worker_id}")
+            for worker_id in workers
+        }
+
+    async def recover(self, queue: str) -> int:
+        """Put back the jobs held by workers whose heartbeat has expired."""
+        ready = self._key(queue, "ready")
+        recovered = 0
+        for worker_id, key in (await self._processing_keys(queue)).items():
+            if await self.redis.exists(self._worker_key(worker_id)):
+                continue
+            # Oldest first, so they are consumed in their original order
+            while await self.redis.lmove(key, ready, "LEFT", "RIGHT") is not None:
+                recovered += 1
+            # A worker that was only late registers again on its next pop
+            await self.redis.srem(self._key(queue, "workers"), worker_id)
+        return recovered
+
+    async def stats(self, queue: str) -> dict:
+        processing = await self._processing_keys(queue)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.llen(self._key(queue, "ready"))
+            pipe.zcard(self._key(queue, "scheduled"))
+            pipe.llen(self._key(queue, "dead"))
+            pipe.hgetall(self._key(queue, "metrics"))
+            for key in processing.values():
+                pipe.llen(key)
+            ready, scheduled, dead, metrics, *held = await pipe.execute()
+        latency = Histogram(JOB_LATENCY_BUCKETS)
+        for index in range(len(latency.counts)):
+            latency.counts[index] = int(metrics.get(f"latency:{index}", 0))
+        latency.count = sum(latency.counts)
+        latency.sum = float(metrics.get("latency_sum", 0))
+        return {
+            "ready": ready,
+            "scheduled": scheduled,
+            "processing": sum(held),
+            "dead": dead,
+            "completed": int(metrics.get("completed", 0)),
+            "retried": int(metrics.get("retried", 0)),
+            "dead_lettered": int(metrics.get("dead", 0)),
+            "latency": latency,
+        }
+
+    async def dead_letters(self, queue: str, limit: int) -> list[Job]:
+        raws = await self.redis.lrange(self._key(queue, "dead"), 0, limit - 1)
+        return [Job.decode(raw) for raw in raws]
+
+
+class JobQueue:
+    """
+    Registry of job handlers and the entry point for enqueueing jobs.
+
+    Handlers are registered by name with the queue they are consumed from;
+    the API and the workers import the same modules, so both know where a
+    job goes. The backend is bound at startup.
+    """
+
+    def __init__(self):
+        self.backend: MemoryJobBackend | RedisJobBackend | None = None
+        self.handlers: dict[str, Handler] = {}
+        self._pending: set[asyncio.Task] = set()
+
+    def bind(self, backend: MemoryJobBackend | RedisJobBackend) -> None:
+        self.backend = backend
+
+    def handler(
+        self,
+        name: str,
+        queue: str = "default",
+        batch_size: int = 1,
+        max_attempts: int | None = None,
+    ):
+        """
+        Register a job handler.
+
+        With ``batch_size`` 1 the handler takes one payload and raises to
+        fail. Otherwise it takes up to ``batch_size`` payloads and returns
+        None or an exception for each, in order. Raising PermanentJobError
+        (or returning one) dead-letters the job without retrying it.
+        """
+
+        def register(fn):
+            if batch_size == 1:
+
+                async def batch(payloads: list[dict]) -> list[Exception | None]:
+                    try:
+                        await fn(payloads[0])
+                    except Exception as e:
+                        return [e]
+                    return [None]
+
+            else:
+                batch = fn
+            self.handlers[name] = Handler(
+                batch, queue, batch_size, max_attempts or settings.JOBS_MAX_ATTEMPTS
+            )
+            return fn
+
+        return register
+
+    @property
+    def queues(self) -> list[str]:
+        return sorted({handler.queue for handler in self.handlers.values()})
+
+    async def enqueue_many(self, jobs: list[tuple[str, dict]]) -> None:
+        if self.backend is None:
+            raise RuntimeError("Job queue used before a backend was bound")
+        by_queue: dict[str, list[Job]] = defaultdict(list)
+        for name, payload in jobs:
+            by_queue[self.handlers[name].queue].append(Job(name, payload))
+        for queue, queued in by_queue.items():
+            try:
+                await self.backend.push(queue, queued)
+            except RedisError as e:
+                logger.error("Unable to enqueue {} {} jobs: {}", len(queued), queue, e)
+
+    async def enqueue(self, name: str, payload: dict) -> None:
+        await self.enqueue_many([(name, payload)])
+
+    def enqueue_after_commit(self, session, name: str, payload: dict) -> None:
+        """
+        Enqueue a job once the session's transaction commits, and drop it
+        if it rolls back, so no job ever refers to rows that do not exist.
+
+        A crash between the commit and the enqueue loses the job.
+        """
+        if name not in self.handlers:
+            raise KeyError(f"No job handler named {name}")
+        session = getattr(session, "sync_session", session)
+        session.info.setdefault(_PENDING_JOBS, []).append((name, payload))
+
+    def _flush_pending(self, jobs: list[tuple[str, dict]]) -> None:
+        task = asyncio.get_running_loop().create_task(self.enqueue_many(jobs))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def stats(self) -> dict:
+        return {queue: await self.backend.stats(queue) for queue in self.queues}
+
+    async def render(self) -> str:
+        """Queue depths, outcomes and job latency in Prometheus text format."""
+        if self.backend is None:
+            return ""
+        try:
+            stats = await self.stats()
+        except RedisError as e:
+            logger.warning("Unable to read job queue metrics: {}", e)
+            return ""
+        lines = [
+            "# HELP complycenter_job_queue_depth Jobs per queue and state",
+            "# TYPE complycenter_job_queue_depth gauge",
+        ]
+        for queue, queue_stats in stats.items():
+            for state in ("ready", "scheduled", "processing", "dead"):
+                lines.append(
+                    f'complycenter_job_queue_depth{{queue="{queue}",state="{state}"}} '
+                    f"{queue_stats[state]}"
+                )
+        lines += [
+            "# HELP complycenter_jobs_total Jobs finished per queue and outcome",
+            "# TYPE complycenter_jobs_total counter",
+        ]
+        for queue, queue_stats in stats.items():
+            for outcome in ("completed", "retried", "dead_lettered"):
+                lines.append(
+                    f'complycenter_jobs_total{{queue="{queue}",outcome="{outcome}"}} '
+                    f"{queue_stats[outcome]}"
+                )
+        name = "complycenter_job_latency_seconds"
+        lines += [
+            f"# HELP {name} Enqueue to completion",
+            f"# TYPE {name} histogram",
+        ]
+        for queue, queue_stats in stats.items():
+            histogram = queue_stats["latency"]
+            labels = f'queue="{queue}"'
+            for le, count in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+job_queue = JobQueue()
+
+_PENDING_JOBS = "pending_jobs"
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_pending(session: Session) -> None:
+    jobs = session.info.pop(_PENDING_JOBS, None)
+    if jobs:
+        job_queue._flush_pending(jobs)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_JOBS, None)
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, so failed jobs do not retry in step."""
+    delay = min(
+        settings.JOBS_RETRY_MAX_SECONDS,
+        settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class JobWorker:
+    """
+    Consumes queues, one loop per queue, a batch at a time.
+
+    A failed job is retried after retry_delay() until its handler's
+    max_attempts, then dead-lettered. Stopping lets the batch in hand
+    finish. Run several worker processes to consume in parallel.
+    """
+
+    def __init__(self, queue: JobQueue, queues: list[str]):
+        self.queue = queue
+        self.queues = queues
+        self.id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def run(self, stop: asyncio.Event) -> None:
+        logger.info("Worker {} consuming {}", self.id, ", ".join(self.queues))
+        await asyncio.gather(
+            self._keep_alive(stop), *(self._consume(name, stop) for name in self.queues)
+        )
+
+    async def _keep_alive(self, stop: asyncio.Event) -> None:
+        backend = self.queue.backend
+        last_recovery = 0.0
+        while not stop.is_set():
+            try:
+                await backend.heartbeat(self.id)
+                if time.monotonic() - last_recovery >= settings.JOBS_RECOVERY_SECONDS:
+                    last_recovery = time.monotonic()
+                    for name in self.queues:
+                        recovered = await backend.recover(name)
+                        if recovered:
+                            logger.warning(
+                                "Requeued {} {} jobs of a dead worker", recovered, name
+                            )
+            except RedisError as e:
+                logger.warning("Worker heartbeat failed: {}", e)
+            try:
+                await asyncio.wait_for(stop.wait(), settings.JOBS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _consume(self, name: str, stop: asyncio.Event) -> None:
+        backend = self.queue.backend
+        batch_size = max(
+            handler.batch_size
+            for handler in self.queue.handlers.values()
+            if handler.queue == name
+        )
+        while not stop.is_set():
+            try:
+                jobs = await backend.pop(
+                    name, self.id, batch_size, settings.JOBS_POLL_SECONDS
+                )
+                if jobs:
+                    await backend.finish(name, self.id, await self._process(jobs))
+            except RedisError as e:
+                logger.warning("Job queue {} unavailable: {}", name, e)
+                await asyncio.sleep(settings.JOBS_POLL_SECONDS)
+            except Exception as e:
+                # Ending the loop would stop the queue for good, and the
+                # process manager restarting the worker would hit it again;
+                # unfinished jobs stay on the processing list for recover()
+                logger.error("Job queue {} consumer failed: {!r}", name, e)
+                await asyncio.sleep(settings.JOBS_POLL_SECONDS)
+
+    async def _process(self, jobs: list[Job]) -> Outcome:
+        outcome = Outcome()
+        by_name: dict[str, list[Job]] = defaultdict(list)
+        for job in jobs:
+            by_name[job.name].append(job)
+        for name, group in by_name.items():
+            handler = self.queue.handlers.get(name)
+            if handler is None:
+                errors = [PermanentJobError(f"No job handler named {name}")] * len(
+                    group
+                )
+            else:
+                try:
+                    errors = await handler.fn([job.payload for job in group])
+                except Exception as e:
+                    errors = [e] * len(group)
+                if len(errors) != len(group):
+                    # zip() would stop at the shorter list and leave the
+                    # unmatched jobs on the processing list for good; treat
+                    # jobs without a result as failed
+                    logger.error(
+                        "Job handler {} returned {} results for {} jobs",
+                        name,
+                        len(errors),
+                        len(group),
+                    )
+                    missing = RuntimeError(
+                        f"Handler returned {len(errors)} results for {len(group)} jobs"
+                    )
+                    errors = [*errors[: len(group)]] + [missing] * (
+                        len(group) - len(errors)
+                    )
+            now = time.time()
+            for job, error in zip(group, errors):
+                if error is None:
+                    outcome.done.append(job)
+                    outcome.latencies.append(now - job.enqueued_at)
+                    continue
+                retried = Job(
+                    job.name,
+                    job.payload,
+                    id=job.id,
+                    attempts=job.attempts + 1,
+                    enqueued_at=job.enqueued_at,
+                    error=f"{type(error).__name__}: {error}",
+                    raw=job.raw,
+                )
+                max_attempts = handler.max_attempts if handler else 1
+                if (
+                    isinstance(error, PermanentJobError)
+                    or retried.attempts >= max_attempts
+                ):
+                    logger.error("Job {} {} dead-lettered: {}", name, job.id, error)
+                    outcome.dead.append(retried)
+                else:
+                    logger.warning(
+                        "Job {} {} failed (attempt {}): {}",
+                        name,
+                        job.id,
+                        retried.attempts,
+                        error,
+                    )
+                    outcome.retry.append((retried, now + retry_delay(retried.attempts)))
+        return outcome
@@ -1,35 +1,232 @@
-from loguru import logger
+import atexit
+import queue
+import random
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
+import orjson
+from loguru import logger
+
 from app.core.config import settings
+from app.core.timing import current_route
 
 # Ensure logs directory exists
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
-# Remove default Loguru handler to customize
-logger.remove()
-
 # Set log file path
 log_file = LOG_DIR / "complycentre.log"
 
-# Add rotating file handler
-logger.add(
-    log_file,
-    rotation="5 MB",  # rotate after 5 MB
-    retention=settings.LOG_BACKUP_COUNT,  # number of backups to keep
-    level=settings.LOG_LEVEL,
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name} | {message}",
-    enqueue=True,  # for thread/process safety
+
+def _format_text(record: dict) -> str:
+    line = (
+        f"{record['time']:%Y-%m-%d %H:%M:%S} | {record['level'].name} | "
+        f"{record['name']} | {record['message']}\n"
+    )
+    if record["exception"] is not None:
+        line += "".join(traceback.format_exception(*record["exception"]))
+    return line
+
+
+def _format_json(record: dict) -> str:
+    extra = dict(record["extra"])
+    entry = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": extra.pop("name", record["name"]),
+        "module": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+        **extra,
+    }
+    if record["exception"] is not None:
+        entry["exception"] = "".join(traceback.format_exception(*record["exception"]))
+    return orjson.dumps(entry, default=str).decode() + "\n"
+
+
+class BatchingSink:
+    """
+    Loguru sink that only enqueues on the calling thread.
+
+    A background thread formats queued records (text or JSON) and writes
+    them to the console and the rotating log file (if any) in batches, so
+    the event loop never waits on I/O or serialization. When the queue is
+    full new records are dropped and counted rather than blocking.
+    """
+
+    def __init__(
+        self,
+        path: Path | None,
+        json: bool,
+        batch_size: int,
+        queue_size: int,
+        flush_interval: float = 0.05,
+    ):
+        self.format = _format_json if json else _format_text
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        if path is not None:
+            self._file = RotatingFileHandler(
+                path,
+                maxBytes=5 * 1024 * 1024,  # rotate after 5 MB
+                backupCount=settings.LOG_BACKUP_COUNT,  # number of backups to keep
+                encoding="utf-8",
+                delay=True,
+            )
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, message) -> None:
+        try:
+            self._queue.put_nowait(message.record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            # Let records accumulate so each wake-up writes a full batch
+            # instead of contending with the event loop for every record
+            time.sleep(self.flush_interval)
+            batch = [record]
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    self._write(batch)
+                    return
+                batch.append(record)
+            self._write(batch)
+
+    def _write(self, batch: list[dict]) -> None:
+        data = "".join(self.format(record) for record in batch)
+        try:
+            sys.stdout.write(data)
+            sys.stdout.flush()
+            if self._file is None:
+                return
+            if self._file.stream is None:
+                self._file.stream = self._file._open()
+            if self._file.stream.tell() + len(data) >= self._file.maxBytes:
+                self._file.doRollover()
+            self._file.stream.write(data)
+            self._file.stream.flush()
+        except Exception:
+            # Logging must never take the writer thread down
+            traceback.print_exc(file=sys.stderr)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+        if self._file is not None:
+            self._file.close()
+
+
+class LogFilter:
+    """
+    Decides, before anything is formatted or queued, whether a record is kept.
+
+    Records from routes in ``skip_routes`` (health probes) below WARNING are
+    dropped; records below WARNING are sampled per route template at
+    ``sample_rates``; and each call site may emit at most
+    ``rate_limit`` non-error records per second.
+    """
+
+    def __init__(
+        self,
+        sample_rates: dict[str, float],
+        skip_routes: list[str],
+        rate_limit: int,
+    ):
+        self.sample_rates = sample_rates
+        self.skip_routes = frozenset(skip_routes)
+        self.rate_limit = rate_limit
+        self.sampled_out = 0
+        self.rate_limited = 0
+        self._windows: dict[tuple, list] = {}
+
+    def __call__(self, record: dict) -> bool:
+        level = record["level"].no
+        if level >= 40:  # ERROR and above are always kept
+            return True
+        if level < 30:
+            route = current_route()
+            if route is not None:
+                if route in self.skip_routes:
+                    return False
+                rate = self.sample_rates.get(route, 1.0)
+                if rate < 1.0 and random.random() >= rate:
+                    self.sampled_out += 1
+                    return False
+        if self.rate_limit:
+            key = (record["name"], record["line"])
+            second = int(time.monotonic())
+            window = self._windows.get(key)
+            if window is None or window[0] != second:
+                self._windows[key] = [second, 1]
+            elif window[1] >= self.rate_limit:
+                self.rate_limited += 1
+                return False
+            else:
+                window[1] += 1
+        return True
+
+
+# Remove default Loguru handler to customize
+logger.remove()
+
+log_filter = LogFilter(
+    sample_rates=settings.LOG_SAMPLE_RATES,
+    skip_routes=settings.LOG_SKIP_ROUTES,
+    rate_limit=settings.LOG_RATE_LIMIT_PER_SECOND,
+)
+log_sink = BatchingSink(
+    log_file if settings.LOG_FILE_ENABLED else None,
+    json=settings.LOG_FORMAT == "json",
+    batch_size=settings.LOG_BATCH_SIZE,
+    queue_size=settings.LOG_QUEUE_SIZE,
 )
+atexit.register(log_sink.close)
 
-# Add console output
+# Console and rotating file output, both written by the sink's thread
 logger.add(
-    lambda msg: print(msg, end=""),
+    log_sink,
     level=settings.LOG_LEVEL,
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name} | {message}",
+    format="{message}",
+    filter=log_filter,
+    catch=True,
 )
 
 
+def render_metrics() -> str:
+    """Records discarded before being written, per reason, in Prometheus format."""
+    name = "complycenter_log_records_dropped_total"
+    lines = [
+        f"# HELP {name} Log records discarded instead of written, per reason",
+        f"# TYPE {name} counter",
+    ]
+    for reason, count in (
+        ("queue_full", log_sink.dropped),
+        ("sampled_out", log_filter.sampled_out),
+        ("rate_limited", log_filter.rate_limited),
+    ):
+        lines.append(f'{name}{{reason="{reason}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
 def get_logger(name: str):
     return logger.bind(name=f"complycentre.{name}")
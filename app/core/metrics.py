@@ -0,0 +1,46 @@
+from bisect import bisect_left
+from collections.abc import Iterable
+
+# Upper bounds in milliseconds, suited to pool waits and connection setup
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# Prometheus' conventional request latency buckets
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with Prometheus-style cumulative counts.
+
+    Cheap enough to observe on every request; not thread-safe.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """``(le, count)`` pairs, ending with ``+Inf``."""
+        pairs, running = [], 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            running += count
+            pairs.append((str(bound), running))
+        return pairs
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "max": self.max,
+            "buckets": dict(self.cumulative()),
+        }
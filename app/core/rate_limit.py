@@ -0,0 +1,228 @@
+import hashlib
+import math
+import time
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.cache import RedisHealth
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.memory_cache import TTLCache
+
+logger = get_logger("rate_limit")
+
+# Token buckets in Redis hashes ({tokens, ts}), all checked and charged in
+# one atomic step: a request takes one token from every bucket or from none,
+# so a client rejected by its own bucket does not drain the shared ones.
+# ARGV holds a (capacity, tokens per second) pair per key. Redis' clock is
+# used so that every worker refills at the same rate. Returns whether the
+# request was allowed, the limit and remaining tokens of the tightest bucket,
+# and the milliseconds until it is full again and until a token is available.
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local tokens = {}
+local allowed = 1
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2]) / 1000
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local available = tonumber(state[1])
+    if available == nil then
+        available = capacity
+    else
+        available = math.min(capacity, available + (now - tonumber(state[2])) * rate)
+    end
+    tokens[i] = available
+    if available < 1 then
+        allowed = 0
+    end
+end
+local limit, remaining, reset, retry = 0, -1, 0, 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2]) / 1000
+    local available = tokens[i]
+    if allowed == 1 then
+        available = available - 1
+    elseif available < 1 then
+        retry = math.max(retry, math.ceil((1 - available) / rate))
+    end
+    local full_in = math.ceil((capacity - available) / rate)
+    redis.call('HSET', KEYS[i], 'tokens', tostring(available), 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], full_in + 1000)
+    if remaining < 0 or math.floor(available) < remaining then
+        limit, remaining, reset = capacity, math.floor(available), full_in
+    end
+end
+return {allowed, limit, remaining, reset, retry}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Bucket:
+    capacity: int
+    per_second: float
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_ms: int
+    retry_after_ms: int
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_ms / 1000)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after_ms / 1000)))
+        return headers
+
+
+class LocalBuckets:
+    """
+    The same token buckets kept in process, used while Redis is unusable.
+
+    Limits then apply per worker rather than across the fleet, which is
+    looser but still bounds what a single client can make one worker do.
+    """
+
+    def __init__(self, maxsize: int):
+        # Evicting a bucket only refills it early
+        self._buckets = TTLCache(maxsize=maxsize, ttl=3600)
+
+    def hit(self, buckets: list[tuple[str, Bucket]]) -> RateLimitResult:
+        now = time.monotonic()
+        states = []
+        for key, bucket in buckets:
+            state = self._buckets.get(key)
+            if state is None:
+                available = float(bucket.capacity)
+            else:
+                available = min(
+                    bucket.capacity, state[0] + (now - state[1]) * bucket.per_second
+                )
+            states.append(available)
+        allowed = all(available >= 1 for available in states)
+
+        limit, remaining, reset, retry = 0, -1, 0.0, 0.0
+        for (key, bucket), available in zip(buckets, states):
+            if allowed:
+                available -= 1
+            elif available < 1:
+                retry = max(retry, (1 - available) / bucket.per_second)
+            self._buckets.set(key, (available, now))
+            if remaining < 0 or math.floor(available) < remaining:
+                limit, remaining = bucket.capacity, math.floor(available)
+                reset = (bucket.capacity - available) / bucket.per_second
+        return RateLimitResult(
+            allowed, limit, remaining, math.ceil(reset * 1000), math.ceil(retry * 1000)
+        )
+
+
+class RateLimiter:
+    """
+    Distributed token-bucket rate limiter.
+
+    Buckets live in Redis and are checked by a Lua script, so every worker
+    shares them. While Redis is unhealthy or a call fails, in-process buckets
+    take over rather than letting everything through.
+    """
+
+    PREFIX = "complycenter:ratelimit:"
+
+    def __init__(self, fallback_size: int):
+        self.redis: Redis | None = None
+        self.redis_health: RedisHealth | None = None
+        self.rejected = 0
+        self.fallback_hits = 0
+        self._local = LocalBuckets(fallback_size)
+        self._script = None
+        self._degraded = False
+
+    def bind(self, redis: Redis, health: RedisHealth) -> None:
+        self.redis = redis
+        self.redis_health = health
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT) if redis else None
+
+    async def hit(self, buckets: list[tuple[str, Bucket]]) -> RateLimitResult:
+        """Take a token from every bucket, or from none if any is empty."""
+        result = None
+        if self._script is not None and self.redis_health.healthy:
+            args = []
+            for _, bucket in buckets:
+                args += [bucket.capacity, bucket.per_second]
+            try:
+                allowed, limit, remaining, reset, retry = await self._script(
+                    keys=[self.PREFIX + key for key, _ in buckets], args=args
+                )
+                result = RateLimitResult(bool(allowed), limit, remaining, reset, retry)
+                self._degraded = False
+            except RedisError as e:
+                if not self._degraded:
+                    logger.warning("Rate limiting in process, Redis failed: {}", e)
+                self._degraded = True
+        if result is None:
+            self.fallback_hits += 1
+            result = self._local.hit(buckets)
+        if not result.allowed:
+            self.rejected += 1
+        return result
+
+    @property
+    def stats(self) -> dict:
+        return {"rejected": self.rejected, "fallback_hits": self.fallback_hits}
+
+
+rate_limiter = RateLimiter(fallback_size=settings.AUTH_RATE_LIMIT_FALLBACK_SIZE)
+
+AUTH_GLOBAL = Bucket(
+    settings.AUTH_RATE_LIMIT_GLOBAL_BURST, settings.AUTH_RATE_LIMIT_GLOBAL_PER_SECOND
+)
+AUTH_PER_IP = Bucket(
+    settings.AUTH_RATE_LIMIT_IP_BURST, settings.AUTH_RATE_LIMIT_IP_PER_MINUTE / 60
+)
+AUTH_PER_EMAIL = Bucket(
+    settings.AUTH_RATE_LIMIT_EMAIL_BURST, settings.AUTH_RATE_LIMIT_EMAIL_PER_MINUTE / 60
+)
+
+
+async def limit_auth(
+    request: Request, response: Response, email: str | None = None
+) -> None:
+    """
+    Admission control for the auth endpoints; call before any DB or hash
+    work.
+
+    Charges the caller's IP, the email being signed in to (if any) and the
+    global auth bucket. Over the limit, raises a 429 with Retry-After;
+    otherwise the limit headers are added to ``response``. Behind a proxy,
+    run uvicorn with --proxy-headers so the client address is the caller's.
+    """
+    if not settings.AUTH_RATE_LIMIT_ENABLED:
+        return
+    client = request.client.host if request.client else "unknown"
+    buckets = [("auth:global", AUTH_GLOBAL), (f"auth:ip:{client}", AUTH_PER_IP)]
+    if email:
+        # Hashed so that Redis keys hold no addresses
+        digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+        buckets.append((f"auth:email:{digest}", AUTH_PER_EMAIL))
+
+    result = await rate_limiter.hit(buckets)
+    if not result.allowed:
+        logger.warning("Auth rate limit exceeded by {}", client)
+        raise HTTPException(
+            status_code=429, detail="Too many requests", headers=result.headers
+        )
+    response.headers.update(result.headers)
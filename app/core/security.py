@@ -1 +1,123 @@
 # Security utilities (e.g., token generation, encryption)
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.timing import timed
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+logger = get_logger("security")
+
+
+@lru_cache
+def _crypt_context(scheme: str) -> "CryptContext":
+    # Imported here: only the hashing workers need passlib
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=[scheme])
+
+
+def _warm(scheme: str) -> None:
+    _crypt_context(scheme)
+
+
+def _hash(scheme: str, raw_password: str) -> str:
+    return _crypt_context(scheme).hash(raw_password)
+
+
+def _verify(scheme: str, raw_password: str, hashed_password: str) -> bool:
+    return _crypt_context(scheme).verify(raw_password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification in a bounded process pool.
+
+    At most ``max_workers + max_queue`` operations may be in flight; anything
+    beyond that is rejected straight away with a 503 instead of piling up
+    behind the CPU-bound work.
+    """
+
+    def __init__(self, scheme: str, max_workers: int, max_queue: int):
+        self.scheme = scheme
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self.pending = 0
+        self.rejected = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.debug(
+                "Password hashing pool started with {} workers", self.max_workers
+            )
+
+    async def warm(self) -> None:
+        """
+        Spawn every worker and load passlib in it ahead of the first login.
+
+        Workers are started on demand, so one task per worker is submitted
+        at once. Failures are logged and leave the pool to start lazily.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(self._executor, _warm, self.scheme)
+                    for _ in range(self.max_workers)
+                )
+            )
+        except Exception as e:
+            # Start over with a fresh pool on the first real request
+            logger.warning("Password hashing warm-up failed: {}", e)
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning("Password hashing queue is full, rejecting request")
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, please try again later",
+                headers={"Retry-After": "1"},
+            )
+        self.start()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, self.scheme, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, raw_password: str) -> str:
+        with timed("hash"):
+            return await self._submit(_hash, raw_password)
+
+    async def verify(self, raw_password: str, hashed_password: str) -> bool:
+        with timed("hash"):
+            return await self._submit(_verify, raw_password, hashed_password)
+
+
+password_hasher = PasswordHasher(
+    scheme=settings.PASSWORD_HASHING_ALGORITHM,
+    max_workers=settings.PASSWORD_HASHING_WORKERS,
+    max_queue=settings.PASSWORD_HASHING_QUEUE_SIZE,
+)
@@ -0,0 +1,66 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Taken when app.main starts importing (it imports this module first), so
+# the "import" phase covers the framework, the models and every router
+_started = time.perf_counter()
+
+
+class StartupTimings:
+    """
+    Duration of each startup phase, in seconds.
+
+    Phases may overlap: the pool warm-up runs concurrently with the rest of
+    the lifespan, and the hasher warm-up usually finishes after ``ready``,
+    the time from the first import until the app starts accepting requests.
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self.phases: dict[str, float] = {}
+        self.ready: float | None = None
+
+    def mark(self, name: str) -> None:
+        """Record ``name`` as everything since the process began importing."""
+        self.phases[name] = time.perf_counter() - self.started
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    def mark_ready(self) -> None:
+        self.ready = time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        phases = ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in self.phases.items())
+        return f"Startup ready in {(self.ready or 0) * 1000:.0f}ms ({phases})"
+
+    def as_dict(self) -> dict:
+        return {"phases": dict(self.phases), "ready": self.ready}
+
+    def render(self) -> str:
+        """Prometheus gauges for the phases, appended to /metrics."""
+        lines = [
+            "# HELP complycenter_startup_phase_seconds Duration of each startup phase",
+            "# TYPE complycenter_startup_phase_seconds gauge",
+        ]
+        for name, seconds in self.phases.items():
+            lines.append(
+                f'complycenter_startup_phase_seconds{{phase="{name}"}} {seconds}'
+            )
+        if self.ready is not None:
+            lines.append(
+                "# HELP complycenter_startup_ready_seconds "
+                "Time from first import until requests were accepted"
+            )
+            lines.append("# TYPE complycenter_startup_ready_seconds gauge")
+            lines.append(f"complycenter_startup_ready_seconds {self.ready}")
+        return "\n".join(lines) + "\n"
+
+
+startup_timings = StartupTimings(_started)
@@ -0,0 +1,178 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import SECONDS_BUCKETS, STATEMENT_BUCKETS, Histogram
+
+# Components reported per request, in milliseconds (statements is a count)
+COMPONENTS = ("db", "pool", "hash", "jwt")
+
+
+class RequestTimings:
+    """Time spent in each component while serving one request."""
+
+    __slots__ = ("scope", "started", "statements", *COMPONENTS)
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db = self.pool = self.hash = self.jwt = 0.0
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+def current_route() -> str | None:
+    """Route template of the request being served, once it has been routed."""
+    timings = _current.get()
+    if timings is None:
+        return None
+    route = timings.scope.get("route")
+    return route.path if route is not None else None
+
+
+def add_time(component: str, ms: float) -> None:
+    timings = _current.get()
+    if timings is not None:
+        setattr(timings, component, getattr(timings, component) + ms)
+
+
+@contextmanager
+def timed(component: str) -> Iterator[None]:
+    """Add the block's duration to ``component`` of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(component, (time.perf_counter() - start) * 1000)
+
+
+class RouteMetrics:
+    """Per-route histograms, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._routes: dict[tuple[str, str], dict[str, Histogram]] = {}
+
+    def observe(self, method: str, route: str, timings: RequestTimings) -> None:
+        histograms = self._routes.get((method, route))
+        if histograms is None:
+            histograms = {
+                "duration": Histogram(SECONDS_BUCKETS),
+                "statements": Histogram(STATEMENT_BUCKETS),
+                **{name: Histogram(SECONDS_BUCKETS) for name in COMPONENTS},
+            }
+            self._routes[(method, route)] = histograms
+        histograms["duration"].observe(time.perf_counter() - timings.started)
+        histograms["statements"].observe(timings.statements)
+        for name in COMPONENTS:
+            histograms[name].observe(getattr(timings, name) / 1000)
+
+    def render(self) -> str:
+        families = {
+            "duration": ("request_duration_seconds", "Request latency"),
+            "statements": ("request_sql_statements", "SQL statements per request"),
+            "db": ("request_db_seconds", "Time spent executing SQL"),
+            "pool": ("request_pool_wait_seconds", "Time spent acquiring connections"),
+            "hash": ("request_password_hashing_seconds", "Password hashing time"),
+            "jwt": ("request_jwt_seconds", "JWT encoding and decoding time"),
+        }
+        lines = []
+        for key, (name, help_text) in families.items():
+            name = f"complycenter_{name}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), histograms in self._routes.items():
+                histogram = histograms[key]
+                labels = f'method="{method}",route="{route}"'
+                for le, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+route_metrics = RouteMetrics()
+
+
+def _server_timing(timings: RequestTimings) -> str:
+    total = (time.perf_counter() - timings.started) * 1000
+    return (
+        f"app;dur={total:.1f}, "
+        f'db;dur={timings.db:.1f};desc="{timings.statements} queries", '
+        f"pool;dur={timings.pool:.1f}, "
+        f"hash;dur={timings.hash:.1f}, "
+        f"jwt;dur={timings.jwt:.1f}"
+    )
+
+
+class TimingMiddleware:
+    """
+    Collects RequestTimings for every HTTP request.
+
+    The totals so far are sent in a ``Server-Timing`` header with the
+    response start, and the final figures are recorded per route once the
+    body has been sent. Plain ASGI middleware, so the per-request cost is a
+    context variable and a handful of clock reads.
+
+    Each request is also logged, in place of uvicorn's access log. The line
+    goes through the LogFilter like any other record, so it is sampled per
+    route (LOG_SAMPLE_RATES), dropped for health probes and rate limited;
+    server errors are logged as warnings and always kept.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True):
+        # Imported here: app.core.logger imports this module
+        from app.core.logger import get_logger
+
+        self.app = app
+        self.server_timing = server_timing
+        self.logger = get_logger("access")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(scope)
+        token = _current.set(timings)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", _server_timing(timings)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Logged while the request's route is still current, for the filter
+            self.logger.log(
+                "WARNING" if status >= 500 else "INFO",
+                "{} {} {} {:.1f}ms",
+                scope["method"],
+                scope["path"],
+                status,
+                (time.perf_counter() - timings.started) * 1000,
+            )
+            _current.reset(token)
+            # Label by route template, not the raw path, to bound cardinality
+            route = scope.get("route")
+            route_metrics.observe(
+                scope["method"], route.path if route else "unmatched", timings
+            )
@@ -1,13 +1,22 @@
 from collections.abc import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette.requests import Request
 
+from app.db.replica import replica_router
+from app.services.principal_cache import principal_cache
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
 
 async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
     """
     Create and get database session.
 
+    The session is lazy: a pooled connection is only checked out when the
+    first statement runs, so routes that end up answering from a cache never
+    take one.
+
     :param request: current request.
     :yield: database session.
     """
@@ -15,9 +24,59 @@ async def get_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]
 
     try:
         yield session
-        await session.commit()
+        # Handlers that already committed leave no transaction behind
+        if session.in_transaction():
+            await session.commit()
     except Exception as e:
         await session.rollback()
         raise e
     finally:
         await session.close()
+
+    user_id = getattr(request.state, "user_id", None)
+    if request.method not in SAFE_METHODS and user_id is not None:
+        await replica_router.record_write(user_id)
+
+
+def _request_user_id(request: Request):
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None:
+        return user_id
+    # Routes without authentication still honour read-your-writes for
+    # callers that send a token we have already verified
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        principal = principal_cache.get(principal_cache.digest(token))
+        if principal is not None:
+            return principal.id
+    return None
+
+
+def get_read_session_factory(request: Request) -> async_sessionmaker:
+    """
+    Session factory for read-only work: the replica when it is healthy and
+    the caller has not written recently, otherwise the primary.
+
+    Declare it after the route's user dependency so the caller is known.
+    """
+    return replica_router.session_factory(_request_user_id(request))
+
+
+async def get_read_session(
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Create and get a session for read-only routes.
+
+    Its transaction is opened as ``BEGIN READ ONLY`` and ended by the
+    rollback in ``close()``, so there is no commit to wait for and writes
+    are refused by the server.
+
+    :param request: current request.
+    :yield: database session.
+    """
+    session: AsyncSession = get_read_session_factory(request)()
+    try:
+        yield session
+    finally:
+        await session.close()
@@ -0,0 +1,191 @@
+import asyncio
+import ssl
+import time
+from functools import lru_cache
+
+from sqlalchemy import event, exc, make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.metrics import Histogram
+from app.core.timing import add_time, current_timings
+
+logger = get_logger("db_pool")
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.wait_ms = Histogram()
+        self.connect_ms = Histogram()
+        self.timeouts = 0
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    The default asyncio queue pool, timing every checkout and new connection.
+
+    Checkout time covers waiting for a free slot, opening a connection when
+    the pool grows and the pre-ping, i.e. everything a request spends before
+    its first statement can be sent.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            logger.warning("Connection pool exhausted: {}", self.status())
+            raise
+        finally:
+            waited = (time.perf_counter() - start) * 1000
+            self.metrics.wait_ms.observe(waited)
+            add_time("pool", waited)
+
+    def _create_connection(self):
+        start = time.perf_counter()
+        record = super()._create_connection()
+        self.metrics.connect_ms.observe((time.perf_counter() - start) * 1000)
+        return record
+
+
+@lru_cache
+def ssl_context() -> ssl.SSLContext | None:
+    """
+    TLS context trusting the bundled CA, loaded on first use; None when
+    POSTGRES_SSL is off, leaving asyncpg's default negotiation.
+    """
+    if not settings.POSTGRES_SSL:
+        return None
+    return ssl.create_default_context(cafile="app/ca.pem")
+
+
+def build_engine(url: str, **kwargs) -> AsyncEngine:
+    """
+    Create an async engine using the pool and asyncpg settings.
+
+    asyncpg prepares every statement it runs; SQLAlchemy keeps the prepared
+    statements per connection in an LRU of ``DB_STATEMENT_CACHE_SIZE``
+    entries, so repeated queries skip the parse/plan round trip. Set it to 0
+    when connecting through PgBouncer in transaction mode.
+    """
+    connect_args = kwargs.pop("connect_args", {})
+    connect_args.setdefault("command_timeout", settings.DB_COMMAND_TIMEOUT)
+    connect_args.setdefault("statement_cache_size", settings.DB_STATEMENT_CACHE_SIZE)
+    connect_args.setdefault(
+        "max_cached_statement_lifetime", settings.DB_STATEMENT_CACHE_LIFETIME
+    )
+    url = make_url(url).update_query_dict(
+        {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+    )
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_use_lifo=True,
+        connect_args=connect_args,
+        echo=settings.DB_ECHO,
+        **kwargs,
+    )
+    _time_statements(engine)
+    return engine
+
+
+def _time_statements(engine: AsyncEngine) -> None:
+    """Count statements and their execution time into the current request."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if current_timings() is not None:
+            conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        timings = current_timings()
+        started = conn.info.get("statement_started")
+        if timings is not None and started:
+            timings.statements += 1
+            timings.db += (time.perf_counter() - started.pop()) * 1000
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def failed(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("statement_started"):
+            conn.info["statement_started"].pop()
+
+
+async def warm_pool(engine: AsyncEngine, connections: int) -> int:
+    """
+    Open up to ``connections`` pooled connections concurrently.
+
+    They are all held until the slowest is ready and then checked back in,
+    so the first requests find the pool already filled instead of paying
+    for TCP, TLS and authentication themselves. Failures are logged and
+    left for requests to retry. Returns the number of connections opened.
+    """
+    connections = min(connections, settings.DB_POOL_SIZE)
+    results = await asyncio.gather(
+        *(engine.connect().start() for _ in range(connections)),
+        return_exceptions=True,
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    if len(opened) < connections:
+        error = next(e for e in results if isinstance(e, BaseException))
+        logger.warning(
+            "Pool warm-up opened {} of {} connections: {}",
+            len(opened),
+            connections,
+            error,
+        )
+    return len(opened)
+
+
+def pool_metrics(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    stats = {
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    if isinstance(pool, InstrumentedPool):
+        stats["timeouts"] = pool.metrics.timeouts
+        stats["checkout_wait_ms"] = pool.metrics.wait_ms.stats
+        stats["connect_ms"] = pool.metrics.connect_ms.stats
+    return stats
+
+
+async def server_connection_limits(engine: AsyncEngine) -> dict:
+    """What the database allows, to size workers x pool against it."""
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            text(
+                "SELECT current_setting('max_connections')::int, "
+                "current_setting('superuser_reserved_connections')::int, "
+                "(SELECT count(*) FROM pg_stat_activity WHERE backend_type = "
+                "'client backend')"
+            )
+        )
+        max_connections, reserved, in_use = result.one()
+    return {
+        "max_connections": max_connections,
+        "superuser_reserved_connections": reserved,
+        "client_connections": in_use,
+        # Workers this server can take at full pool_size + max_overflow
+        "max_workers": (max_connections - reserved)
+        // (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW),
+    }
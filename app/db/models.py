@@ -1,12 +1,19 @@
+from datetime import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, ForeignKey, Text, Float
+from sqlalchemy import String, ForeignKey, Float, Integer, Computed, Index, text
+from sqlalchemy import DDL, DateTime, event
 from .base import PrimaryUUIDTimestampedModel, BaseModel
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.config import settings
+from app.core.security import password_hasher
 
 
 class User(PrimaryUUIDTimestampedModel):
     __tablename__ = "users"
+    __table_args__ = (
+        # Serves get_active_user's email + is_active lookup
+        Index("ix_users_email_active", "email", postgresql_where=text("is_active")),
+    )
 
     full_name: Mapped[str] = mapped_column(String, nullable=False)
     email: Mapped[str] = mapped_column(String, unique=True, nullable=False)
@@ -29,9 +36,22 @@ class User(PrimaryUUIDTimestampedModel):
     def set_password(self, raw_password: str):
         self.password = self.__class__.hash_password(raw_password)
 
+    # Non-blocking variants for request handlers; these run in the hashing pool
+    @staticmethod
+    async def ahash_password(raw_password: str):
+        return await password_hasher.hash(raw_password)
+
+    async def acheck_password(self, raw_password: str):
+        return await password_hasher.verify(raw_password, self.password)
+
 
 class Business(PrimaryUUIDTimestampedModel):
     __tablename__ = "businesses"
+    __table_args__ = (
+        Index("ix_businesses_geo_band_longitude", "geo_band", "location_longitude"),
+        # Owner listing in keyset order: (owner_id, created_at, id)
+        Index("ix_businesses_owner_id_created_at", "owner_id", "created_at", "id"),
+    )
 
     name: Mapped[str] = mapped_column(String, unique=True, nullable=False)
 
@@ -39,6 +59,14 @@ class Business(PrimaryUUIDTimestampedModel):
 
     location_longitude: Mapped[float] = mapped_column(Float, nullable=False)
 
+    # 0.1 degree latitude band (~11 km), maintained by Postgres; see
+    # app/services/geo_services.py
+    geo_band: Mapped[int] = mapped_column(
+        Integer,
+        Computed("floor(location_latitude * 10)::integer", persisted=True),
+        nullable=False,
+    )
+
     users: Mapped[list["UserBusiness"]] = relationship(
         back_populates="business", cascade="all, delete-orphan"
     )
@@ -48,11 +76,16 @@ class Business(PrimaryUUIDTimestampedModel):
 
     email: Mapped[str | None] = mapped_column(String, nullable=True)
     phone_number: Mapped[str | None] = mapped_column(String, nullable=True)
-    display_picture: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # SHA-256 of the image in the blob store (app/services/blob_store.py)
+    display_picture: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
 
 class UserBusiness(BaseModel):
     __tablename__ = "user_business_association"
+    __table_args__ = (
+        # The composite primary key only serves lookups by user_id
+        Index("ix_user_business_association_business_id", "business_id"),
+    )
 
     user_id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
@@ -65,3 +98,45 @@ class UserBusiness(BaseModel):
 
     user: Mapped["User"] = relationship(back_populates="businesses")
     business: Mapped["Business"] = relationship(back_populates="users")
+
+
+class CheckIn(BaseModel):
+    """
+    A cleaner's GPS check-in at a business.
+
+    Partitioned by day on checked_in_at (app/services/check_ins.py creates
+    the partitions). Rows are written with COPY, so there are no foreign
+    keys to check per row; check-ins outlive the users and businesses they
+    refer to as history.
+    """
+
+    __tablename__ = "check_ins"
+    __table_args__ = (
+        Index("ix_check_ins_business_id_checked_in_at", "business_id", "checked_in_at"),
+        Index("ix_check_ins_user_id_checked_in_at", "user_id", "checked_in_at"),
+        {"postgresql_partition_by": "RANGE (checked_in_at)"},
+    )
+
+    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    # A partitioned table's primary key must include the partition key
+    checked_in_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    user_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    business_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    latitude: Mapped[float] = mapped_column(Float, nullable=False)
+    longitude: Mapped[float] = mapped_column(Float, nullable=False)
+    accuracy_m: Mapped[float | None] = mapped_column(Float, nullable=True)
+    distance_m: Mapped[float] = mapped_column(Float, nullable=False)
+    within_geofence: Mapped[bool] = mapped_column(nullable=False)
+    received_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+
+# Catches rows no daily partition covers, so a COPY never fails on them
+event.listen(
+    CheckIn.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS check_ins_default PARTITION OF check_ins DEFAULT"),
+)
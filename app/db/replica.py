@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.logger import get_logger
+from app.core.memory_cache import TTLCache
+
+logger = get_logger("replica")
+
+# Zero when the replica has replayed everything it received, or when the
+# target is not a standby at all (e.g. a second primary used in development)
+LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class ReplicaRouter:
+    """
+    Chooses the primary or the read replica for read-only requests.
+
+    Reads go to the replica unless none is configured, its last measured lag
+    exceeds ``max_lag`` (or the probe failed), or the requesting user wrote
+    something within the last ``sticky_seconds``. Stickiness is shared with
+    other workers over the invalidation bus, so a user's next read lands on
+    the primary whichever worker serves it.
+    """
+
+    def __init__(self, sticky_seconds: float, max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.primary: async_sessionmaker | None = None
+        self.replica: async_sessionmaker | None = None
+        self.lag: float | None = None
+        self.last_checked: float | None = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self._sticky = TTLCache(maxsize=100_000, ttl=sticky_seconds)
+        self._task: asyncio.Task | None = None
+
+    def start(
+        self, primary: async_sessionmaker, replica: async_sessionmaker | None
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        if replica is not None:
+            self._task = asyncio.create_task(self._probe_lag())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def replica_usable(self) -> bool:
+        return (
+            self.replica is not None
+            and self.lag is not None
+            and self.lag <= self.max_lag
+        )
+
+    def session_factory(self, user_id=None) -> async_sessionmaker:
+        if self.replica_usable and (
+            user_id is None or self._sticky.get(str(user_id)) is None
+        ):
+            self.replica_reads += 1
+            return self.replica
+        self.primary_reads += 1
+        return self.primary
+
+    def stick(self, user_ids: list[str]) -> None:
+        for user_id in user_ids:
+            self._sticky.set(user_id, True)
+
+    async def record_write(self, user_id) -> None:
+        """Pin the user's reads to the primary for the next sticky window."""
+        if self.replica is None:
+            return
+        self.stick([str(user_id)])
+        await invalidation_bus.publish("replica-sticky", [str(user_id)])
+
+    async def _probe_lag(self) -> None:
+        while True:
+            try:
+                async with self.replica() as session:
+                    lag = float((await session.execute(LAG_QUERY)).scalar_one())
+            except (SQLAlchemyError, OSError) as e:
+                if self.lag is not None:
+                    logger.error("Replica lag check failed: {}", e)
+                self.lag = None
+            else:
+                if self.lag is not None and lag > self.max_lag >= self.lag:
+                    logger.warning("Replica lag {:.1f}s, reading from primary", lag)
+                self.lag = lag
+            self.last_checked = time.time()
+            await asyncio.sleep(self.check_interval)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "configured": self.replica is not None,
+            "usable": self.replica_usable,
+            "lag_seconds": self.lag,
+            "last_checked": self.last_checked,
+            "sticky_users": len(self._sticky),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+        }
+
+
+replica_router = ReplicaRouter(
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+)
+invalidation_bus.subscribe("replica-sticky", replica_router.stick)
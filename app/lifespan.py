@@ -1,16 +1,25 @@
+import asyncio
 from contextlib import asynccontextmanager
 from collections.abc import AsyncGenerator
-import ssl 
 
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.bootstrap import create_admin_user_if_not_exists
 from app.core.config import settings
-from app.db.models import User
-from app.schemas.users import UserRole
+from app.core.cache import _setup_redis, _shutdown_redis
+from app.core.invalidation import invalidation_bus
+from app.core.jobs import JobWorker, MemoryJobBackend, RedisJobBackend, job_queue
+from app.core.logger import get_logger
+from app.core.rate_limit import rate_limiter
+from app.core.security import password_hasher
+from app.core.startup import startup_timings
+from app.db.engine import build_engine, ssl_context, warm_pool
+from app.db.replica import replica_router
+from app.services.business_cache import business_cache
+from app.services.check_ins import check_in_buffer
+from app.services.email import mailer
 
-
-ssl_context = ssl.create_default_context(cafile="app/ca.pem")
+logger = get_logger("lifespan")
 
 
 def _setup_db(app: FastAPI) -> None:  # pragma: no cover
@@ -23,45 +32,111 @@ def _setup_db(app: FastAPI) -> None:  # pragma: no cover
 
     :param app: fastAPI application.
     """
-    engine = create_async_engine(str(settings.db_url), connect_args={"ssl": ssl_context},
-    echo=settings.DB_ECHO,)
+    engine = build_engine(str(settings.db_url), connect_args={"ssl": ssl_context()})
     session_factory = async_sessionmaker(
         engine,
         expire_on_commit=False,
     )
     app.state.db_engine = engine
     app.state.db_session_factory = session_factory
+    # Read-only transactions: BEGIN READ ONLY, released with a rollback
+    read_session_factory = async_sessionmaker(
+        engine.execution_options(postgresql_readonly=True),
+        expire_on_commit=False,
+    )
+    app.state.db_read_session_factory = read_session_factory
+
+    app.state.db_replica_engine = None
+    replica_factory = None
+    if settings.replica_db_url is not None:
+        replica_engine = build_engine(
+            str(settings.replica_db_url), connect_args={"ssl": ssl_context()}
+        )
+        replica_factory = async_sessionmaker(
+            replica_engine.execution_options(postgresql_readonly=True),
+            expire_on_commit=False,
+        )
+        app.state.db_replica_engine = replica_engine
+        business_cache.reinvalidate_after = settings.REPLICA_MAX_LAG_SECONDS
+    replica_router.start(read_session_factory, replica_factory)
+
+
+async def _warm_pool(app: FastAPI) -> None:
+    with startup_timings.phase("pool_warmup"):
+        await warm_pool(app.state.db_engine, settings.DB_POOL_WARMUP_CONNECTIONS)
+
+
+def _setup_jobs(app: FastAPI) -> asyncio.Task | None:
+    """
+    Binds the job queue. With the memory backend nothing outside this
+    process can see the queues, so a worker runs here; returns its task.
+    """
+    if settings.JOBS_BACKEND == "memory":
+        job_queue.bind(MemoryJobBackend(settings.JOBS_DEAD_LETTER_SIZE))
+        app.state.job_worker_stop = asyncio.Event()
+        worker = JobWorker(job_queue, job_queue.queues)
+        return asyncio.create_task(worker.run(app.state.job_worker_stop))
+    job_queue.bind(
+        RedisJobBackend(
+            app.state.redis,
+            dead_letter_size=settings.JOBS_DEAD_LETTER_SIZE,
+            heartbeat_ttl=settings.JOBS_HEARTBEAT_SECONDS * 3,
+        )
+    )
+    return None
+
+
+async def _warm_hasher() -> None:
+    with startup_timings.phase("hasher_warmup"):
+        await password_hasher.warm()
 
 
 @asynccontextmanager
 async def lifespan_setup(app: FastAPI) -> AsyncGenerator[None, None]:
     app.middleware_stack = None
-    _setup_db(app)
+    with startup_timings.phase("db_setup"):
+        _setup_db(app)
+    # Runs while the rest of startup proceeds; awaited before serving
+    pool_warmup = None
+    if settings.DB_POOL_WARMUP_CONNECTIONS > 0:
+        pool_warmup = asyncio.create_task(_warm_pool(app))
+    _setup_redis(app)
+    business_cache.bind(app.state.redis, app.state.redis_health)
+    rate_limiter.bind(app.state.redis, app.state.redis_health)
+    await invalidation_bus.start(app.state.redis)
+    job_worker = _setup_jobs(app)
+    password_hasher.start()
+    # Not awaited: spawning the workers takes seconds, and only logins need them
+    hasher_warmup = None
+    if settings.PASSWORD_HASHING_WARMUP:
+        hasher_warmup = asyncio.create_task(_warm_hasher())
     app.middleware_stack = app.build_middleware_stack()
 
-    # # Create admin user if not exists
-    async with app.state.db_session_factory() as session:
-        await create_admin_user_if_not_exists(session)
+    if settings.BOOTSTRAP_ON_STARTUP:
+        with startup_timings.phase("bootstrap"):
+            async with app.state.db_session_factory() as session:
+                await create_admin_user_if_not_exists(session)
+    if pool_warmup is not None:
+        await pool_warmup
+    check_in_buffer.bind(app.state.db_engine)
+    with startup_timings.phase("check_in_partitions"):
+        await check_in_buffer.start()
+    startup_timings.mark_ready()
+    logger.info(startup_timings.summary())
 
     yield
+    # Before the engine is disposed: stores what is still buffered
+    await check_in_buffer.stop()
+    if hasher_warmup is not None:
+        hasher_warmup.cancel()
+    password_hasher.shutdown()
+    if job_worker is not None:
+        app.state.job_worker_stop.set()
+        await job_worker
+        await asyncio.to_thread(mailer.close)
+    await invalidation_bus.stop()
+    await _shutdown_redis(app)
+    await replica_router.stop()
+    if app.state.db_replica_engine is not None:
+        await app.state.db_replica_engine.dispose()
     await app.state.db_engine.dispose()
-
-
-async def create_admin_user_if_not_exists(session: AsyncSession) -> None:
-    result = await session.execute(
-        select(User).where(User.email == "admin@complycenter.com")
-    )
-    admin_user = result.scalar_one_or_none()
-
-    if not admin_user:
-        admin = User(
-            email="admin@complycenter.com",
-            full_name="admin",
-            password=User.hash_password("AdminPassword123!"),
-            user_role=UserRole.ADMIN,
-        )
-        session.add(admin)
-        await session.commit()
-        print("✅ Admin user created")
-    else:
-        print("ℹ️ Admin user already exists")
@@ -1,13 +1,17 @@
+# First, so startup timings include every import below
+from app.core.startup import startup_timings
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 
 from app.lifespan import lifespan_setup
 from app.api.v1 import v1router
-from app.core.logger import get_logger
-
-# Initialize logger
-logger = get_logger("main")
+from app.core.config import settings
+from app.core.jobs import job_queue
+from app.core.logger import render_metrics as render_log_metrics
+from app.core.timing import TimingMiddleware, route_metrics
+from app.services.check_ins import check_in_buffer
 
 
 app = FastAPI(
@@ -15,6 +19,7 @@ app = FastAPI(
     description="API for managing cleaning operations across multiple business locations.",
     version="1.0.0",
     lifespan=lifespan_setup,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -23,15 +28,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods; restrict in production
     allow_headers=["*"],  # Allow all headers; restrict in production
+    expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
 )
+app.add_middleware(TimingMiddleware, server_timing=settings.SERVER_TIMING_HEADER)
 
 @app.get("/health", include_in_schema=False)
 async def health_check():
     """
     Health check endpoint to verify API is running.
     """
-    logger.info("Health check endpoint accessed")
     return {"status": "ok", "message": "ComplyCentre API is running"}
 
 
+@app.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+async def metrics():
+    """
+    Per-route request metrics in the Prometheus text exposition format, with
+    the background job queues' depth, outcomes and latency, the check-in
+    buffer's, and the log records dropped by sampling, rate limiting or a
+    full write queue.
+    """
+    return PlainTextResponse(
+        route_metrics.render()
+        + startup_timings.render()
+        + await job_queue.render()
+        + check_in_buffer.render()
+        + render_log_metrics(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 app.include_router(v1router)
+startup_timings.mark("import")
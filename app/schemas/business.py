@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Optional, List
 from uuid import UUID
 
+BLOB_HASH_PATTERN = r"^[0-9a-f]{64}$"
+
 
 class Location(BaseModel):
     latitude: float
@@ -14,5 +16,55 @@ class BusinessBase(BaseModel):
     user: Optional[List[UUID]] = None
     email: Optional[str] = None
     phone_number: Optional[str] = None
-    display_picture: Optional[str] = None
+    display_picture: Optional[str] = Field(
+        None,
+        pattern=BLOB_HASH_PATTERN,
+        description="Hash returned by POST /blobs for an uploaded image",
+    )
     owner_id: Optional[UUID] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def from_business_row(cls, data: Any) -> Any:
+        """Accept Business rows, which store the location as two columns."""
+        if not hasattr(data, "location_latitude"):
+            return data
+        return {
+            "name": data.name,
+            "location": {
+                "latitude": data.location_latitude,
+                "longitude": data.location_longitude,
+            },
+            "email": data.email,
+            "phone_number": data.phone_number,
+            "display_picture": data.display_picture,
+            "owner_id": data.owner_id,
+        }
+
+    def to_model_fields(self, exclude: set[str] | None = None) -> dict:
+        """Column values for the Business model."""
+        data = self.model_dump(exclude={"location", "user"} | (exclude or set()))
+        data["location_latitude"] = self.location.latitude
+        data["location_longitude"] = self.location.longitude
+        return data
+
+
+class BusinessPage(BaseModel):
+    items: List[BusinessBase]
+    next_cursor: Optional[str] = None
+
+
+class NearbyBusiness(BusinessBase):
+    id: UUID
+    distance_m: float
+
+    @model_validator(mode="before")
+    @classmethod
+    def from_nearby_row(cls, data: Any) -> Any:
+        if not hasattr(data, "distance_m"):
+            return data
+        return {
+            **BusinessBase.from_business_row(data),
+            "id": data.id,
+            "distance_m": data.distance_m,
+        }
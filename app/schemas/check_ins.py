@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import AwareDatetime, BaseModel, Field
+
+
+class CreateCheckIn(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    # Reported GPS accuracy, stored for review
+    accuracy_m: Optional[float] = Field(None, ge=0)
+    # When the device recorded it; defaults to when it was received
+    checked_in_at: Optional[AwareDatetime] = None
+
+
+class CheckInAccepted(BaseModel):
+    id: UUID
+    checked_in_at: datetime
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr, field_serializer
 from enum import Enum
+from typing import Optional
 import uuid
 
 
@@ -35,6 +36,33 @@ class ReturnUser(BaseModel):
         from_attributes = True
 
 
+class MemberBusiness(BaseModel):
+    """A business the user is assigned to."""
+    id: uuid.UUID
+    name: str
+
+    class Config:
+        from_attributes = True
+
+
+class UserProfile(ReturnUser):
+    """
+    The signed-in user with the businesses they are assigned to.
+    """
+    businesses: list[MemberBusiness] = []
+
+
+class InviteStatus(str, Enum):
+    CREATED = "created"
+    EXISTS = "exists"
+
+
+class BatchInviteResult(BaseModel):
+    email: EmailStr
+    status: InviteStatus
+    user: Optional[ReturnUser] = None
+
+
 class UserLogin(BaseModel):
     email: str
     password: str
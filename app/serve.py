@@ -0,0 +1,99 @@
+"""
+Production launcher: several uvicorn workers behind one listening socket.
+
+    python -m app.serve [--workers N] [--port 8000]
+
+Workers run uvloop and httptools and default to one per available CPU
+(``SERVER_WORKERS``). Each worker is replaced once it has served about
+``SERVER_MAX_REQUESTS`` requests, finishing in-flight requests first;
+the supervisor starts a new one in its place, and SIGHUP replaces them all.
+
+Each worker keeps its own in-process caches, kept coherent through the
+Redis invalidation bus (app.core.invalidation), and its own database pool:
+keep ``workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` under the server's
+max_connections. /metrics reports the worker that answered.
+"""
+
+import argparse
+import os
+import random
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app.core.config import settings
+
+
+def available_cpus() -> int:
+    try:
+        # CPUs this process may run on, which respects container limits
+        # set through cpusets
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class WorkerConfig(uvicorn.Config):
+    """
+    uvicorn's Config, with a max-requests limit of its own in each worker.
+
+    Workers started together serve similar traffic; with one shared limit
+    they would all restart at the same moment. The config is pickled into
+    every worker process, which is where the jitter is drawn.
+    """
+
+    def __init__(self, *args, max_requests_jitter: int = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_requests_jitter = max_requests_jitter
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.limit_max_requests and self.max_requests_jitter:
+            self.limit_max_requests += random.randint(0, self.max_requests_jitter)
+
+
+def build_config(workers: int, host: str, port: int) -> WorkerConfig:
+    return WorkerConfig(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        limit_max_requests=settings.SERVER_MAX_REQUESTS or None,
+        max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE_TIMEOUT,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        # TimingMiddleware logs requests through the sampled app logger
+        access_log=False,
+        log_level=settings.LOG_LEVEL.lower(),
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--workers", type=int, default=settings.SERVER_WORKERS or available_cpus()
+    )
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument(
+        "--port", type=int, default=int(os.environ.get("PORT", settings.SERVER_PORT))
+    )
+    args = parser.parse_args(argv)
+
+    if args.workers > 1 and "LOG_FILE_ENABLED" not in settings.model_fields_set:
+        # Inherited by the workers, whose settings are built at import
+        os.environ["LOG_FILE_ENABLED"] = "false"
+
+    config = build_config(args.workers, args.host, args.port)
+    server = uvicorn.Server(config)
+    if args.workers > 1:
+        Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+
+
+if __name__ == "__main__":
+    main()
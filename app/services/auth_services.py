@@ -1,24 +1,87 @@
+import asyncio
+
 from fastapi import Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.dialects.postgresql import insert
 from pydantic import EmailStr
 
-from app.db.models import User
+from app.core.jobs import job_queue
+from app.core.security import password_hasher
+from app.db.models import User, UserBusiness
 from app.db.dependencies import get_db_session
+from app.schemas.users import CreateUser
+from app.services.email import invitation_email
+
+TEMPORARY_PASSWORD = "defaultpassword"
 
 
 async def create_user(
     user_data: dict,
     session: AsyncSession,
 ):
-    user_data["password"] = User.hash_password("defaultpassword")
+    user_data["password"] = await User.ahash_password(TEMPORARY_PASSWORD)
     db_user = User(**user_data)
     session.add(db_user)
+    job_queue.enqueue_after_commit(
+        session,
+        "send_email",
+        invitation_email(db_user.email, db_user.full_name, TEMPORARY_PASSWORD),
+    )
     await session.commit()
     await session.refresh(db_user)
     return db_user
 
 
+async def create_users(
+    users_data: list[CreateUser],
+    session: AsyncSession,
+) -> dict[str, User | None]:
+    """
+    Create many users with one existence query and one INSERT.
+
+    Returns every requested email mapped to its new user, or to None when
+    the email was already registered. Repeated emails are created once.
+    """
+    pending = {user_data.email: user_data for user_data in users_data}
+    result = await session.execute(select(User.email).where(User.email.in_(pending)))
+    outcomes: dict[str, User | None] = {email: None for email in result.scalars()}
+    for email in outcomes:
+        del pending[email]
+    if not pending:
+        return outcomes
+
+    # At most one hash per worker in flight: submitting the whole batch at
+    # once would overflow the hashing queue and be rejected with 503s
+    limit = asyncio.Semaphore(password_hasher.max_workers)
+
+    async def hash_password() -> str:
+        async with limit:
+            return await User.ahash_password(TEMPORARY_PASSWORD)
+
+    hashes = await asyncio.gather(*(hash_password() for _ in pending))
+    # ON CONFLICT covers emails registered between the check and the insert
+    created = await session.scalars(
+        insert(User).on_conflict_do_nothing(index_elements=[User.email]).returning(User),
+        [
+            {**user_data.model_dump(), "password": password}
+            for user_data, password in zip(pending.values(), hashes)
+        ],
+    )
+    outcomes.update(dict.fromkeys(pending))
+    outcomes.update({user.email: user for user in created.all()})
+    for email, user in outcomes.items():
+        if email in pending and user is not None:
+            job_queue.enqueue_after_commit(
+                session,
+                "send_email",
+                invitation_email(user.email, user.full_name, TEMPORARY_PASSWORD),
+            )
+    await session.commit()
+    return outcomes
+
+
 async def get_user(email: EmailStr, session: AsyncSession):
     query = select(User).where(User.email == email)
     result = await session.execute(query)
@@ -37,13 +100,32 @@ async def get_active_user(email: EmailStr, session: AsyncSession):
     return user
 
 
+async def get_active_user_with_businesses(user_id, session: AsyncSession) -> User:
+    """
+    An active user with their business memberships, in one joined query.
+
+    The memberships must be loaded here: lazy loading them later would cost
+    a query per business, and is not possible at all under asyncio.
+    """
+    query = (
+        select(User)
+        .options(joinedload(User.businesses).joinedload(UserBusiness.business))
+        .where(User.id == user_id, User.is_active == True)
+    )
+    result = await session.execute(query)
+    user = result.unique().scalar_one_or_none()
+    if not user:
+        raise HTTPException(detail="No active user found", status_code=401)
+    return user
+
+
 async def authenticate_user(
     email: str,
     password: str,
     session : AsyncSession
 ):
     user = await get_active_user(email, session)
-    if not user.check_password(password):
+    if not await user.acheck_password(password):
         raise HTTPException(detail="Invalid Credentials", status_code=400)
     return user
 
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("blob_store")
+
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_media_type(head: bytes) -> str | None:
+    """Image type from the first bytes of a file, or None if unsupported."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, media_type in _SIGNATURES:
+        if head.startswith(signature):
+            return media_type
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _media_type_of(path: Path) -> str:
+    with open(path, "rb") as f:
+        return sniff_media_type(f.read(12)) or "application/octet-stream"
+
+
+class BlobTooLarge(Exception):
+    pass
+
+
+class ImageTooLarge(Exception):
+    """The image decodes to more pixels than Pillow will render."""
+
+
+class BlobStore:
+    """
+    Content-addressed files on local disk.
+
+    A blob is stored once under its SHA-256 at ``<root>/<aa>/<bb>/<digest>``
+    and never changes, so it can be cached forever. Thumbnails are rendered
+    on first request and kept under ``<root>/thumbs/<size>/``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).is_file()
+
+    def media_type(self, path: Path) -> str:
+        return _media_type_of(path)
+
+    def _tempfile(self):
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+
+    def _commit(self, tmp_path: str, digest: str) -> None:
+        target = self.path(digest)
+        if target.exists():
+            os.unlink(tmp_path)
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, target)
+
+    async def save(self, chunks: AsyncIterator[bytes]) -> str:
+        """Stream chunks to disk, hashing as they arrive; returns the digest."""
+        sha256 = hashlib.sha256()
+        size = 0
+        tmp = await asyncio.to_thread(self._tempfile)
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise BlobTooLarge(f"Blob exceeds {self.max_bytes} bytes")
+                sha256.update(chunk)
+                await asyncio.to_thread(tmp.write, chunk)
+            await asyncio.to_thread(tmp.close)
+            digest = sha256.hexdigest()
+            await asyncio.to_thread(self._commit, tmp.name, digest)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+        return digest
+
+    def put_bytes(self, data: bytes) -> str:
+        """Synchronous save for scripts and migrations."""
+        digest = hashlib.sha256(data).hexdigest()
+        if not self.exists(digest):
+            with self._tempfile() as tmp:
+                tmp.write(data)
+            self._commit(tmp.name, digest)
+        return digest
+
+    async def thumbnail(self, digest: str, size: int) -> Path:
+        target = self.root / "thumbs" / str(size) / digest
+        if not target.exists():
+            await asyncio.to_thread(self._render_thumbnail, digest, size, target)
+        return target
+
+    def _render_thumbnail(self, digest: str, size: int, target: Path) -> None:
+        # Imported here; Pillow is only needed once a thumbnail is requested
+        from PIL import Image
+
+        try:
+            # Refuses images past Image.MAX_IMAGE_PIXELS, which a small
+            # compressed file can declare (a decompression bomb)
+            with Image.open(self.path(digest)) as image:
+                image_format = image.format
+                image.thumbnail((size, size))
+                with self._tempfile() as tmp:
+                    image.save(tmp, format=image_format)
+        except Image.DecompressionBombError as e:
+            raise ImageTooLarge(str(e)) from e
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp.name, target)
+        logger.debug("Rendered {}px thumbnail for blob {}", size, digest)
+
+
+blob_store = BlobStore(
+    Path(settings.BLOB_STORE_PATH), max_bytes=settings.BLOB_MAX_BYTES
+)
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.cache import RedisHealth
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.logger import get_logger
+from app.core.memory_cache import TTLCache
+
+logger = get_logger("business_cache")
+
+Loader = Callable[[], Awaitable[str | bytes | None]]
+
+
+# Bump the version when the cached payload format changes, so entries left
+# in Redis by a previous release are never read
+KEY_VERSION = 2
+
+
+def business_key(business_id) -> str:
+    return f"business:v{KEY_VERSION}:{business_id}"
+
+
+def owner_key(owner_id) -> str:
+    return f"business:v{KEY_VERSION}:owner:{owner_id}"
+
+
+class BusinessCache:
+    """
+    Two-tier read-through cache of serialized business payloads.
+
+    Reads go to an in-process LRU first, then Redis, then the loader. A local
+    entry past its fresh TTL is still served for up to ``stale_ttl`` seconds
+    while a single background task refreshes it. Concurrent misses for one
+    key share a single load.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, redis_ttl: int, stale_ttl: float):
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self.stale_ttl = stale_ttl
+        self.redis: Redis | None = None
+        self.redis_health: RedisHealth | None = None
+        self.redis_hits = 0
+        self.loads = 0
+        self.stale_served = 0
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl)
+        self._inflight: dict[str, asyncio.Task] = {}
+        # With a read replica, keys are invalidated a second time once the
+        # replica has caught up, dropping anything re-read from it meanwhile
+        self.reinvalidate_after = 0.0
+        self._pending: set[asyncio.Task] = set()
+        # Bumped on every invalidation; a load that started before the bump
+        # must not repopulate the cache with what it read.
+        self._epoch = 0
+
+    def bind(self, redis: Redis, health: RedisHealth) -> None:
+        self.redis = redis
+        self.redis_health = health
+
+    def _redis_usable(self) -> bool:
+        return self.redis is not None and self.redis_health.healthy
+
+    async def get(self, key: str, loader: Loader) -> str | bytes | None:
+        entry = self._local.get(key)
+        if entry is not None:
+            fresh_until, payload = entry
+            if fresh_until <= time.monotonic():
+                self.stale_served += 1
+                self._start_fetch(key, loader)
+            return payload
+        return await asyncio.shield(self._start_fetch(key, loader))
+
+    def _start_fetch(self, key: str, loader: Loader) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._fetch_done(key, t))
+        return task
+
+    def _fetch_done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to load {}: {}", key, task.exception())
+
+    async def _fetch(self, key: str, loader: Loader) -> str | bytes | None:
+        epoch = self._epoch
+        payload = None
+        if self._redis_usable():
+            try:
+                payload = await self.redis.get(key)
+            except RedisError as e:
+                logger.warning("Redis read failed for {}: {}", key, e)
+        if payload is not None:
+            self.redis_hits += 1
+        else:
+            self.loads += 1
+            payload = await loader()
+            if payload is None:
+                return None
+            if self._redis_usable() and epoch == self._epoch:
+                try:
+                    await self.redis.set(key, payload, ex=self.redis_ttl)
+                except RedisError as e:
+                    logger.warning("Redis write failed for {}: {}", key, e)
+        if epoch == self._epoch:
+            self._local.set(key, (time.monotonic() + self.ttl, payload))
+        return payload
+
+    def evict(self, keys: list[str]) -> None:
+        self._epoch += 1
+        for key in keys:
+            self._local.pop(key)
+
+    async def invalidate(self, *keys: str) -> None:
+        """Drop keys here, in Redis and, via pub/sub, in every other worker."""
+        self.evict(list(keys))
+        if self._redis_usable():
+            try:
+                await self.redis.delete(*keys)
+            except RedisError as e:
+                logger.warning("Redis delete failed for {}: {}", keys, e)
+        await invalidation_bus.publish("business", list(keys))
+        if self.reinvalidate_after:
+            task = asyncio.create_task(self._invalidate_later(keys))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _invalidate_later(self, keys: tuple[str, ...]) -> None:
+        await asyncio.sleep(self.reinvalidate_after)
+        self.evict(list(keys))
+        if self._redis_usable():
+            try:
+                await self.redis.delete(*keys)
+            except RedisError as e:
+                logger.warning("Redis delete failed for {}: {}", keys, e)
+        await invalidation_bus.publish("business", list(keys))
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._local.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            **self._local.stats,
+            "redis_hits": self.redis_hits,
+            "loads": self.loads,
+            "stale_served": self.stale_served,
+        }
+
+
+business_cache = BusinessCache(
+    maxsize=settings.BUSINESS_CACHE_SIZE,
+    ttl=settings.BUSINESS_CACHE_TTL_SECONDS,
+    redis_ttl=settings.BUSINESS_CACHE_REDIS_TTL_SECONDS,
+    stale_ttl=settings.BUSINESS_CACHE_STALE_SECONDS,
+)
+invalidation_bus.subscribe("business", business_cache.evict)
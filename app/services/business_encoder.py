@@ -0,0 +1,85 @@
+from collections.abc import Iterable
+
+import orjson
+
+from app.core.config import settings
+from app.core.memory_cache import TTLCache
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _dumps(value) -> bytes:
+    # asyncpg returns its own uuid.UUID subclass, which orjson leaves to default
+    return orjson.dumps(value, default=str)
+
+
+def business_fields(row) -> dict:
+    """
+    A Business row in the shape of BusinessBase, field for field.
+
+    Rows were validated when they were written, so responses are built from
+    them directly instead of going through the pydantic model again. Keep
+    the keys in step with BusinessBase.
+    """
+    return {
+        "name": row.name,
+        "location": {
+            "latitude": row.location_latitude,
+            "longitude": row.location_longitude,
+        },
+        "user": None,
+        "email": row.email,
+        "phone_number": row.phone_number,
+        "display_picture": row.display_picture,
+        "owner_id": row.owner_id,
+    }
+
+
+def nearby_fields(row) -> dict:
+    """A nearby-search row in the shape of NearbyBusiness."""
+    return {**business_fields(row), "id": row.id, "distance_m": row.distance_m}
+
+
+def encode_nearby(rows: Iterable) -> bytes:
+    # Distances differ per search, so these rows are not cached
+    return _dumps([nearby_fields(row) for row in rows])
+
+
+class BusinessEncoder:
+    """
+    Encodes Business rows to JSON bytes with orjson, keeping the bytes of
+    each row version.
+
+    Entries are keyed by (id, updated_at, owner_id), so an unchanged
+    business is encoded once however many pages and streams it appears in.
+    owner_id is part of the key because deleting the owner nulls it without
+    touching updated_at; the TTL bounds any other out-of-band edit.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._encoded = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def encode(self, row) -> bytes:
+        key = (row.id, row.updated_at, row.owner_id)
+        data = self._encoded.get(key)
+        if data is None:
+            data = _dumps(business_fields(row))
+            self._encoded.set(key, data)
+        return data
+
+    def encode_list(self, rows: Iterable) -> bytes:
+        return b"[" + b",".join(self.encode(row) for row in rows) + b"]"
+
+    def encode_lines(self, rows: Iterable) -> bytes:
+        """Newline-delimited JSON, one row per line."""
+        return b"".join(self.encode(row) + b"\n" for row in rows)
+
+    @property
+    def stats(self) -> dict:
+        return self._encoded.stats
+
+
+business_encoder = BusinessEncoder(
+    maxsize=settings.BUSINESS_ENCODED_CACHE_SIZE,
+    ttl=settings.BUSINESS_CACHE_REDIS_TTL_SECONDS,
+)
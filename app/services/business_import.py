@@ -0,0 +1,250 @@
+import csv
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.db.models import Business
+from app.schemas.business import BusinessBase
+
+logger = get_logger("business_import")
+
+CSV_MEDIA_TYPE = "text/csv"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class InvalidRecord(ValueError):
+    """A record that could not be split off the body; reported as invalid."""
+
+
+class _RecordSplitter:
+    """
+    Joins lines into records, keeping a line break inside a quoted field.
+
+    Quote parity is updated one line at a time, so a record costs time
+    linear in its length. A record still open past ``max_chars`` is given
+    up on: its first line becomes an InvalidRecord and the lines after it
+    are split again, so one stray quote loses one row, not the rest of
+    the body.
+    """
+
+    def __init__(self, quoted: bool, max_chars: int):
+        self.quoted = quoted
+        self.max_chars = max_chars
+        self._reset()
+
+    def _reset(self) -> None:
+        self.lines: list[str] = []
+        self.size = 0
+        self.open = False
+
+    def feed(self, line: str) -> list[str | InvalidRecord]:
+        records: list[str | InvalidRecord] = []
+        lines = deque([line])
+        while lines:
+            line = lines.popleft()
+            self.lines.append(line)
+            self.size += len(line) + 1
+            if self.quoted and line.count('"') % 2:
+                self.open = not self.open
+            if self.open:
+                if self.size > self.max_chars:
+                    lines.extendleft(reversed(self._give_up(records)))
+                continue
+            record = "\n".join(self.lines)
+            self._reset()
+            if record.strip():
+                records.append(record.rstrip("\r"))
+        return records
+
+    def finish(self) -> list[str | InvalidRecord]:
+        """Records left at the end of the body, closing any open one."""
+        records: list[str | InvalidRecord] = []
+        while self.lines:
+            for line in self._give_up(records):
+                records += self.feed(line)
+        return records
+
+    def _give_up(self, records: list) -> list[str]:
+        # Returns the lines after the first, to be split again
+        rest = self.lines[1:]
+        self._reset()
+        records.append(InvalidRecord("Unterminated quoted field"))
+        return rest
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes],
+    quoted: bool = False,
+    max_chars: int = settings.BUSINESS_IMPORT_MAX_RECORD_CHARS,
+) -> AsyncGenerator[str | InvalidRecord, None]:
+    """
+    Split a streamed body into records without buffering the whole body.
+
+    With ``quoted`` (CSV), a line break inside a quoted field does not end
+    the record: a record is only complete once its quotes are balanced.
+    Records and lines longer than ``max_chars``, and lines that are not
+    UTF-8, are yielded as an InvalidRecord instead, so memory stays bounded
+    and the rest of the body is still read.
+    """
+    splitter = _RecordSplitter(quoted, max_chars)
+    pending = b""
+    # Dropping the rest of an overlong line
+    skipping = False
+
+    def split(line: bytes) -> list[str | InvalidRecord]:
+        # A newline byte never occurs inside a UTF-8 sequence, so each line
+        # decodes on its own
+        try:
+            return splitter.feed(line.decode())
+        except UnicodeDecodeError as e:
+            return [*splitter.finish(), InvalidRecord(f"Not valid UTF-8: {e}")]
+
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        if skipping and lines:
+            lines = lines[1:]
+            skipping = False
+        if skipping:
+            pending = b""
+        for line in lines:
+            for record in split(line):
+                yield record
+        if len(pending) > max_chars:
+            for record in splitter.finish():
+                yield record
+            yield InvalidRecord(f"Line longer than {max_chars} characters")
+            pending = b""
+            skipping = True
+    if not skipping:
+        for record in split(pending):
+            yield record
+    for record in splitter.finish():
+        yield record
+
+
+def _csv_row(header: list[str], record: str) -> dict:
+    values = dict(zip(header, next(csv.reader([record]))))
+    return {
+        "name": values.get("name"),
+        "location": {
+            "latitude": values.get("latitude"),
+            "longitude": values.get("longitude"),
+        },
+        "email": values.get("email") or None,
+        "phone_number": values.get("phone_number") or None,
+        "display_picture": values.get("display_picture") or None,
+    }
+
+
+def _report(row: int, name: str | None, status: str, errors=None) -> bytes:
+    line = {"row": row, "name": name, "status": status}
+    if errors:
+        line["errors"] = errors
+    return orjson.dumps(line) + b"\n"
+
+
+class BusinessImporter:
+    """
+    Validates streamed business rows and inserts them in batches.
+
+    Each batch is a single ``INSERT ... ON CONFLICT (name) DO NOTHING
+    RETURNING name``; names that come back were created, the rest already
+    existed. Only the current batch is held in memory, and the per-row
+    report is yielded as NDJSON as each batch completes.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, owner_id):
+        self.session_factory = session_factory
+        self.owner_id = owner_id
+        self.counts = {"created": 0, "duplicate": 0, "invalid": 0}
+
+    async def run(
+        self, chunks: AsyncIterator[bytes], media_type: str
+    ) -> AsyncGenerator[bytes, None]:
+        started = time.perf_counter()
+        header = None
+        batch: list[tuple[int, BusinessBase]] = []
+        row = 0
+
+        async for record in iter_records(chunks, quoted=media_type == CSV_MEDIA_TYPE):
+            if isinstance(record, InvalidRecord):
+                row += 1
+                self.counts["invalid"] += 1
+                yield _report(row, None, "invalid", [str(record)])
+                continue
+            if media_type == CSV_MEDIA_TYPE and header is None:
+                header = [column.strip() for column in next(csv.reader([record]))]
+                continue
+            row += 1
+            try:
+                data = (
+                    _csv_row(header, record)
+                    if media_type == CSV_MEDIA_TYPE
+                    else orjson.loads(record)
+                )
+                batch.append((row, BusinessBase.model_validate(data)))
+            except (ValidationError, ValueError, csv.Error) as e:
+                self.counts["invalid"] += 1
+                errors = (
+                    [
+                        f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                        for err in e.errors(include_url=False)
+                    ]
+                    if isinstance(e, ValidationError)
+                    else [str(e)]
+                )
+                yield _report(row, None, "invalid", errors)
+                continue
+            if len(batch) >= settings.BUSINESS_IMPORT_BATCH_SIZE:
+                yield await self._flush(batch)
+                batch = []
+        if batch:
+            yield await self._flush(batch)
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            **self.counts,
+            "rows": row,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(row / elapsed, 1) if elapsed else None,
+        }
+        logger.info("Business import finished: {}", summary)
+        yield orjson.dumps({"summary": summary}) + b"\n"
+
+    async def _flush(self, batch: list[tuple[int, BusinessBase]]) -> bytes:
+        values, names = [], set()
+        for _, business in batch:
+            # A repeated name within one batch is reported as a duplicate
+            if business.name in names:
+                continue
+            names.add(business.name)
+            business.owner_id = self.owner_id
+            values.append(business.to_model_fields())
+
+        statement = (
+            insert(Business)
+            .on_conflict_do_nothing(index_elements=[Business.name])
+            .returning(Business.name)
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(statement, values)
+            created = set(result.scalars().all())
+            await session.commit()
+
+        report = []
+        for row, business in batch:
+            if business.name in created:
+                created.discard(business.name)
+                status = "created"
+            else:
+                status = "duplicate"
+            self.counts[status] += 1
+            report.append(_report(row, business.name, status))
+        return b"".join(report)
@@ -0,0 +1,137 @@
+from sqlalchemy import Row, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.conditional import pack
+from app.db.models import Business, User, UserBusiness
+from app.services.business_encoder import business_encoder
+
+# Every statement below is a single round trip: the ownership check lives in
+# the WHERE clause and the resulting row comes back through RETURNING.
+business_columns = Business.__table__.c
+
+
+async def insert_business(session: AsyncSession, fields: dict) -> Row | None:
+    """Insert a business; None if the name is already taken."""
+    result = await session.execute(
+        insert(Business)
+        .values(**fields)
+        .on_conflict_do_nothing(index_elements=[Business.name])
+        .returning(*business_columns)
+    )
+    return result.one_or_none()
+
+
+async def update_owned_business(
+    session: AsyncSession, business_id, owner_id, fields: dict
+) -> Row | None:
+    """Update a business owned by owner_id; None if there is no such business."""
+    result = await session.execute(
+        update(Business)
+        .where(Business.id == business_id, Business.owner_id == owner_id)
+        .values(**fields)
+        .returning(*business_columns)
+    )
+    return result.one_or_none()
+
+
+async def delete_owned_business(
+    session: AsyncSession, business_id, owner_id
+) -> Row | None:
+    """Delete a business owned by owner_id; None if there is no such business."""
+    result = await session.execute(
+        delete(Business)
+        .where(Business.id == business_id, Business.owner_id == owner_id)
+        .returning(*business_columns)
+    )
+    return result.one_or_none()
+
+
+async def load_business_payload(
+    session_factory: async_sessionmaker, business_id
+) -> bytes | None:
+    """A business as cached by business_cache (see pack()); None if missing."""
+    async with session_factory() as session:
+        result = await session.execute(
+            select(Business.__table__).where(Business.id == business_id)
+        )
+        row = result.one_or_none()
+    if row is None:
+        return None
+    return pack(business_encoder.encode(row), row.updated_at.timestamp())
+
+
+async def business_exists(session: AsyncSession, business_id) -> bool:
+    """Tells a missing business from someone else's after a write matched nothing."""
+    result = await session.execute(
+        select(Business.id).where(Business.id == business_id)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def owns_business(session: AsyncSession, business_id, owner_id) -> bool:
+    result = await session.execute(
+        select(Business.id).where(
+            Business.id == business_id, Business.owner_id == owner_id
+        )
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def add_business_member(session: AsyncSession, business_id, user_id) -> bool:
+    """
+    Assign a user to a business; False if they already were.
+
+    Touches the user's updated_at, which is the Last-Modified of their
+    profile. Raises IntegrityError if there is no such user.
+    """
+    result = await session.execute(
+        insert(UserBusiness)
+        .values(user_id=user_id, business_id=business_id)
+        .on_conflict_do_nothing()
+        .returning(UserBusiness.user_id)
+    )
+    if result.scalar_one_or_none() is None:
+        return False
+    await _touch_user(session, user_id)
+    return True
+
+
+async def remove_business_member(session: AsyncSession, business_id, user_id) -> bool:
+    """Unassign a user from a business; False if they were not assigned."""
+    result = await session.execute(
+        delete(UserBusiness)
+        .where(UserBusiness.user_id == user_id, UserBusiness.business_id == business_id)
+        .returning(UserBusiness.user_id)
+    )
+    if result.scalar_one_or_none() is None:
+        return False
+    await _touch_user(session, user_id)
+    return True
+
+
+async def _touch_user(session: AsyncSession, user_id) -> None:
+    await session.execute(
+        update(User).where(User.id == user_id).values(updated_at=func.now())
+    )
+
+
+async def member_business_versions(session: AsyncSession, user_id) -> list[Row]:
+    """Id and updated_at of each business the user is assigned to, by id."""
+    result = await session.execute(
+        select(Business.id, Business.updated_at)
+        .join(UserBusiness, UserBusiness.business_id == Business.id)
+        .where(UserBusiness.user_id == user_id)
+        .order_by(Business.id)
+    )
+    return result.all()
+
+
+async def business_members(session: AsyncSession, business_id) -> list[Row]:
+    result = await session.execute(
+        select(User.id, User.full_name, User.email, User.user_role)
+        .join(UserBusiness, UserBusiness.user_id == User.id)
+        .where(UserBusiness.business_id == business_id)
+        .order_by(User.full_name)
+    )
+    return result.all()
@@ -0,0 +1,350 @@
+import asyncio
+import math
+import time
+from collections import deque
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+from app.core.invalidation import invalidation_bus
+from app.core.logger import get_logger
+from app.core.memory_cache import TTLCache
+from app.core.metrics import SECONDS_BUCKETS, Histogram
+from app.db.models import Business, CheckIn
+from app.services.geo_services import EARTH_RADIUS_M
+
+logger = get_logger("check_ins")
+
+# Order of the values in a buffered row and of the COPY columns
+COLUMNS = (
+    "id",
+    "checked_in_at",
+    "user_id",
+    "business_id",
+    "latitude",
+    "longitude",
+    "accuracy_m",
+    "received_at",
+    "distance_m",
+    "within_geofence",
+)
+
+_PARTITION_LOCK = "check_ins_partitions"
+
+
+def partition_name(day: date) -> str:
+    return f"{CheckIn.__tablename__}_p{day:%Y%m%d}"
+
+
+async def ensure_partitions(conn: AsyncConnection, first: date, last: date) -> int:
+    """
+    Create the daily partitions from first to last (UTC days) that do not
+    exist yet; returns how many were created.
+
+    Workers starting together would race on the same partitions, so they
+    take turns behind an advisory lock.
+    """
+    await conn.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": _PARTITION_LOCK}
+    )
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": CheckIn.__tablename__},
+    )
+    existing = set(result.scalars())
+    created = 0
+    day = first
+    while day <= last:
+        name = partition_name(day)
+        if name not in existing:
+            start = datetime.combine(day, dt_time(), timezone.utc)
+            await conn.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {CheckIn.__tablename__} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') "
+                    f"TO ('{(start + timedelta(days=1)).isoformat()}')"
+                )
+            )
+            created += 1
+        day += timedelta(days=1)
+    return created
+
+
+class Geofence:
+    """
+    Business coordinates, cached for distance checks on check-in batches.
+
+    Each entry holds the latitude and longitude in radians and the cosine
+    of the latitude, so a check is a handful of float operations. Batches
+    load every missing business in one query. Entries are dropped when a
+    business moves or is deleted, here and, via pub/sub, in every other
+    worker.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, radius_m: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.radius_m = radius_m
+        self.loads = 0
+
+    async def load(self, conn: AsyncConnection, business_ids: set) -> dict:
+        """Coordinates per business id; unknown businesses are left out."""
+        coordinates, missing = {}, []
+        for business_id in business_ids:
+            entry = self._cache.get(str(business_id))
+            if entry is None:
+                missing.append(business_id)
+            else:
+                coordinates[business_id] = entry
+        if missing:
+            self.loads += 1
+            result = await conn.execute(
+                select(
+                    Business.id,
+                    Business.location_latitude,
+                    Business.location_longitude,
+                ).where(Business.id.in_(missing))
+            )
+            for business_id, latitude, longitude in result:
+                lat = math.radians(latitude)
+                entry = (lat, math.radians(longitude), math.cos(lat))
+                self._cache.set(str(business_id), entry)
+                coordinates[business_id] = entry
+        return coordinates
+
+    def verify(self, rows: list[tuple], coordinates: dict) -> list[tuple]:
+        """
+        Rows with their haversine distance to the business and whether
+        that is inside the fence appended; rows of unknown businesses are
+        dropped.
+        """
+        verified = []
+        for row in rows:
+            business = coordinates.get(row[3])
+            if business is None:
+                continue
+            b_lat, b_lon, b_cos = business
+            lat = math.radians(row[4])
+            a = (
+                math.sin((lat - b_lat) / 2) ** 2
+                + b_cos
+                * math.cos(lat)
+                * math.sin((math.radians(row[5]) - b_lon) / 2) ** 2
+            )
+            distance = 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+            verified.append((*row, distance, distance <= self.radius_m))
+        return verified
+
+    def evict(self, business_ids: list[str]) -> None:
+        for business_id in business_ids:
+            self._cache.pop(business_id)
+
+    async def invalidate(self, *business_ids) -> None:
+        """Drop businesses' coordinates here and in every other worker."""
+        keys = [str(business_id) for business_id in business_ids]
+        self.evict(keys)
+        await invalidation_bus.publish("geofence", keys)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {**self._cache.stats, "loads": self.loads}
+
+
+class CheckInBuffer:
+    """
+    Collects check-ins in memory and copies them into check_ins in batches.
+
+    A background task flushes every ``flush_interval`` seconds, or as soon
+    as a full batch is waiting, verifying each batch against the geofence
+    and writing it with one COPY. Requests only append to a deque, so a
+    shift change does not turn into thousands of single-row INSERTs.
+    Check-ins still in memory are lost if the process dies; a failed flush
+    keeps its batch and tries again.
+    """
+
+    def __init__(
+        self,
+        geofence: Geofence,
+        batch_size: int,
+        max_size: int,
+        flush_interval: float,
+    ):
+        self.geofence = geofence
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.engine: AsyncEngine | None = None
+        self.counts = {
+            "accepted": 0,
+            "refused": 0,
+            "stored": 0,
+            "outside_geofence": 0,
+            "unknown_business": 0,
+        }
+        self.failed_flushes = 0
+        self.flush_seconds = Histogram(SECONDS_BUCKETS)
+        self._rows: deque[tuple] = deque()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+        self._partitions_checked: date | None = None
+
+    def bind(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self._partitions_checked = None
+
+    def add(self, row: tuple) -> bool:
+        """Buffer a row (see COLUMNS, without the last two); False if full."""
+        if len(self._rows) >= self.max_size:
+            self.counts["refused"] += 1
+            return False
+        self._rows.append(row)
+        self.counts["accepted"] += 1
+        if len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self) -> None:
+        await self._ensure_partitions()
+        self._stopping = False
+        # Events belong to the loop that first waits on them; a restart may
+        # be on another loop
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush what is buffered and stop."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        if self._rows:
+            logger.error("{} check-ins were not stored", len(self._rows))
+
+    async def _ensure_partitions(self) -> None:
+        today = datetime.now(timezone.utc).date()
+        if self._partitions_checked == today:
+            return
+        async with self.engine.begin() as conn:
+            created = await ensure_partitions(
+                conn,
+                today - timedelta(days=settings.CHECK_IN_MAX_AGE_DAYS),
+                today + timedelta(days=settings.CHECK_IN_PARTITIONS_AHEAD_DAYS),
+            )
+        if created:
+            logger.info("Created {} check-in partitions", created)
+        self._partitions_checked = today
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # flush() keeps its batch on failure; whatever escapes it
+                # must not end the task, or the buffer would never drain
+                logger.error("Check-in flush failed: {!r}", e)
+
+    async def flush(self) -> None:
+        """Write buffered check-ins, a batch at a time, until none are left."""
+        while self._rows:
+            batch = [
+                self._rows.popleft()
+                for _ in range(min(self.batch_size, len(self._rows)))
+            ]
+            try:
+                await self._ensure_partitions()
+                await self._write(batch)
+            except Exception as e:
+                # Not just database errors: an asyncpg InterfaceError from the
+                # raw connection, say, must not lose the batch either. Back to
+                # the front, in order, for the next flush
+                self._rows.extendleft(reversed(batch))
+                self.failed_flushes += 1
+                logger.error("Unable to store {} check-ins: {!r}", len(batch), e)
+                return
+
+    async def _write(self, batch: list[tuple]) -> None:
+        start = time.perf_counter()
+        async with self.engine.connect() as conn:
+            coordinates = await self.geofence.load(conn, {row[3] for row in batch})
+            rows = self.geofence.verify(batch, coordinates)
+            if rows:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    CheckIn.__tablename__, records=rows, columns=COLUMNS
+                )
+            await conn.commit()
+        self.flush_seconds.observe(time.perf_counter() - start)
+        outside = sum(not row[-1] for row in rows)
+        self.counts["stored"] += len(rows)
+        self.counts["outside_geofence"] += outside
+        self.counts["unknown_business"] += len(batch) - len(rows)
+        if len(rows) < len(batch):
+            logger.warning(
+                "Dropped {} check-ins for unknown businesses", len(batch) - len(rows)
+            )
+
+    @property
+    def stats(self) -> dict:
+        return {
+            **self.counts,
+            "buffered": len(self._rows),
+            "failed_flushes": self.failed_flushes,
+            "flush_seconds": self.flush_seconds.stats,
+        }
+
+    def render(self) -> str:
+        """Check-in outcomes, buffer depth and flush time in Prometheus format."""
+        name = "complycenter_check_ins_total"
+        lines = [
+            f"# HELP {name} Check-ins per outcome",
+            f"# TYPE {name} counter",
+        ]
+        for outcome, count in self.counts.items():
+            lines.append(f'{name}{{outcome="{outcome}"}} {count}')
+        name = "complycenter_check_ins_buffered"
+        lines += [
+            f"# HELP {name} Check-ins waiting to be stored",
+            f"# TYPE {name} gauge",
+            f"{name} {len(self._rows)}",
+        ]
+        name = "complycenter_check_in_flush_seconds"
+        lines += [
+            f"# HELP {name} Time to verify and copy one batch",
+            f"# TYPE {name} histogram",
+        ]
+        for le, count in self.flush_seconds.cumulative():
+            lines.append(f'{name}_bucket{{le="{le}"}} {count}')
+        lines.append(f"{name}_sum {self.flush_seconds.sum}")
+        lines.append(f"{name}_count {self.flush_seconds.count}")
+        return "\n".join(lines) + "\n"
+
+
+geofence = Geofence(
+    maxsize=settings.CHECK_IN_GEOFENCE_CACHE_SIZE,
+    ttl=settings.CHECK_IN_GEOFENCE_CACHE_TTL_SECONDS,
+    radius_m=settings.CHECK_IN_GEOFENCE_METERS,
+)
+invalidation_bus.subscribe("geofence", geofence.evict)
+
+check_in_buffer = CheckInBuffer(
+    geofence,
+    batch_size=settings.CHECK_IN_BATCH_SIZE,
+    max_size=settings.CHECK_IN_BUFFER_SIZE,
+    flush_interval=settings.CHECK_IN_FLUSH_SECONDS,
+)
@@ -0,0 +1,166 @@
+import asyncio
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+from app.core.config import settings
+from app.core.jobs import PermanentJobError, job_queue
+from app.core.logger import get_logger
+
+logger = get_logger("email")
+
+
+class SMTPMailer:
+    """
+    Sends batches of messages over one SMTP connection.
+
+    The connection is kept open between batches and replaced once it has
+    been idle for ``idle_seconds`` or the server drops it, so a steady flow
+    of mail pays for the handshake, STARTTLS and login once. smtplib blocks,
+    so batches are sent from a thread, one at a time.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None,
+        password: str | None,
+        starttls: bool,
+        timeout: float,
+        idle_seconds: float,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.connections = 0
+        self.sent = 0
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except Exception:
+            smtp.close()
+            raise
+        self.connections += 1
+        return smtp
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None and (
+            time.monotonic() - self._last_used > self.idle_seconds
+        ):
+            self._close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def _close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+
+    def _send(self, message: EmailMessage) -> None:
+        try:
+            self._connection().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # The server closed an idle connection; one fresh attempt
+            self._smtp = None
+            self._connection().send_message(message)
+
+    def _send_batch(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        results: list[Exception | None] = []
+        with self._lock:
+            for message in messages:
+                try:
+                    self._send(message)
+                    self._last_used = time.monotonic()
+                    self.sent += 1
+                    results.append(None)
+                except (
+                    smtplib.SMTPRecipientsRefused,
+                    smtplib.SMTPSenderRefused,
+                ) as e:
+                    results.append(PermanentJobError(str(e)))
+                except smtplib.SMTPResponseException as e:
+                    # 5xx replies are final, 4xx ones worth retrying
+                    if e.smtp_code >= 500:
+                        results.append(PermanentJobError(str(e)))
+                    else:
+                        results.append(e)
+                except (smtplib.SMTPException, OSError) as e:
+                    # The connection is in an unknown state; start afresh
+                    self._smtp = None
+                    results.append(e)
+        return results
+
+    async def send_batch(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        """Send messages in order; None or the exception for each."""
+        return await asyncio.to_thread(self._send_batch, messages)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    @property
+    def stats(self) -> dict:
+        return {"connections": self.connections, "sent": self.sent}
+
+
+mailer = SMTPMailer(
+    host=settings.SMTP_HOST,
+    port=settings.SMTP_PORT,
+    username=settings.SMTP_USERNAME,
+    password=(
+        settings.SMTP_PASSWORD.get_secret_value() if settings.SMTP_PASSWORD else None
+    ),
+    starttls=settings.SMTP_STARTTLS,
+    timeout=settings.SMTP_TIMEOUT,
+    idle_seconds=settings.SMTP_IDLE_SECONDS,
+)
+
+
+def build_message(payload: dict) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = settings.EMAIL_FROM
+    message["To"] = payload["to"]
+    message["Subject"] = payload["subject"]
+    message.set_content(payload["body"])
+    return message
+
+
+@job_queue.handler("send_email", queue="email", batch_size=settings.EMAIL_BATCH_SIZE)
+async def send_emails(payloads: list[dict]) -> list[Exception | None]:
+    results = await mailer.send_batch([build_message(p) for p in payloads])
+    logger.info("Sent {} of {} emails", sum(r is None for r in results), len(payloads))
+    return results
+
+
+def invitation_email(email: str, full_name: str, password: str) -> dict:
+    """The send_email payload inviting a new user."""
+    return {
+        "to": email,
+        "subject": "You have been invited to ComplyCentre",
+        "body": (
+            f"Hello {full_name},\n\n"
+            "An account has been created for you on ComplyCentre.\n\n"
+            f"Email: {email}\n"
+            f"Temporary password: {password}\n\n"
+            "Please sign in and change your password.\n"
+        ),
+    }
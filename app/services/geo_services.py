@@ -0,0 +1,111 @@
+import math
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Business
+
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_M / 180
+# Must match the generated Business.geo_band column
+GEO_BANDS_PER_DEGREE = 10
+
+
+def haversine_m(latitude: float, longitude: float, lat_column, lon_column):
+    """SQL expression for the great-circle distance in metres to a point."""
+    dlat = func.radians(lat_column - latitude)
+    dlon = func.radians(lon_column - longitude)
+    cos_lat = math.cos(math.radians(latitude))
+    a = func.power(func.sin(dlat / 2), 2) + cos_lat * func.cos(
+        func.radians(lat_column)
+    ) * func.power(func.sin(dlon / 2), 2)
+    return 2 * EARTH_RADIUS_M * func.asin(func.least(1.0, func.sqrt(a)))
+
+
+def _longitude_ranges(longitude: float, lon_delta: float) -> list[tuple[float, float]]:
+    """Longitude intervals covered by the box, split at the antimeridian."""
+    if lon_delta >= 180:
+        return [(-180.0, 180.0)]
+    low, high = longitude - lon_delta, longitude + lon_delta
+    if low < -180:
+        return [(low + 360, 180.0), (-180.0, high)]
+    if high > 180:
+        return [(low, 180.0), (-180.0, high - 360)]
+    return [(low, high)]
+
+
+def bounding_box_filter(latitude: float, longitude: float, radius_m: float):
+    """
+    Index-friendly filter for every business that could be within radius_m.
+
+    Latitude is narrowed to whole geo bands and longitude to a range inside
+    each band, which the (geo_band, location_longitude) index serves
+    directly. The exact distance check is applied on top of this.
+    """
+    lat_delta = radius_m / METERS_PER_DEGREE_LAT
+    lat_low = max(-90.0, latitude - lat_delta)
+    lat_high = min(90.0, latitude + lat_delta)
+    widest = math.cos(math.radians(max(abs(lat_low), abs(lat_high))))
+    lon_delta = 180.0 if widest < 1e-9 else lat_delta / widest
+
+    bands = list(
+        range(
+            math.floor(lat_low * GEO_BANDS_PER_DEGREE),
+            math.floor(lat_high * GEO_BANDS_PER_DEGREE) + 1,
+        )
+    )
+    return and_(
+        Business.geo_band.in_(bands),
+        or_(
+            *(
+                Business.location_longitude.between(low, high)
+                for low, high in _longitude_ranges(longitude, lon_delta)
+            )
+        ),
+    )
+
+
+async def find_nearby_businesses(
+    session: AsyncSession,
+    latitude: float,
+    longitude: float,
+    radius_m: float,
+    limit: int,
+):
+    """Businesses within radius_m of the point, nearest first."""
+    distance = haversine_m(
+        latitude, longitude, Business.location_latitude, Business.location_longitude
+    ).label("distance_m")
+    query = (
+        select(Business.__table__, distance)
+        .where(bounding_box_filter(latitude, longitude, radius_m))
+        .where(distance <= radius_m)
+        .order_by(distance)
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def find_nearest_businesses(
+    session: AsyncSession,
+    latitude: float,
+    longitude: float,
+    limit: int,
+    initial_radius_m: float,
+    max_radius_m: float,
+):
+    """
+    The ``limit`` nearest businesses within max_radius_m.
+
+    The search radius starts small and grows fourfold until enough
+    businesses are found, so dense areas never scan distant bands.
+    """
+    radius_m = min(initial_radius_m, max_radius_m)
+    while True:
+        rows = await find_nearby_businesses(
+            session, latitude, longitude, radius_m, limit
+        )
+        if len(rows) >= limit or radius_m >= max_radius_m:
+            return rows
+        radius_m = min(radius_m * 4, max_radius_m)
@@ -0,0 +1,88 @@
+import uuid
+from collections.abc import Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import object_session
+
+from app.core.config import settings
+from app.core.invalidation import invalidate_after_commit, invalidation_bus
+from app.core.memory_cache import TTLCache
+from app.db.models import UserBusiness
+
+
+class MembershipCache:
+    """
+    Maps a user id to the ids of the businesses the user is assigned to.
+
+    Authorization checks become a set lookup instead of a query against
+    user_business_association. Entries are dropped when an assignment
+    changes, here and, via pub/sub, in every other worker. A business
+    deleted in the database is left in its members' sets until the TTL;
+    it no longer exists, so there is nothing left to see.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.loads = 0
+        # Bumped on every invalidation; a load that started before the bump
+        # must not repopulate the cache with what it read.
+        self._epoch = 0
+
+    def put(self, user_id, business_ids: Iterable[uuid.UUID]) -> None:
+        self._cache.set(str(user_id), frozenset(business_ids))
+
+    async def business_ids(
+        self, session_factory: async_sessionmaker, user_id
+    ) -> frozenset[uuid.UUID]:
+        business_ids = self._cache.get(str(user_id))
+        if business_ids is not None:
+            return business_ids
+        epoch = self._epoch
+        self.loads += 1
+        async with session_factory() as session:
+            result = await session.execute(
+                select(UserBusiness.business_id).where(UserBusiness.user_id == user_id)
+            )
+            business_ids = frozenset(result.scalars())
+        if epoch == self._epoch:
+            self._cache.set(str(user_id), business_ids)
+        return business_ids
+
+    async def is_member(
+        self, session_factory: async_sessionmaker, user_id, business_id
+    ) -> bool:
+        return business_id in await self.business_ids(session_factory, user_id)
+
+    def evict(self, user_ids: list[str]) -> None:
+        self._epoch += 1
+        for user_id in user_ids:
+            self._cache.pop(user_id)
+
+    async def invalidate(self, *user_ids) -> None:
+        """Drop users' memberships here and in every other worker."""
+        keys = [str(user_id) for user_id in user_ids]
+        self.evict(keys)
+        await invalidation_bus.publish("membership", keys)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @property
+    def stats(self) -> dict:
+        return {**self._cache.stats, "loads": self.loads}
+
+
+membership_cache = MembershipCache(
+    maxsize=settings.MEMBERSHIP_CACHE_SIZE, ttl=settings.MEMBERSHIP_CACHE_TTL_SECONDS
+)
+invalidation_bus.subscribe("membership", membership_cache.evict)
+
+
+# Assignments made through the ORM are dropped here as soon as they are
+# flushed, and everywhere once committed
+@event.listens_for(UserBusiness, "after_insert")
+@event.listens_for(UserBusiness, "after_delete")
+def _evict_on_change(mapper, connection, target: UserBusiness) -> None:
+    membership_cache.evict([str(target.user_id)])
+    invalidate_after_commit(object_session(target), "membership", [str(target.user_id)])
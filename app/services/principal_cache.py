@@ -0,0 +1,122 @@
+import hashlib
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+
+from app.core.config import settings
+from app.core.invalidation import invalidate_after_commit, invalidation_bus
+from app.core.memory_cache import TTLCache
+from app.db.models import User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Detached snapshot of the fields an authenticated request needs."""
+
+    id: uuid.UUID
+    full_name: str
+    email: str
+    user_role: str
+    is_active: bool
+    # Validator of GET /profile; assignments drop the principal, as they
+    # touch updated_at outside the ORM
+    updated_at: datetime | None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            full_name=user.full_name,
+            email=user.email,
+            user_role=user.user_role,
+            is_active=user.is_active,
+            updated_at=user.updated_at,
+        )
+
+    def to_user(self) -> User:
+        """Build a fresh transient User so callers never share an instance."""
+        return User(
+            id=self.id,
+            full_name=self.full_name,
+            email=self.email,
+            user_role=self.user_role,
+            is_active=self.is_active,
+            updated_at=self.updated_at,
+        )
+
+
+class PrincipalCache:
+    """
+    Maps a token digest to the Principal it authenticated.
+
+    Entries never outlive the token's ``exp`` and are dropped as soon as the
+    user's role, password, active flag, name or email changes.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._digests_by_user: dict[str, set[str]] = {}
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, digest: str) -> Principal | None:
+        return self._cache.get(digest)
+
+    def put(self, digest: str, user: User, expires_at: float) -> None:
+        self._cache.set(digest, Principal.from_user(user), ttl=expires_at - time.time())
+        user_key = str(user.id)
+        digests = {
+            d for d in self._digests_by_user.get(user_key, ()) if d in self._cache
+        }
+        digests.add(digest)
+        self._digests_by_user[user_key] = digests
+
+    def invalidate_user(self, user_id) -> None:
+        for digest in self._digests_by_user.pop(str(user_id), ()):
+            self._cache.pop(digest)
+
+    def evict(self, user_ids: list[str]) -> None:
+        for user_id in user_ids:
+            self.invalidate_user(user_id)
+
+    async def invalidate(self, *user_ids) -> None:
+        """Drop users' principals here and in every other worker."""
+        keys = [str(user_id) for user_id in user_ids]
+        self.evict(keys)
+        await invalidation_bus.publish("principal", keys)
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._digests_by_user.clear()
+
+    @property
+    def stats(self) -> dict:
+        return self._cache.stats
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+invalidation_bus.subscribe("principal", principal_cache.evict)
+
+_PRINCIPAL_FIELDS = ("is_active", "user_role", "password", "full_name", "email")
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _PRINCIPAL_FIELDS):
+        principal_cache.invalidate_user(target.id)
+        invalidate_after_commit(object_session(target), "principal", [str(target.id)])
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target: User) -> None:
+    principal_cache.invalidate_user(target.id)
+    invalidate_after_commit(object_session(target), "principal", [str(target.id)])
@@ -1,9 +1,8 @@
 from pydantic import BaseModel
 from datetime import timedelta, datetime
-from passlib.context import CryptContext
-import jwt
 
 from app.core.config import settings
+from app.core.timing import timed
 from app.db.models import User
 
 
@@ -22,9 +21,12 @@ def create_access_token(user : User) -> str:
     expire = datetime.now(tz=settings.timezone) + timedelta(days=settings.ACCESS_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire})
 
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY.get_secret_value(), settings.ALGORITHM
-    )
+    import jwt
+
+    with timed("jwt"):
+        encoded_jwt = jwt.encode(
+            to_encode, settings.SECRET_KEY.get_secret_value(), settings.ALGORITHM
+        )
     return encoded_jwt
 
 
@@ -42,8 +44,11 @@ def create_refresh_token(user : User) -> str:
     expire = datetime.now(tz=settings.timezone) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire})
 
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY.get_secret_value(), settings.ALGORITHM
-    )
+    import jwt
+
+    with timed("jwt"):
+        encoded_jwt = jwt.encode(
+            to_encode, settings.SECRET_KEY.get_secret_value(), settings.ALGORITHM
+        )
 
     return encoded_jwt
@@ -1,29 +1,48 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-import jwt
-from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
 import string
 import random
+from uuid import UUID
 
 from app.db.models import User
-from app.db.dependencies import get_db_session
 from app.core.config import settings
+from app.core.timing import timed
 from app.services.auth_services import get_active_user
+from app.services.membership_cache import membership_cache
+from app.services.principal_cache import principal_cache
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/swagger-login")
 
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session : AsyncSession = Depends(get_db_session)):
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
+    digest = principal_cache.digest(token)
+    principal = principal_cache.get(digest)
+    if principal is not None:
+        # Lets session dependencies route and pin reads by user
+        request.state.user_id = principal.id
+        return principal.to_user()
+
+    # Only needed on a cache miss; not importing it up front keeps startup fast
+    import jwt
+
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY.get_secret_value(), algorithms=[settings.ALGORITHM])
+        with timed("jwt"):
+            payload = jwt.decode(token, settings.SECRET_KEY.get_secret_value(), algorithms=[settings.ALGORITHM])
         email: str = payload.get("email")
     except jwt.ExpiredSignatureError:
         raise HTTPException(detail="Refresh Token Expired", status_code=400)
     except Exception as e:
         raise HTTPException(detail="Invalid Refresh Token", status_code=400)
-    user = await get_active_user(email, session)
+    # A short read-only session of its own, so the connection is back in
+    # the pool before the route handler runs
+    async with request.app.state.db_read_session_factory() as session:
+        user = await get_active_user(email, session)
+    request.state.user_id = user.id
+    if payload.get("exp"):
+        principal_cache.put(digest, user, payload["exp"])
     return user
 
 
@@ -44,6 +63,25 @@ async def is_admin_user(user: User = Depends(get_current_user)):
         detail="You do not have permission to perform this action",
     )
 
+
+async def get_business_member(
+    request: Request, business_id: UUID, user: User = Depends(get_current_user)
+):
+    """
+    The current user, if they may see the business: admins, and users
+    assigned to it. Assignments are read from the membership cache, so
+    the check rarely touches the database.
+    """
+    if user.user_role == "admin" or await membership_cache.is_member(
+        request.app.state.db_read_session_factory, user.id, business_id
+    ):
+        return user
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="You are not assigned to this business",
+    )
+
+
 async def generate_password(length=10):
     """Generate a random temporary password"""
     characters = string.ascii_letters + string.digits + "!@#$%^&*()"
@@ -0,0 +1,112 @@
+"""
+Background job worker.
+
+    python -m app.worker [--processes N] [--queues email ...]
+
+Each process consumes every registered queue (or ``--queues``) from Redis;
+jobs a process was holding when it died are requeued by the others once
+its heartbeat expires. SIGTERM or SIGINT lets in-hand batches finish
+before exiting, and the supervisor restarts processes that crash.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import time
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.jobs import JobWorker, RedisJobBackend, job_queue
+from app.core.logger import get_logger
+from app.services.email import mailer
+
+logger = get_logger("worker")
+
+
+def build_redis() -> Redis:
+    return Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=(
+            settings.REDIS_PASSWORD.get_secret_value()
+            if settings.REDIS_PASSWORD
+            else None
+        ),
+        # Waiting for a job blocks on the socket for up to JOBS_POLL_SECONDS
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT + settings.JOBS_POLL_SECONDS,
+        socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        decode_responses=True,
+    )
+
+
+async def run(queues: list[str]) -> None:
+    redis = build_redis()
+    job_queue.bind(
+        RedisJobBackend(
+            redis,
+            dead_letter_size=settings.JOBS_DEAD_LETTER_SIZE,
+            heartbeat_ttl=settings.JOBS_HEARTBEAT_SECONDS * 3,
+        )
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    try:
+        await JobWorker(job_queue, queues).run(stop)
+    finally:
+        await asyncio.to_thread(mailer.close)
+        await redis.aclose()
+
+
+def _process(queues: list[str]) -> None:
+    asyncio.run(run(queues))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--processes", type=int, default=settings.JOBS_WORKER_PROCESSES)
+    parser.add_argument("--queues", nargs="+", default=job_queue.queues)
+    args = parser.parse_args(argv)
+
+    if args.processes == 1:
+        _process(args.queues)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    stopping = False
+
+    def start() -> multiprocessing.Process:
+        process = context.Process(target=_process, args=(args.queues,))
+        process.start()
+        return process
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    processes = [start() for _ in range(args.processes)]
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while not stopping:
+        for index, process in enumerate(processes):
+            if not process.is_alive() and not stopping:
+                logger.error(
+                    "Worker process {} exited with {}; restarting",
+                    process.pid,
+                    process.exitcode,
+                )
+                processes[index] = start()
+        time.sleep(1)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+How a credential-stuffing flood on /token affects the rest of the API.
+
+Boots the app in-process (see benchmarks.harness), seeds a user and
+``--businesses`` businesses, then drives ``GET /businesses/{id}`` with
+``--concurrency`` clients while ``--attackers`` clients post wrong
+passwords for the seeded user from ``--ips`` addresses, together at up to
+``--flood-rps`` requests per second (an attacker also waits for its
+previous attempt, so a slow /token slows the flood). The run is made
+once with the auth rate limiter disabled and once enabled, reporting the
+normal route's throughput and latency and how the flood was answered
+(400 is a verified wrong password, 429 a rejection before any hashing).
+Results are compared with the stored baseline unless ``--save-baseline``
+is given.
+
+Usage:
+    python -m benchmarks.auth_flood --db-url postgresql+asyncpg://... \\
+        [--redis-url redis://localhost:6379/15] [--save-baseline]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from app.core.config import settings
+from app.main import app
+from benchmarks.common import (
+    add_baseline_arguments,
+    add_db_url_argument,
+    check_baseline,
+    percentile,
+)
+from benchmarks.harness import running_app
+from benchmarks.load import PREFIX, cleanup, seed
+
+
+async def run(
+    client: httpx.AsyncClient, business_ids: list, args: argparse.Namespace
+) -> dict:
+    rng = random.Random(7)
+    statuses: Counter[int] = Counter()
+    latencies: list[float] = []
+    sent = 0
+    done = asyncio.Event()
+
+    async def attacker(i: int) -> None:
+        transport = httpx.ASGITransport(app=app, client=(f"10.0.0.{i % args.ips}", 1))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            interval = args.attackers / args.flood_rps
+            origin = time.perf_counter()
+            attempts = 0
+            while not done.is_set():
+                scheduled = origin + attempts * interval
+                attempts += 1
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                response = await c.post(
+                    "/api/v1/token",
+                    json={
+                        "email": f"{PREFIX}0@bench.complycenter.com",
+                        "password": f"guess-{rng.random()}",
+                    },
+                )
+                statuses[response.status_code] += 1
+
+    async def worker() -> None:
+        nonlocal sent
+        while sent < args.requests:
+            sent += 1
+            start = time.perf_counter()
+            await client.get(f"/api/v1/businesses/{rng.choice(business_ids)}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    attackers = [asyncio.create_task(attacker(i)) for i in range(args.attackers)]
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await asyncio.gather(*attackers)
+    return {
+        "rps": round(args.requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "flood": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+async def main(args: argparse.Namespace) -> int:
+    results = {}
+    async with running_app(args.db_url, args.redis_url) as client:
+        data = await seed(1, args.businesses, random.Random(42))
+        try:
+            for enabled in (False, True):
+                settings.AUTH_RATE_LIMIT_ENABLED = enabled
+                name = "limited" if enabled else "unlimited"
+                results[name] = await run(client, data["business_ids"], args)
+                print(f"{name:<10} {results[name]}")
+        finally:
+            await cleanup()
+    # Flood counts depend on how long the run took; only compare the route
+    for result in results.values():
+        result.pop("flood")
+    return check_baseline("auth_flood", results, args.save_baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    add_db_url_argument(parser)
+    parser.add_argument("--redis-url", help="Redis for the rate limiter (optional)")
+    parser.add_argument("--businesses", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--attackers", type=int, default=20)
+    parser.add_argument("--ips", type=int, default=5)
+    parser.add_argument("--flood-rps", type=float, default=200.0)
+    add_baseline_arguments(parser)
+    sys.exit(asyncio.run(main(parser.parse_args())))
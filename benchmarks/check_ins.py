@@ -0,0 +1,230 @@
+"""
+Check-in ingestion: request throughput, flush latency and the write path.
+
+Boots the app in-process (see benchmarks.harness), seeds ``--businesses``
+businesses and a cleaner assigned to all of them, then:
+
+- ingest: ``--concurrency`` clients post ``--requests`` check-ins, each
+  within about 150 m of a random business, so some fall outside the
+  geofence. Reports requests per second, p50/p99 request latency, how long
+  the buffer took to drain after the last request and the flush time per
+  batch;
+- write: stores ``--rows`` check-ins in batches of CHECK_IN_BATCH_SIZE,
+  once with COPY (what the buffer does) and once with multi-row INSERTs,
+  reporting rows per second and milliseconds per batch;
+- geofence: microseconds to verify one row against cached coordinates.
+
+Results are compared with the stored baseline unless ``--save-baseline``
+is given.
+
+Usage:
+    python -m benchmarks.check_ins --db-url postgresql+asyncpg://... \\
+        [--requests 5000] [--rows 50000] [--save-baseline]
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import delete, insert, select
+
+from app.core.config import settings
+from app.db.models import Business, CheckIn, User, UserBusiness
+from app.main import app
+from app.services.check_ins import COLUMNS, check_in_buffer, geofence
+from app.services.geo_services import METERS_PER_DEGREE_LAT
+from benchmarks.common import (
+    add_baseline_arguments,
+    add_db_url_argument,
+    check_baseline,
+    percentile,
+)
+from benchmarks.harness import running_app
+from benchmarks.load import PREFIX, cleanup, seed
+
+
+def near(business: tuple, rng: random.Random, spread_m: float = 150) -> tuple:
+    """A point within spread_m metres (per axis) of the business."""
+    latitude, longitude = business
+    d_lat = rng.uniform(-spread_m, spread_m) / METERS_PER_DEGREE_LAT
+    d_lon = rng.uniform(-spread_m, spread_m) / (
+        METERS_PER_DEGREE_LAT * math.cos(math.radians(latitude))
+    )
+    return latitude + d_lat, longitude + d_lon
+
+
+async def ingest(
+    client: httpx.AsyncClient, data: dict, args: argparse.Namespace
+) -> dict:
+    rng = random.Random(7)
+    businesses = data["businesses"]
+    latencies: list[float] = []
+    sent = 0
+    flushes = check_in_buffer.flush_seconds.count
+    flush_sum = check_in_buffer.flush_seconds.sum
+
+    async def worker() -> None:
+        nonlocal sent
+        while sent < args.requests:
+            sent += 1
+            business_id, location = rng.choice(businesses)
+            latitude, longitude = near(location, rng)
+            start = time.perf_counter()
+            response = await client.post(
+                f"/api/v1/businesses/{business_id}/check-ins",
+                json={"latitude": latitude, "longitude": longitude},
+                headers=data["user"],
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    last_request = time.perf_counter()
+    while check_in_buffer.stats["buffered"]:
+        await asyncio.sleep(0.01)
+    drained = time.perf_counter() - last_request
+    batches = check_in_buffer.flush_seconds.count - flushes
+    return {
+        "rps": round(args.requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "drain_ms": round(drained * 1000, 1),
+        "flush_ms": round(
+            (check_in_buffer.flush_seconds.sum - flush_sum) / max(1, batches) * 1000,
+            2,
+        ),
+    }
+
+
+def check_in_rows(data: dict, count: int, rng: random.Random) -> list[tuple]:
+    now = datetime.now(timezone.utc)
+    user_id = data["user_id"]
+    rows = []
+    for _ in range(count):
+        business_id, location = rng.choice(data["businesses"])
+        latitude, longitude = near(location, rng)
+        rows.append(
+            (uuid.uuid4(), now, user_id, business_id, latitude, longitude, 10.0, now)
+        )
+    return rows
+
+
+async def copy_batch(batch: list[tuple]) -> None:
+    await check_in_buffer._write(batch)
+
+
+async def insert_batch(batch: list[tuple]) -> None:
+    async with app.state.db_engine.connect() as conn:
+        coordinates = await geofence.load(conn, {row[3] for row in batch})
+        rows = geofence.verify(batch, coordinates)
+        await conn.execute(insert(CheckIn), [dict(zip(COLUMNS, row)) for row in rows])
+        await conn.commit()
+
+
+async def write(data: dict, args: argparse.Namespace) -> dict:
+    rng = random.Random(11)
+    results = {}
+    for name, store in (("copy", copy_batch), ("insert", insert_batch)):
+        rows = check_in_rows(data, args.rows, rng)
+        batch_size = settings.CHECK_IN_BATCH_SIZE
+        batch_ms = []
+        start = time.perf_counter()
+        for offset in range(0, len(rows), batch_size):
+            batch_start = time.perf_counter()
+            await store(rows[offset : offset + batch_size])
+            batch_ms.append((time.perf_counter() - batch_start) * 1000)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "rows_rps": round(len(rows) / elapsed, 1),
+            "batch_p50_ms": round(percentile(batch_ms, 50), 2),
+            "batch_p99_ms": round(percentile(batch_ms, 99), 2),
+        }
+    return results
+
+
+async def verify(data: dict) -> dict:
+    rows = check_in_rows(data, 100_000, random.Random(13))
+    async with app.state.db_engine.connect() as conn:
+        coordinates = await geofence.load(conn, {row[3] for row in rows})
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        geofence.verify(rows, coordinates)
+        best = min(best, time.perf_counter() - start)
+    return {"us_per_row": round(best / len(rows) * 1_000_000, 3)}
+
+
+async def locate(data: dict) -> None:
+    """Add the seeded cleaner's id and each business's location to data."""
+    async with app.state.db_session_factory() as session:
+        data["user_id"] = (
+            await session.execute(select(User.id).where(User.email.startswith(PREFIX)))
+        ).scalar_one()
+        result = await session.execute(
+            select(
+                Business.id, Business.location_latitude, Business.location_longitude
+            ).where(Business.name.startswith(PREFIX))
+        )
+        data["businesses"] = [
+            (business_id, (latitude, longitude))
+            for business_id, latitude, longitude in result
+        ]
+
+
+async def assign(data: dict) -> None:
+    async with app.state.db_session_factory() as session:
+        await session.execute(
+            insert(UserBusiness),
+            [
+                {"user_id": data["user_id"], "business_id": business_id}
+                for business_id, _ in data["businesses"]
+            ],
+        )
+        await session.commit()
+
+
+async def remove_check_ins(user_id: uuid.UUID) -> None:
+    async with app.state.db_session_factory() as session:
+        await session.execute(delete(CheckIn).where(CheckIn.user_id == user_id))
+        await session.commit()
+
+
+async def main(args: argparse.Namespace) -> int:
+    results = {}
+    async with running_app(args.db_url) as client:
+        data = await seed(1, args.businesses, random.Random(42))
+        try:
+            await locate(data)
+            await assign(data)
+            results["ingest"] = await ingest(client, data, args)
+            print(f"ingest   {results['ingest']}")
+            results["write"] = await write(data, args)
+            for name, result in results["write"].items():
+                print(f"{name:<8} {result}")
+            results["geofence"] = await verify(data)
+            print(f"geofence {results['geofence']}")
+            print(f"buffer   {check_in_buffer.stats}")
+        finally:
+            if "user_id" in data:
+                await remove_check_ins(data["user_id"])
+            await cleanup()
+    return check_baseline("check_ins", results, args.save_baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    add_db_url_argument(parser)
+    parser.add_argument("--businesses", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=50_000)
+    add_baseline_arguments(parser)
+    sys.exit(asyncio.run(main(parser.parse_args())))
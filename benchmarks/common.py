@@ -0,0 +1,95 @@
+"""Helpers shared by the benchmark scripts."""
+
+import argparse
+import json
+from pathlib import Path
+
+from app.core.config import settings
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(samples: list[float]) -> str:
+    return (
+        f"mean={sum(samples) / len(samples):.2f}ms "
+        f"p50={percentile(samples, 50):.2f}ms "
+        f"p95={percentile(samples, 95):.2f}ms "
+        f"p99={percentile(samples, 99):.2f}ms"
+    )
+
+
+def add_db_url_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--db-url",
+        default=str(settings.db_url),
+        help="Scratch database to seed; defaults to the configured database",
+    )
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run's results as the new baseline",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=20.0,
+        help="Percent a metric may regress from the baseline before failing",
+    )
+
+
+def _flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _higher_is_better(metric: str) -> bool:
+    return metric.endswith(("rps", "ops_per_second"))
+
+
+def check_baseline(name: str, results: dict, save: bool, tolerance: float) -> int:
+    """
+    Compare results with ``benchmarks/baselines/<name>.json`` and report
+    every metric that regressed by more than ``tolerance`` percent.
+
+    With ``save`` the results become the new baseline instead. Returns the
+    process exit code: 1 if anything regressed, else 0.
+    """
+    path = BASELINE_DIR / f"{name}.json"
+    if save:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {path}")
+        return 0
+    if not path.exists():
+        print(f"No baseline at {path}; run with --save-baseline to create one")
+        return 0
+
+    baseline = _flatten(json.loads(path.read_text()))
+    regressions = []
+    for metric, value in _flatten(results).items():
+        previous = baseline.get(metric)
+        if not previous:
+            continue
+        change = (value - previous) / previous * 100
+        if _higher_is_better(metric):
+            change = -change
+        if change > tolerance:
+            regressions.append(f"{metric}: {previous:.4g} -> {value:.4g}")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"Within {tolerance:.0f}% of baseline {path}")
+    return 1 if regressions else 0
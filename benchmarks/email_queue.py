@@ -0,0 +1,161 @@
+"""
+Sending invitation emails inline versus through the job queue.
+
+Starts a local SMTP server (aiosmtpd) that waits ``--handshake-ms`` on
+EHLO, standing in for the network round trips, STARTTLS and login a real
+relay costs per connection. Then sends ``--messages`` messages twice:
+
+- inline: one connection per message, sent before the request returns,
+  which is what the invite endpoints used to have to do;
+- queued: enqueued as send_email jobs (MemoryJobBackend) and sent by a
+  JobWorker in batches of EMAIL_BATCH_SIZE over one pooled connection.
+
+Reports what a request pays per message, the time to deliver them all,
+job latency (enqueue to sent) and SMTP connections opened. Results are
+compared with the stored baseline unless ``--save-baseline`` is given.
+Needs no database.
+
+Usage:
+    python -m benchmarks.email_queue [--messages 500] [--handshake-ms 20] \\
+        [--save-baseline]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from aiosmtpd.controller import Controller
+
+from app.core.jobs import JobWorker, MemoryJobBackend, Outcome, job_queue
+from app.services.email import (
+    SMTPMailer,
+    build_message,
+    invitation_email,
+    mailer,
+)
+from benchmarks.common import add_baseline_arguments, check_baseline, percentile
+
+
+class SlowHandshake:
+    """aiosmtpd handler that delays EHLO and counts delivered messages."""
+
+    def __init__(self, handshake: float):
+        self.handshake = handshake
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+class RecordingBackend(MemoryJobBackend):
+    """Keeps every job latency, for percentiles the histogram cannot give."""
+
+    def __init__(self, dead_letter_size: int):
+        super().__init__(dead_letter_size)
+        self.latencies: list[float] = []
+
+    async def finish(self, queue: str, worker_id: str, outcome: Outcome) -> None:
+        self.latencies.extend(outcome.latencies)
+        await super().finish(queue, worker_id, outcome)
+
+
+def payloads(count: int) -> list[dict]:
+    return [
+        invitation_email(f"bench-{i}@bench.test", f"Bench User {i}", "temporary")
+        for i in range(count)
+    ]
+
+
+async def inline(port: int, count: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for payload in payloads(count):
+        sent = time.perf_counter()
+        # A fresh connection per message, as a request handler would open
+        sender = SMTPMailer("127.0.0.1", port, None, None, False, 10, 0)
+        [error] = await sender.send_batch([build_message(payload)])
+        await asyncio.to_thread(sender.close)
+        if error is not None:
+            raise error
+        latencies.append((time.perf_counter() - sent) * 1000)
+    elapsed = time.perf_counter() - start
+    return {
+        "request_ms": round(percentile(latencies, 50), 3),
+        "drain_seconds": round(elapsed, 3),
+        "rps": round(count / elapsed, 1),
+        "job_p50_ms": round(percentile(latencies, 50), 2),
+        "job_p99_ms": round(percentile(latencies, 99), 2),
+        "connections": count,
+    }
+
+
+async def queued(port: int, count: int) -> dict:
+    backend = RecordingBackend(dead_letter_size=count)
+    job_queue.bind(backend)
+    mailer.host, mailer.port = "127.0.0.1", port
+    mailer.username, mailer.starttls = None, False
+    connections = mailer.connections
+
+    stop = asyncio.Event()
+    worker = asyncio.create_task(JobWorker(job_queue, ["email"]).run(stop))
+    start = time.perf_counter()
+    for payload in payloads(count):
+        await job_queue.enqueue("send_email", payload)
+    enqueued = time.perf_counter() - start
+    while len(backend.latencies) < count:
+        stats = await backend.stats("email")
+        if stats["dead"]:
+            raise RuntimeError(f"{stats['dead']} emails were dead-lettered")
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await worker
+    await asyncio.to_thread(mailer.close)
+
+    latencies = [latency * 1000 for latency in backend.latencies]
+    return {
+        "request_ms": round(enqueued / count * 1000, 3),
+        "drain_seconds": round(elapsed, 3),
+        "rps": round(count / elapsed, 1),
+        "job_p50_ms": round(percentile(latencies, 50), 2),
+        "job_p99_ms": round(percentile(latencies, 99), 2),
+        "connections": mailer.connections - connections,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    handler = SlowHandshake(args.handshake_ms / 1000)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        results = {}
+        for name, mode in (("inline", inline), ("queued", queued)):
+            received = handler.received
+            results[name] = await mode(args.port, args.messages)
+            if handler.received - received != args.messages:
+                raise RuntimeError(f"{name}: server got {handler.received - received}")
+            print(f"{name:<7} {results[name]}")
+    finally:
+        controller.stop()
+    return results
+
+
+def main(args: argparse.Namespace) -> int:
+    results = asyncio.run(run(args))
+    return check_baseline("email_queue", results, args.save_baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--handshake-ms", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8025)
+    add_baseline_arguments(parser)
+    sys.exit(main(parser.parse_args()))
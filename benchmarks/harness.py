@@ -0,0 +1,77 @@
+"""
+Boot the API in-process against a scratch database for benchmarks.
+
+Mirrors lifespan_setup without TLS and with explicit URLs, so any local
+Postgres (and optionally Redis) can be used. Requests are served through
+httpx's ASGI transport; no server or sockets are involved.
+"""
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import httpx
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.cache import RedisHealth
+from app.core.invalidation import invalidation_bus
+from app.core.jobs import MemoryJobBackend, job_queue
+from app.core.rate_limit import rate_limiter
+from app.core.security import password_hasher
+from app.db.base import BaseModel
+from app.db.engine import build_engine
+from app.db.replica import replica_router
+from app.main import app
+from app.services.business_cache import business_cache
+from app.services.check_ins import check_in_buffer, geofence
+from app.services.membership_cache import membership_cache
+from app.services.principal_cache import principal_cache
+
+
+@asynccontextmanager
+async def running_app(
+    db_url: str, redis_url: str | None = None, create_schema: bool = True
+) -> AsyncIterator[httpx.AsyncClient]:
+    engine = build_engine(db_url)
+    if create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(BaseModel.metadata.create_all)
+    app.state.db_engine = engine
+    app.state.db_replica_engine = None
+    app.state.db_session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    app.state.db_read_session_factory = async_sessionmaker(
+        engine.execution_options(postgresql_readonly=True), expire_on_commit=False
+    )
+    replica_router.start(app.state.db_read_session_factory, None)
+
+    redis = Redis.from_url(redis_url, decode_responses=True) if redis_url else None
+    health = RedisHealth()
+    if redis is not None:
+        await redis.ping()
+        health.healthy = True
+        await invalidation_bus.start(redis)
+    app.state.redis = redis
+    app.state.redis_health = health
+    business_cache.bind(redis, health)
+    rate_limiter.bind(redis, health)
+    # Jobs are queued but not run: benchmarks must not send email
+    job_queue.bind(MemoryJobBackend(dead_letter_size=100))
+    password_hasher.start()
+    check_in_buffer.bind(engine)
+    await check_in_buffer.start()
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            yield c
+    finally:
+        await check_in_buffer.stop()
+        password_hasher.shutdown()
+        await invalidation_bus.stop()
+        if redis is not None:
+            await redis.aclose()
+        await replica_router.stop()
+        await engine.dispose()
+        principal_cache.clear()
+        membership_cache.clear()
+        geofence.clear()
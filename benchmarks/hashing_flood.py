@@ -0,0 +1,97 @@
+"""
+Measure how a flood of password verifications affects unrelated routes.
+
+Two routes are served in-process through httpx's ASGI transport:
+``/token`` verifies a password and ``/ping`` does nothing. While ``/token``
+is flooded, ``/ping`` latency is sampled once with verification inline on
+the event loop and once through the hashing process pool.
+
+Usage:
+    python -m benchmarks.hashing_flood [--flood 4] [--pings 20]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from app.core.config import settings
+from app.core.security import password_hasher
+from benchmarks.common import percentile
+
+
+def build_app(pooled: bool) -> FastAPI:
+    app = FastAPI()
+    hashed = settings.pwd_context.hash("benchmark-password")
+
+    @app.post("/token")
+    async def token():
+        if pooled:
+            try:
+                ok = await password_hasher.verify("benchmark-password", hashed)
+            except HTTPException as e:
+                return {"status": e.status_code}
+        else:
+            ok = settings.pwd_context.verify("benchmark-password", hashed)
+        return {"ok": ok}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def run(pooled: bool, flood: int, pings: int) -> list[float]:
+    transport = httpx.ASGITransport(app=build_app(pooled))
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        done = asyncio.Event()
+
+        async def flood_loop() -> None:
+            while not done.is_set():
+                await client.post("/token")
+                await asyncio.sleep(0.01)
+
+        async def ping_loop() -> list[float]:
+            # Latency is measured from the scheduled send time so that time
+            # spent waiting for a blocked event loop is counted.
+            latencies = []
+            origin = time.perf_counter()
+            for i in range(pings):
+                scheduled = origin + i * 0.05
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/ping")
+                latencies.append((time.perf_counter() - scheduled) * 1000)
+            done.set()
+            return latencies
+
+        *_, latencies = await asyncio.gather(
+            *(flood_loop() for _ in range(flood)), ping_loop()
+        )
+    return latencies
+
+
+async def main(flood: int, pings: int) -> None:
+    password_hasher.start()
+    try:
+        for pooled in (False, True):
+            latencies = await run(pooled, flood, pings)
+            mode = "pooled" if pooled else "inline"
+            print(
+                f"{mode:>6}: /ping p50={percentile(latencies, 50):.2f}ms "
+                f"p99={percentile(latencies, 99):.2f}ms"
+            )
+    finally:
+        password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flood", type=int, default=4)
+    parser.add_argument("--pings", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.flood, args.pings))
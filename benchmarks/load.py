@@ -0,0 +1,198 @@
+"""
+Concurrent load test of the main API routes.
+
+Boots the app in-process (see benchmarks.harness) against a scratch
+database, seeds ``--users`` users and ``--businesses`` businesses, then
+drives each route with ``--concurrency`` concurrent clients and reports
+throughput and p50/p95/p99 latency. Results are compared with the stored
+baseline unless ``--save-baseline`` is given. Seeded rows are deleted
+afterwards.
+
+Usage:
+    python -m benchmarks.load --db-url postgresql+asyncpg://... \\
+        [--redis-url redis://localhost:6379/15] [--requests 1000] [--save-baseline]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+import httpx
+from sqlalchemy import delete, insert, select
+
+from app.core.config import settings
+from app.db.models import Business, User
+from app.bootstrap import create_admin_user_if_not_exists
+from app.main import app
+from app.utils.auth_utils import create_access_token
+from benchmarks.common import (
+    add_baseline_arguments,
+    add_db_url_argument,
+    check_baseline,
+    percentile,
+)
+from benchmarks.harness import running_app
+
+PREFIX = "bench-load-"
+PASSWORD = "BenchmarkPassword123!"
+
+Request = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+async def seed(users: int, businesses: int, rng: random.Random) -> dict:
+    hashed = settings.pwd_context.hash(PASSWORD)
+    async with app.state.db_session_factory() as session:
+        await create_admin_user_if_not_exists(session)
+        admin = (
+            await session.execute(
+                select(User).where(User.email == "admin@complycenter.com")
+            )
+        ).scalar_one()
+        user_rows = [
+            {
+                "id": uuid.uuid4(),
+                "full_name": f"Bench User {i}",
+                "email": f"{PREFIX}{i}@bench.complycenter.com",
+                "user_role": "cleaner",
+                "password": hashed,
+            }
+            for i in range(users)
+        ]
+        business_rows = [
+            {
+                "id": uuid.uuid4(),
+                "name": f"{PREFIX}{i}",
+                "location_latitude": rng.uniform(26.3, 30.4),
+                "location_longitude": rng.uniform(80.0, 88.2),
+                "owner_id": admin.id,
+            }
+            for i in range(businesses)
+        ]
+        for start in range(0, users, 5000):
+            await session.execute(insert(User), user_rows[start : start + 5000])
+        for start in range(0, businesses, 5000):
+            await session.execute(insert(Business), business_rows[start : start + 5000])
+        await session.commit()
+        user = (
+            await session.execute(select(User).where(User.id == user_rows[0]["id"]))
+        ).scalar_one()
+    return {
+        "admin": {"Authorization": f"Bearer {create_access_token(admin)}"},
+        "user": {"Authorization": f"Bearer {create_access_token(user)}"},
+        "business_ids": [row["id"] for row in business_rows],
+    }
+
+
+async def cleanup() -> None:
+    async with app.state.db_session_factory() as session:
+        await session.execute(delete(Business).where(Business.name.startswith(PREFIX)))
+        await session.execute(delete(User).where(User.email.startswith(PREFIX)))
+        await session.commit()
+
+
+def routes(data: dict, users: int, rng: random.Random) -> dict[str, Request]:
+    def token(c, i):
+        return c.post(
+            "/api/v1/token",
+            json={
+                "email": f"{PREFIX}{rng.randrange(users)}@bench.complycenter.com",
+                "password": PASSWORD,
+            },
+        )
+
+    def profile(c, i):
+        return c.get("/api/v1/profile", headers=data["user"])
+
+    def businesses(c, i):
+        return c.get("/api/v1/businesses", headers=data["admin"])
+
+    def business(c, i):
+        business_id = rng.choice(data["business_ids"])
+        return c.get(f"/api/v1/businesses/{business_id}")
+
+    def nearby(c, i):
+        return c.get(
+            "/api/v1/businesses/nearby",
+            params={
+                "latitude": rng.uniform(26.3, 30.4),
+                "longitude": rng.uniform(80.0, 88.2),
+                "radius_m": 5000,
+            },
+            headers=data["user"],
+        )
+
+    return {
+        "POST /token": token,
+        "GET /profile": profile,
+        "GET /businesses": businesses,
+        "GET /businesses/{id}": business,
+        "GET /businesses/nearby": nearby,
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient, request: Request, requests: int, concurrency: int
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    sent = 0
+
+    async def worker() -> None:
+        nonlocal errors, sent
+        while sent < requests:
+            i = sent
+            sent += 1
+            start = time.perf_counter()
+            response = await request(client, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "errors": errors,
+    }
+
+
+async def main(args: argparse.Namespace) -> int:
+    rng = random.Random(42)
+    results = {}
+    # Every login comes from one address; this measures login throughput,
+    # not admission control (see benchmarks.auth_flood)
+    settings.AUTH_RATE_LIMIT_ENABLED = False
+    async with running_app(args.db_url, args.redis_url) as client:
+        data = await seed(args.users, args.businesses, rng)
+        try:
+            for name, request in routes(data, args.users, rng).items():
+                count = args.token_requests if name == "POST /token" else args.requests
+                # Warm caches and prepared statements outside the measurement
+                await drive(client, request, min(count, args.concurrency), 1)
+                results[name] = await drive(client, request, count, args.concurrency)
+                print(f"{name:<24} {results[name]}")
+        finally:
+            await cleanup()
+    return check_baseline("load", results, args.save_baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    add_db_url_argument(parser)
+    parser.add_argument("--redis-url", help="Redis for the business cache (optional)")
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--businesses", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=1_000)
+    # Each login runs a deliberately slow password verification
+    parser.add_argument("--token-requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    add_baseline_arguments(parser)
+    sys.exit(asyncio.run(main(parser.parse_args())))
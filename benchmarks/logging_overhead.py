@@ -0,0 +1,121 @@
+"""
+Per-request cost of logging on the event loop.
+
+A route that logs like get_business is served in-process through httpx's
+ASGI transport under three set-ups:
+
+- ``none``: no sinks, the floor every other mode is compared with
+- ``legacy``: the previous configuration, with a synchronous console print,
+  a loguru file sink with enqueue=True and f-string messages
+- ``current``: app.core.logger's batching sink and filter, with lazy
+  messages and the route sampled at ``--sample-rate``
+
+Console output goes to /dev/null and log files to a temporary directory.
+
+Usage:
+    python -m benchmarks.logging_overhead [--requests 5000] [--format text|json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from loguru import logger
+
+from app.core.logger import BatchingSink, LogFilter
+from app.core.timing import TimingMiddleware
+
+LEGACY_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {name} | {message}"
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(TimingMiddleware, server_timing=False)
+    log = logger.bind(name="complycentre.bench")
+
+    @app.get("/legacy/{item_id}")
+    async def legacy(item_id: int):
+        log.info(f"Business {item_id} retrieved successfully")
+        return {"id": item_id}
+
+    @app.get("/current/{item_id}")
+    async def current(item_id: int):
+        log.info("Business {} retrieved successfully", item_id)
+        return {"id": item_id}
+
+    return app
+
+
+def configure(mode: str, log_dir: Path, args: argparse.Namespace):
+    logger.remove()
+    if mode == "legacy":
+        logger.add(
+            log_dir / "legacy.log",
+            rotation="5 MB",
+            format=LEGACY_FORMAT,
+            enqueue=True,
+        )
+        logger.add(lambda msg: print(msg, end=""), format=LEGACY_FORMAT)
+    elif mode == "current":
+        sink = BatchingSink(
+            log_dir / "current.log",
+            json=args.format == "json",
+            batch_size=256,
+            queue_size=10_000,
+        )
+        log_filter = LogFilter(
+            sample_rates={"/current/{item_id}": args.sample_rate},
+            skip_routes=[],
+            rate_limit=0,
+        )
+        logger.add(sink, format="{message}", filter=log_filter)
+        return sink
+    return None
+
+
+async def run(client: httpx.AsyncClient, path: str, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        await client.get(f"{path}/{i}")
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def main(args: argparse.Namespace) -> None:
+    transport = httpx.ASGITransport(app=build_app())
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            for mode, path in (
+                ("none", "/current"),
+                ("legacy", "/legacy"),
+                ("current", "/current"),
+            ):
+                sink = configure(mode, Path(tmp), args)
+                with contextlib.redirect_stdout(devnull):
+                    await run(c, path, min(args.requests, 500))  # warm-up
+                    results[mode] = await run(c, path, args.requests)
+                    drain_start = time.perf_counter()
+                    await logger.complete()
+                    if sink is not None:
+                        sink.close()
+                    drain = time.perf_counter() - drain_start
+                print(
+                    f"{mode:>8}: {results[mode]:8.1f} us/request "
+                    f"(+{results[mode] - results['none']:.1f} us logging, "
+                    f"{drain * 1000:.0f}ms to drain)"
+                )
+    logger.remove()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    asyncio.run(main(parser.parse_args()))
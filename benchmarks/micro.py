@@ -0,0 +1,99 @@
+"""
+Micro-benchmarks for the CPU-bound work on the request path.
+
+Times token creation, JWT decoding, password verification and BusinessBase
+validation in a tight loop, reporting the best of ``--repeat`` rounds as
+microseconds per operation. Results are compared with the stored baseline
+unless ``--save-baseline`` is given. Needs no database.
+
+Usage:
+    python -m benchmarks.micro [--repeat 5] [--save-baseline]
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from collections.abc import Callable
+
+import jwt
+import orjson
+
+from app.core.config import settings
+from app.core.security import _verify
+from app.db.models import User
+from app.schemas.business import BusinessBase
+from app.utils.auth_utils import create_access_token
+from benchmarks.common import add_baseline_arguments, check_baseline
+
+
+def measure(fn: Callable[[], object], number: int, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return {
+        "us_per_op": round(best * 1_000_000, 2),
+        "ops_per_second": round(1 / best, 1),
+    }
+
+
+def cases() -> dict[str, tuple[Callable[[], object], int]]:
+    user = User(
+        id=uuid.uuid4(),
+        full_name="Bench User",
+        email="bench@bench.test",
+        user_role="cleaner",
+    )
+    token = create_access_token(user)
+    secret = settings.SECRET_KEY.get_secret_value()
+    hashed = settings.pwd_context.hash("benchmark-password")
+    business = {
+        "name": "Bench Business",
+        "location": {"latitude": 27.7172, "longitude": 85.324},
+        "email": "bench@bench.test",
+        "phone_number": "+977-1-5555555",
+        "display_picture": "ab" * 32,
+        "owner_id": str(uuid.uuid4()),
+    }
+    business_json = orjson.dumps(business)
+
+    return {
+        "create_access_token": (lambda: create_access_token(user), 2_000),
+        "jwt_decode": (
+            lambda: jwt.decode(token, secret, algorithms=[settings.ALGORITHM]),
+            2_000,
+        ),
+        "password_verify": (
+            lambda: _verify(
+                settings.PASSWORD_HASHING_ALGORITHM, "benchmark-password", hashed
+            ),
+            3,
+        ),
+        "business_validate": (lambda: BusinessBase.model_validate(business), 10_000),
+        "business_validate_json": (
+            lambda: BusinessBase.model_validate_json(business_json),
+            10_000,
+        ),
+        "business_dump_json": (
+            lambda: BusinessBase.model_validate(business).model_dump_json(),
+            10_000,
+        ),
+    }
+
+
+def main(args: argparse.Namespace) -> int:
+    results = {}
+    for name, (fn, number) in cases().items():
+        results[name] = measure(fn, number, args.repeat)
+        print(f"{name:<24} {results[name]['us_per_op']:>12.2f} us/op")
+    return check_baseline("micro", results, args.save_baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    add_baseline_arguments(parser)
+    sys.exit(main(parser.parse_args()))
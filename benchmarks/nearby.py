@@ -0,0 +1,112 @@
+"""
+Compare the indexed nearby-business search with a naive full-table scan.
+
+Seeds ``--rows`` businesses scattered over a region, runs the same radius
+queries through find_nearby_businesses and through a haversine filter over
+every row, checks both return the same businesses and reports latency.
+Seeded rows are deleted afterwards.
+
+Usage:
+    python -m benchmarks.nearby --db-url postgresql+asyncpg://... [--rows 50000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.db.base import BaseModel
+from app.db.models import Business
+from app.services.geo_services import find_nearby_businesses, haversine_m
+from benchmarks.common import add_db_url_argument, summarize
+
+# Roughly Nepal
+REGION = ((26.3, 30.4), (80.0, 88.2))
+PREFIX = "bench-nearby-"
+
+
+async def seed(session: AsyncSession, rows: int, rng: random.Random) -> None:
+    (lat_low, lat_high), (lon_low, lon_high) = REGION
+    batch = []
+    for i in range(rows):
+        batch.append(
+            {
+                "id": uuid.uuid4(),
+                "name": f"{PREFIX}{i}",
+                "location_latitude": rng.uniform(lat_low, lat_high),
+                "location_longitude": rng.uniform(lon_low, lon_high),
+            }
+        )
+        if len(batch) == 5000:
+            await session.execute(insert(Business), batch)
+            batch = []
+    if batch:
+        await session.execute(insert(Business), batch)
+    await session.commit()
+    await session.execute(text("ANALYZE businesses"))
+
+
+async def naive_nearby(session, latitude, longitude, radius_m, limit):
+    distance = haversine_m(
+        latitude, longitude, Business.location_latitude, Business.location_longitude
+    ).label("distance_m")
+    result = await session.execute(
+        select(Business.id, distance)
+        .where(distance <= radius_m)
+        .order_by(distance)
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def main(db_url: str, rows: int, queries: int, radius_m: float) -> None:
+    rng = random.Random(42)
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+
+    async with AsyncSession(engine) as session:
+        await seed(session, rows, rng)
+        try:
+            (lat_low, lat_high), (lon_low, lon_high) = REGION
+            points = [
+                (rng.uniform(lat_low, lat_high), rng.uniform(lon_low, lon_high))
+                for _ in range(queries)
+            ]
+            timings = {"indexed": [], "naive": []}
+            for latitude, longitude in points:
+                start = time.perf_counter()
+                indexed = await find_nearby_businesses(
+                    session, latitude, longitude, radius_m, 50
+                )
+                timings["indexed"].append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                naive = await naive_nearby(session, latitude, longitude, radius_m, 50)
+                timings["naive"].append((time.perf_counter() - start) * 1000)
+
+                assert [r.id for r in indexed] == [r.id for r in naive]
+
+            print(f"{rows} businesses, {queries} queries, radius {radius_m:.0f}m")
+            for name, samples in timings.items():
+                print(f"{name:>8}: {summarize(samples)}")
+        finally:
+            await session.execute(
+                delete(Business).where(Business.name.startswith(PREFIX))
+            )
+            await session.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    add_db_url_argument(parser)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius-m", type=float, default=5_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.rows, args.queries, args.radius_m))
@@ -0,0 +1,203 @@
+"""
+Measure how long each request keeps a pooled database connection.
+
+Serves the read routes in-process through httpx's ASGI transport and
+records every checkout-to-checkin interval on the engine's pool. Each
+route mix runs twice: with the application's sessions, and with dependency
+overrides that restore the previous behaviour (user lookup on the request's
+session, held until the route returns, and an unconditional commit).
+
+Usage:
+    python -m benchmarks.pool_hold --db-url postgresql+asyncpg://... [--requests 500]
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+
+import httpx
+import jwt
+from fastapi import Depends
+from sqlalchemy import delete, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.db.base import BaseModel
+from app.db.dependencies import (
+    get_db_session,
+    get_read_session,
+    get_read_session_factory,
+)
+from app.db.engine import build_engine
+from app.db.models import Business
+from app.db.replica import replica_router
+from app.bootstrap import create_admin_user_if_not_exists
+from app.main import app
+from app.services.auth_services import get_active_user
+from app.services.business_cache import business_cache
+from app.services.principal_cache import principal_cache
+from app.utils.auth_utils import create_access_token
+from app.utils.users import get_current_user, oauth2_scheme
+from benchmarks.common import add_db_url_argument, summarize
+
+PREFIX = "bench-pool-"
+
+
+async def legacy_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    session = request.app.state.db_session_factory()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def legacy_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: AsyncSession = Depends(legacy_db_session),
+):
+    principal = principal_cache.get(principal_cache.digest(token))
+    if principal is not None:
+        return principal.to_user()
+    payload = jwt.decode(
+        token, settings.SECRET_KEY.get_secret_value(), algorithms=[settings.ALGORITHM]
+    )
+    user = await get_active_user(payload["email"], session)
+    principal_cache.put(principal_cache.digest(token), user, payload["exp"])
+    return user
+
+
+def legacy_session_factory(request: Request) -> async_sessionmaker:
+    return request.app.state.db_session_factory
+
+
+LEGACY_OVERRIDES = {
+    get_db_session: legacy_db_session,
+    get_read_session: legacy_db_session,
+    get_read_session_factory: legacy_session_factory,
+    get_current_user: legacy_current_user,
+}
+
+
+class HoldTimer:
+    """Checkout-to-checkin time of every pooled connection."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.samples: list[float] = []
+        self._started: dict[int, float] = {}
+
+    def _checkout(self, dbapi_conn, record, proxy):
+        self._started[id(record)] = time.perf_counter()
+
+    def _checkin(self, dbapi_conn, record):
+        started = self._started.pop(id(record), None)
+        if started is not None:
+            self.samples.append((time.perf_counter() - started) * 1000)
+
+    def __enter__(self):
+        event.listen(self.pool, "checkout", self._checkout)
+        event.listen(self.pool, "checkin", self._checkin)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.pool, "checkout", self._checkout)
+        event.remove(self.pool, "checkin", self._checkin)
+
+
+async def run(client, headers, business_id, requests, concurrency, cold_auth):
+    paths = [
+        "/api/v1/profile",
+        f"/api/v1/businesses/{business_id}",
+        "/api/v1/businesses",
+        "/api/v1/businesses/nearby?latitude=27.7&longitude=85.3&radius_m=5000",
+    ]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            if cold_auth:
+                principal_cache.clear()
+            response = await client.get(paths[i % len(paths)], headers=headers)
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start
+
+
+async def main(db_url: str, requests: int, concurrency: int, cold_auth: bool):
+    engine = build_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+    app.state.db_engine = engine
+    app.state.db_session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    app.state.db_read_session_factory = async_sessionmaker(
+        engine.execution_options(postgresql_readonly=True), expire_on_commit=False
+    )
+    replica_router.start(app.state.db_read_session_factory, None)
+
+    async with app.state.db_session_factory() as session:
+        await create_admin_user_if_not_exists(session)
+        admin = await get_active_user("admin@complycenter.com", session)
+        result = await session.execute(
+            insert(Business).returning(Business.id),
+            [
+                {
+                    "name": f"{PREFIX}{i}",
+                    "location_latitude": 27.7 + i / 1000,
+                    "location_longitude": 85.3,
+                    "owner_id": admin.id,
+                }
+                for i in range(100)
+            ],
+        )
+        business_id = result.scalars().first()
+        await session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(admin)}"}
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            for name, overrides in (("legacy", LEGACY_OVERRIDES), ("current", {})):
+                app.dependency_overrides = overrides
+                principal_cache.clear()
+                business_cache._local.clear()
+                with HoldTimer(engine.sync_engine.pool) as timer:
+                    elapsed = await run(
+                        c, headers, business_id, requests, concurrency, cold_auth
+                    )
+                print(
+                    f"{name:>8}: {requests} requests in {elapsed:.2f}s, "
+                    f"{len(timer.samples)} checkouts, "
+                    f"{sum(timer.samples) / requests:.2f}ms held per request"
+                )
+                print(f"{'hold':>8}: {summarize(timer.samples)}")
+    finally:
+        app.dependency_overrides = {}
+        async with app.state.db_session_factory() as session:
+            await session.execute(
+                delete(Business).where(Business.name.startswith(PREFIX))
+            )
+            await session.commit()
+        await replica_router.stop()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    add_db_url_argument(parser)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--cold-auth",
+        action="store_true",
+        help="Clear the principal cache before every request",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.requests, args.concurrency, args.cold_auth))
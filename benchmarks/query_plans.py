@@ -0,0 +1,217 @@
+"""
+Query-plan regression harness.
+
+Recreates the schema in a scratch database, seeds it at a realistic scale,
+then runs ``EXPLAIN (ANALYZE, BUFFERS)`` on the query behind each handler.
+Exits non-zero if any plan sequentially scans a table it should reach
+through an index, or exceeds its planner-cost or execution-time budget.
+
+The target database's tables are dropped and recreated, so never point it
+at real data.
+
+Usage:
+    python -m benchmarks.query_plans --db-url postgresql+asyncpg://... [--businesses 50000]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.db.base import BaseModel
+from app.db.models import Business, User, UserBusiness
+from app.services.geo_services import bounding_box_filter
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    statement: object
+    max_cost: float
+    max_ms: float
+    # Tables that must never be read with a Seq Scan by this query
+    indexed_tables: tuple[str, ...]
+
+
+SEED_SQL = """
+INSERT INTO users (id, full_name, email, user_role, password, is_active, created_at, updated_at)
+SELECT gen_random_uuid(), 'User ' || i, 'user' || i || '@bench.test',
+       CASE WHEN i % 20 = 0 THEN 'admin' ELSE 'cleaner' END,
+       'x', i % 10 <> 0, now(), now()
+FROM generate_series(1, :users) AS i;
+
+INSERT INTO businesses (id, name, location_latitude, location_longitude, owner_id, created_at, updated_at)
+SELECT gen_random_uuid(), 'Business ' || i, 26.3 + random() * 4.1, 80.0 + random() * 8.2,
+       owners.id, now() - (i || ' seconds')::interval, now()
+FROM generate_series(1, :businesses) AS i
+JOIN LATERAL (
+    SELECT id FROM users WHERE user_role = 'admin' OFFSET i % (:users / 20) LIMIT 1
+) AS owners ON true;
+
+INSERT INTO user_business_association (user_id, business_id)
+SELECT DISTINCT u.id, b.id
+FROM (SELECT id, row_number() OVER () AS n FROM users) AS u
+JOIN (SELECT id, row_number() OVER () AS n FROM businesses) AS b
+  ON b.n % :users = u.n % :users;
+"""
+
+
+async def seed(conn: AsyncConnection, users: int, businesses: int) -> None:
+    await conn.run_sync(BaseModel.metadata.drop_all)
+    await conn.run_sync(BaseModel.metadata.create_all)
+    for statement in SEED_SQL.split(";"):
+        if statement.strip():
+            await conn.execute(
+                text(statement), {"users": users, "businesses": businesses}
+            )
+    for table in ("users", "businesses", "user_business_association"):
+        await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def sample_ids(conn: AsyncConnection) -> dict:
+    owner = (
+        await conn.execute(
+            select(Business.owner_id)
+            .where(Business.owner_id.is_not(None))
+            .order_by(Business.owner_id)
+            .limit(1)
+        )
+    ).scalar_one()
+    business = (
+        await conn.execute(
+            select(Business.id, Business.created_at)
+            .where(Business.owner_id == owner)
+            .order_by(Business.created_at, Business.id)
+            .offset(50)
+            .limit(1)
+        )
+    ).one()
+    email = (
+        await conn.execute(select(User.email).where(User.is_active).limit(1))
+    ).scalar_one()
+    return {"owner": owner, "business": business, "email": email}
+
+
+def plan_checks(ids: dict) -> list[PlanCheck]:
+    owner, business, email = ids["owner"], ids["business"], ids["email"]
+    return [
+        PlanCheck(
+            "get_active_user",
+            select(User).where(User.email == email, User.is_active.is_(True)),
+            max_cost=20,
+            max_ms=5,
+            indexed_tables=("users",),
+        ),
+        PlanCheck(
+            "get_business",
+            select(Business).where(Business.id == business.id),
+            max_cost=20,
+            max_ms=5,
+            indexed_tables=("businesses",),
+        ),
+        PlanCheck(
+            "get_all_businesses (first page)",
+            select(Business.__table__)
+            .where(Business.owner_id == owner)
+            .order_by(Business.created_at, Business.id)
+            .limit(51),
+            max_cost=300,
+            max_ms=10,
+            indexed_tables=("businesses",),
+        ),
+        PlanCheck(
+            "get_all_businesses (next page)",
+            select(Business.__table__)
+            .where(Business.owner_id == owner)
+            .where(
+                tuple_(Business.created_at, Business.id)
+                > (business.created_at, business.id)
+            )
+            .order_by(Business.created_at, Business.id)
+            .limit(51),
+            max_cost=300,
+            max_ms=10,
+            indexed_tables=("businesses",),
+        ),
+        PlanCheck(
+            "business members (reverse association lookup)",
+            select(UserBusiness.user_id).where(UserBusiness.business_id == business.id),
+            max_cost=20,
+            max_ms=5,
+            indexed_tables=("user_business_association",),
+        ),
+        PlanCheck(
+            "get_nearby_businesses (5 km)",
+            select(Business.id).where(bounding_box_filter(27.7, 85.3, 5_000)),
+            max_cost=2_000,
+            max_ms=20,
+            indexed_tables=("businesses",),
+        ),
+    ]
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+async def explain(conn: AsyncConnection, check: PlanCheck) -> list[str]:
+    sql = str(
+        check.statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"))
+    raw = result.scalar_one()
+    report = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    plan = report["Plan"]
+
+    failures = []
+    for node in _walk(plan):
+        relation = node.get("Relation Name")
+        if node["Node Type"] == "Seq Scan" and relation in check.indexed_tables:
+            failures.append(f"Seq Scan on {relation}")
+    if plan["Total Cost"] > check.max_cost:
+        failures.append(f"cost {plan['Total Cost']:.0f} > {check.max_cost:.0f}")
+    if report["Execution Time"] > check.max_ms:
+        failures.append(f"{report['Execution Time']:.2f}ms > {check.max_ms}ms")
+
+    status = "FAIL" if failures else "ok"
+    nodes = ", ".join(
+        sorted({n["Node Type"] for n in _walk(plan) if "Scan" in n["Node Type"]})
+    )
+    print(
+        f"[{status:>4}] {check.name}: cost={plan['Total Cost']:.1f} "
+        f"time={report['Execution Time']:.2f}ms shared_hit="
+        f"{plan.get('Shared Hit Blocks', 0)} read={plan.get('Shared Read Blocks', 0)}"
+        f" scans=[{nodes}]"
+    )
+    for failure in failures:
+        print(f"       {failure}")
+    return failures
+
+
+async def main(db_url: str, users: int, businesses: int) -> int:
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await seed(conn, users, businesses)
+    async with engine.connect() as conn:
+        ids = await sample_ids(conn)
+        failures = [f for check in plan_checks(ids) for f in await explain(conn, check)]
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url", required=True, help="Scratch database URL")
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--businesses", type=int, default=50_000)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.db_url, args.users, args.businesses)))
@@ -0,0 +1,189 @@
+"""
+Throughput of the production launcher (app.serve) from one worker to many.
+
+Seeds ``--businesses`` businesses, then for each count in ``--workers``
+starts ``python -m app.serve`` on ``--port`` against the same database and
+drives ``GET /businesses/{id}`` over real sockets for ``--duration``
+seconds from ``--client-processes`` processes with ``--concurrency``
+connections in total. Reports requests per second, p50/p99 latency and
+the speedup over one worker. Results are compared with the stored baseline
+unless ``--save-baseline`` is given.
+
+The clients share the machine with the server, so leave them enough CPUs:
+scaling cannot show past ``CPUs - client processes`` workers.
+
+Usage:
+    python -m benchmarks.scaling --db-url postgresql+asyncpg://user:pw@host/db \\
+        [--redis-url redis://localhost:6379/15] [--workers 1 2 4] [--save-baseline]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import make_url
+
+from app.serve import available_cpus
+from benchmarks.common import (
+    add_baseline_arguments,
+    add_db_url_argument,
+    check_baseline,
+    percentile,
+)
+from benchmarks.harness import running_app
+from benchmarks.load import cleanup, seed
+
+
+def server_env(args: argparse.Namespace) -> dict[str, str]:
+    url = make_url(args.db_url)
+    env = {
+        **os.environ,
+        "POSTGRES_HOST": url.host or "localhost",
+        "POSTGRES_PORT": str(url.port or 5432),
+        "POSTGRES_USER": url.username or "postgres",
+        "POSTGRES_PASSWORD": url.password or "",
+        "POSTGRES_DB": url.database or "postgres",
+        "POSTGRES_SSL": "false",
+        "BOOTSTRAP_ON_STARTUP": "false",
+        "PASSWORD_HASHING_WARMUP": "false",
+        # A worker replaced mid-run would be measured restarting
+        "SERVER_MAX_REQUESTS": "0",
+        "LOG_LEVEL": "WARNING",
+    }
+    if args.redis_url:
+        redis = urlsplit(args.redis_url)
+        env["REDIS_HOST"] = redis.hostname or "localhost"
+        env["REDIS_PORT"] = str(redis.port or 6379)
+        env["REDIS_DB"] = redis.path.lstrip("/") or "0"
+    return env
+
+
+def start_server(workers: int, args: argparse.Namespace) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "app.serve",
+            "--workers",
+            str(workers),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(args.port),
+        ],
+        env=server_env(args),
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"app.serve exited with {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/health").status_code == 200:
+                # The first worker is up; give the others time to finish
+                # their own startup
+                time.sleep(args.settle)
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("app.serve did not become ready")
+
+
+async def _drive(
+    port: int, paths: list[str], connections: int, duration: float
+) -> list[float]:
+    latencies: list[float] = []
+    rng = random.Random()
+    limits = httpx.Limits(max_connections=connections)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", limits=limits
+    ) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(rng.choice(paths))
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(worker() for _ in range(connections)))
+    return latencies
+
+
+def drive(job: tuple[int, list[str], int, float]) -> list[float]:
+    return asyncio.run(_drive(*job))
+
+
+def measure(paths: list[str], args: argparse.Namespace) -> dict:
+    processes = args.client_processes
+    per_process = max(1, args.concurrency // processes)
+    job = (args.port, paths, per_process, args.duration)
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        # Warm caches, connections and statements outside the measurement
+        pool.map(drive, [(args.port, paths, per_process, 1.0)] * processes)
+        runs = pool.map(drive, [job] * processes)
+    latencies = [latency for run in runs for latency in run]
+    return {
+        "rps": round(len(latencies) / args.duration, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def seed_businesses(args: argparse.Namespace) -> list[str]:
+    async with running_app(args.db_url):
+        data = await seed(1, args.businesses, random.Random(42))
+    return [f"/api/v1/businesses/{business_id}" for business_id in data["business_ids"]]
+
+
+async def remove_businesses(args: argparse.Namespace) -> None:
+    async with running_app(args.db_url, create_schema=False):
+        await cleanup()
+
+
+def main(args: argparse.Namespace) -> int:
+    paths = asyncio.run(seed_businesses(args))
+    results = {}
+    try:
+        for workers in args.workers:
+            server = start_server(workers, args)
+            try:
+                results[f"workers_{workers}"] = measure(paths, args)
+            finally:
+                server.terminate()
+                server.wait(timeout=60)
+            result = results[f"workers_{workers}"]
+            speedup = result["rps"] / results[f"workers_{args.workers[0]}"]["rps"]
+            print(f"{workers:>3} workers {result}  x{speedup:.2f}")
+    finally:
+        asyncio.run(remove_businesses(args))
+    return check_baseline("scaling", results, args.save_baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    add_db_url_argument(parser)
+    parser.add_argument("--redis-url", help="Redis for the servers (optional)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, max(1, available_cpus() - 2)}),
+    )
+    parser.add_argument("--businesses", type=int, default=1_000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--settle", type=float, default=3.0)
+    parser.add_argument("--port", type=int, default=8765)
+    add_baseline_arguments(parser)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""
+Cost of turning Business rows into a JSON list response.
+
+For lists of 1k and 10k rows (``--sizes``), times:
+
+- ``legacy``: the previous get_all_businesses path. Each row is validated
+  into BusinessBase and the page dumped for the cache. The payload is then
+  validated again, validated once more as the route's response_model,
+  passed through jsonable_encoder and encoded by the stdlib json module.
+- ``adapter``: one validation through a precompiled list[BusinessBase]
+  TypeAdapter, dumped by pydantic-core
+- ``encoded``: app.services.business_encoder with an empty cache (rows
+  mapped straight to dicts and encoded by orjson)
+- ``encoded_cached``: the same with every row's bytes already cached
+
+Rows carry asyncpg's UUID type, as they do when read from the database.
+All four produce the same JSON document (checked before timing). Results
+are compared with the stored baseline unless ``--save-baseline`` is given.
+
+Usage:
+    python -m benchmarks.serialization [--sizes 1000 10000] [--save-baseline]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import orjson
+from asyncpg.pgproto.pgproto import UUID as PgUUID
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.business import BusinessBase, BusinessPage
+from app.services.business_encoder import BusinessEncoder
+from benchmarks.common import add_baseline_arguments, check_baseline
+
+business_list = TypeAdapter(list[BusinessBase])
+
+
+def make_rows(count: int, rng: random.Random) -> list[SimpleNamespace]:
+    owner_id = PgUUID(str(uuid.uuid4()))
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            id=PgUUID(str(uuid.UUID(int=rng.getrandbits(128)))),
+            name=f"Business {i}",
+            location_latitude=rng.uniform(26.3, 30.4),
+            location_longitude=rng.uniform(80.0, 88.2),
+            email=f"business{i}@complycenter.com",
+            phone_number="+977-1-5555555",
+            display_picture=None,
+            owner_id=owner_id,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def legacy(rows: list) -> bytes:
+    payload = BusinessPage(
+        items=[BusinessBase.model_validate(row) for row in rows]
+    ).model_dump_json()
+    items = BusinessPage.model_validate_json(payload).items
+    validated = business_list.validate_python(items)
+    return json.dumps(
+        jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def adapter(rows: list) -> bytes:
+    return business_list.dump_json(business_list.validate_python(rows))
+
+
+def measure(fn: Callable[[], bytes], repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return {"ms": round(best * 1000, 2)}
+
+
+def main(args: argparse.Namespace) -> int:
+    rng = random.Random(42)
+    results = {}
+    for size in args.sizes:
+        rows = make_rows(size, rng)
+        warm = BusinessEncoder(maxsize=size, ttl=3600)
+        cases = {
+            "legacy": lambda: legacy(rows),
+            "adapter": lambda: adapter(rows),
+            "encoded": lambda: BusinessEncoder(maxsize=size, ttl=3600).encode_list(
+                rows
+            ),
+            "encoded_cached": lambda: warm.encode_list(rows),
+        }
+        expected = orjson.loads(legacy(rows))
+        for name, fn in cases.items():
+            assert orjson.loads(fn()) == expected, f"{name} output differs"
+
+        results[str(size)] = {
+            name: measure(fn, args.repeat) for name, fn in cases.items()
+        }
+        for name, result in results[str(size)].items():
+            speedup = results[str(size)]["legacy"]["ms"] / result["ms"]
+            print(f"{size:>6} {name:<16} {result['ms']:>9.2f} ms  x{speedup:.1f}")
+    return check_baseline("serialization", results, args.save_baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    add_baseline_arguments(parser)
+    sys.exit(main(parser.parse_args()))
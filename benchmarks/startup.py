@@ -0,0 +1,71 @@
+"""
+Cold-start cost of importing the API.
+
+Each run starts a fresh interpreter that imports app.main and reports the
+"import" phase from app.core.startup, along with which modules that are
+meant to load lazily were imported anyway. The medians are compared with
+the stored baseline unless ``--save-baseline`` is given. The lifespan
+phases (pool warm-up, bootstrap) need a database and are reported in the
+startup log line and on /metrics instead.
+
+Usage:
+    python -m benchmarks.startup [--runs 7] [--save-baseline]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import add_baseline_arguments, check_baseline
+
+# Only needed once a request hashes a password or handles a token
+LAZY_MODULES = ("passlib", "pytz", "jwt", "PIL")
+
+CHILD = f"""
+import json, sys
+from app.core.startup import startup_timings
+import app.main
+print(json.dumps({{
+    "import_s": startup_timings.phases["import"],
+    "eager": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once() -> dict:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], capture_output=True, text=True, check=True
+    ).stdout
+    wall = time.perf_counter() - start
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_s"] = wall
+    return result
+
+
+def main(args: argparse.Namespace) -> int:
+    runs = [run_once() for _ in range(args.runs)]
+    eager = sorted({module for run in runs for module in run["eager"]})
+    results = {
+        "import_ms": round(statistics.median(r["import_s"] for r in runs) * 1000, 1),
+        "process_ms": round(statistics.median(r["process_s"] for r in runs) * 1000, 1),
+    }
+    print(
+        f"import {results['import_ms']:.1f}ms, "
+        f"interpreter start to imported {results['process_ms']:.1f}ms "
+        f"(median of {args.runs})"
+    )
+    if eager:
+        print(f"Imported eagerly, expected to be lazy: {', '.join(eager)}")
+        return 1
+    return check_baseline("startup", results, args.save_baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=7)
+    add_baseline_arguments(parser)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+"""
+Shared fixtures.
+
+Tests using ``client`` boot the app in-process (benchmarks.harness)
+against the scratch database in ``TEST_DATABASE_URL``, whose tables are
+dropped and recreated once per session; they are skipped when it is not
+set:
+
+    TEST_DATABASE_URL=postgresql+asyncpg://user:pw@localhost/complycenter_test \\
+        python -m pytest
+"""
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import select
+
+from app.bootstrap import create_admin_user_if_not_exists
+from app.db.base import BaseModel
+from app.db.engine import build_engine
+from app.db.models import User
+from app.main import app
+from app.utils.auth_utils import create_access_token
+from benchmarks.harness import running_app
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+async def _reset_schema() -> None:
+    engine = build_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def database() -> str:
+    if TEST_DATABASE_URL is None:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    asyncio.run(_reset_schema())
+    return TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def client(database):
+    async with running_app(database) as c:
+        yield c
+
+
+@pytest.fixture
+async def admin_headers(client) -> dict:
+    async with app.state.db_session_factory() as session:
+        await create_admin_user_if_not_exists(session)
+        admin = (
+            await session.execute(
+                select(User).where(User.email == "admin@complycenter.com")
+            )
+        ).scalar_one()
+    return {"Authorization": f"Bearer {create_access_token(admin)}"}
@@ -0,0 +1,100 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.services.blob_store import blob_store
+
+pytestmark = pytest.mark.anyio
+
+BOUNDARY = "test-boundary"
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(blob_store, "root", tmp_path)
+    monkeypatch.setattr(settings, "BLOB_MAX_BYTES", 256 * 1024)
+    monkeypatch.setattr(blob_store, "max_bytes", 256 * 1024)
+
+
+def png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def multipart(data: bytes) -> bytes:
+    return (
+        (
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="image.png"\r\n'
+            "Content-Type: image/png\r\n\r\n"
+        ).encode()
+        + data
+        + f"\r\n--{BOUNDARY}--\r\n".encode()
+    )
+
+
+HEADERS = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+
+
+async def upload(client, headers, body):
+    return await client.post(
+        "/api/v1/blobs", content=body, headers={**headers, **HEADERS}
+    )
+
+
+async def test_upload_streams_the_file_part_to_the_store(client, admin_headers):
+    image = png(32, 32)
+
+    response = await upload(client, admin_headers, multipart(image))
+
+    assert response.status_code == 200, response.text
+    digest = response.json()["hash"]
+    assert blob_store.path(digest).read_bytes() == image
+
+
+async def test_upload_refuses_unsupported_types(client, admin_headers):
+    response = await upload(client, admin_headers, multipart(b"%PDF-1.7 " * 10))
+
+    assert response.status_code == 415
+
+
+async def test_upload_refuses_an_oversized_content_length(client, admin_headers):
+    body = multipart(png(32, 32) + b"\0" * (settings.BLOB_MAX_BYTES + 128 * 1024))
+
+    response = await upload(client, admin_headers, body)
+
+    assert response.status_code == 413
+
+
+async def test_upload_stops_reading_once_past_the_limit(client, admin_headers):
+    body = multipart(png(32, 32) + b"\0" * (4 * settings.BLOB_MAX_BYTES))
+    sent = 0
+
+    async def chunked():
+        # No Content-Length: the limit can only be enforced while reading
+        nonlocal sent
+        for offset in range(0, len(body), 16 * 1024):
+            sent += 16 * 1024
+            yield body[offset : offset + 16 * 1024]
+
+    response = await upload(client, admin_headers, chunked())
+
+    assert response.status_code == 413
+    assert sent < 2 * settings.BLOB_MAX_BYTES
+    assert not any(blob_store.root.glob("tmp/*"))
+
+
+async def test_decompression_bomb_thumbnails_are_refused(
+    client, admin_headers, monkeypatch
+):
+    response = await upload(client, admin_headers, multipart(png(600, 600)))
+    digest = response.json()["hash"]
+    # Twice the limit is where Pillow raises instead of warning
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 600 * 600 // 3)
+
+    response = await client.get(f"/api/v1/blobs/{digest}", params={"size": 64})
+
+    assert response.status_code == 422
@@ -0,0 +1,81 @@
+import uuid
+
+import orjson
+import pytest
+
+from app.services.business_import import InvalidRecord, iter_records
+
+pytestmark = pytest.mark.anyio
+
+
+async def records(body: bytes, chunk_size: int = 7, **kwargs) -> list:
+    async def chunks():
+        for offset in range(0, len(body), chunk_size):
+            yield body[offset : offset + chunk_size]
+
+    return [record async for record in iter_records(chunks(), **kwargs)]
+
+
+def errors(result: list) -> list[int]:
+    return [i for i, record in enumerate(result) if isinstance(record, InvalidRecord)]
+
+
+async def test_quoted_line_breaks_stay_in_the_record():
+    body = b'name,email\r\n"Two\nLines",a@b.com\r\nplain,c@d.com\r\n'
+
+    assert await records(body, quoted=True) == [
+        "name,email",
+        '"Two\nLines",a@b.com',
+        "plain,c@d.com",
+    ]
+
+
+async def test_unbalanced_quote_loses_only_its_row():
+    lines = ['"broken,x@y.com'] + [f"row {i},x@y.com" for i in range(50)]
+    body = "\n".join(lines).encode() + b"\n"
+
+    result = await records(body, quoted=True, max_chars=200)
+
+    assert errors(result) == [0]
+    assert result[1:] == lines[1:]
+
+
+async def test_unbalanced_quote_at_the_end_of_the_body():
+    result = await records(b'ok,1\n"open,2\nafter,3', quoted=True)
+
+    assert result[0] == "ok,1"
+    assert errors(result) == [1]
+    assert result[2:] == ["after,3"]
+
+
+async def test_overlong_line_is_invalid():
+    body = b"first\n" + b"x" * 1000 + b"\nlast\n"
+
+    result = await records(body, chunk_size=64, max_chars=100)
+
+    assert result[0] == "first"
+    assert errors(result) == [1]
+    assert result[2:] == ["last"]
+
+
+async def test_invalid_utf8_loses_only_its_row(client, admin_headers):
+    names = [f"import-{uuid.uuid4()}" for _ in range(3)]
+    body = (
+        f"name,latitude,longitude\n{names[0]},27.7,85.3\n{names[1]},27.7,85.3\n"
+    ).encode() + f"bad,\xff\xfe,85.3\n{names[2]},27.7,85.3\n".encode("latin-1")
+
+    response = await client.post(
+        "/api/v1/businesses/import",
+        content=body,
+        headers={**admin_headers, "Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200, response.text
+    *rows, summary = [orjson.loads(line) for line in response.text.splitlines()]
+    assert sorted((row["row"], row["name"], row["status"]) for row in rows) == [
+        (1, names[0], "created"),
+        (2, names[1], "created"),
+        (3, None, "invalid"),
+        (4, names[2], "created"),
+    ]
+    assert summary["summary"]["invalid"] == 1
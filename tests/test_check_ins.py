@@ -0,0 +1,151 @@
+import asyncio
+import math
+import uuid
+from datetime import datetime, timezone
+
+import anyio
+import asyncpg
+import pytest
+from sqlalchemy import select
+
+from app.db.models import Business, CheckIn
+from app.main import app
+from app.services.check_ins import CheckInBuffer, Geofence, check_in_buffer
+from app.services.geo_services import METERS_PER_DEGREE_LAT
+
+pytestmark = pytest.mark.anyio
+
+KATHMANDU = (27.7172, 85.324)
+
+
+def coordinates(business_id, latitude: float, longitude: float) -> dict:
+    # What Geofence.load caches per business
+    lat = math.radians(latitude)
+    return {business_id: (lat, math.radians(longitude), math.cos(lat))}
+
+
+def row(business_id, latitude: float, longitude: float) -> tuple:
+    now = datetime.now(timezone.utc)
+    return (uuid.uuid4(), now, uuid.uuid4(), business_id, latitude, longitude, 5.0, now)
+
+
+def test_geofence_verify_measures_distance():
+    geofence = Geofence(maxsize=10, ttl=60, radius_m=150)
+    business_id = uuid.uuid4()
+    latitude, longitude = KATHMANDU
+    rows = [
+        row(business_id, latitude, longitude),
+        row(business_id, latitude + 100 / METERS_PER_DEGREE_LAT, longitude),
+        row(business_id, latitude + 200 / METERS_PER_DEGREE_LAT, longitude),
+        row(uuid.uuid4(), latitude, longitude),
+    ]
+
+    verified = geofence.verify(rows, coordinates(business_id, *KATHMANDU))
+
+    # The unknown business's row is dropped
+    assert [r[0] for r in verified] == [r[0] for r in rows[:3]]
+    distances = [r[-2] for r in verified]
+    assert distances[0] == pytest.approx(0, abs=0.01)
+    assert distances[1] == pytest.approx(100, rel=0.01)
+    assert distances[2] == pytest.approx(200, rel=0.01)
+    assert [r[-1] for r in verified] == [True, True, False]
+
+
+class FlakyBuffer(CheckInBuffer):
+    """Records written batches; the first ``failures`` writes raise."""
+
+    def __init__(self, failures: list[Exception], **kwargs):
+        super().__init__(Geofence(maxsize=10, ttl=60, radius_m=150), **kwargs)
+        self.failures = failures
+        self.written: list[tuple] = []
+
+    async def _ensure_partitions(self) -> None:
+        pass
+
+    async def _write(self, batch: list[tuple]) -> None:
+        if self.failures:
+            raise self.failures.pop(0)
+        self.written += batch
+
+
+def test_full_buffer_refuses_check_ins():
+    buffer = FlakyBuffer([], batch_size=10, max_size=3, flush_interval=1)
+    business_id = uuid.uuid4()
+
+    added = [buffer.add(row(business_id, *KATHMANDU)) for _ in range(4)]
+
+    assert added == [True, True, True, False]
+    assert buffer.stats["accepted"] == 3
+    assert buffer.stats["refused"] == 1
+
+
+async def test_failed_flush_keeps_its_batch_and_the_task_alive():
+    buffer = FlakyBuffer(
+        [asyncpg.InterfaceError("connection is closed"), RuntimeError("boom")],
+        batch_size=2,
+        max_size=100,
+        flush_interval=0.01,
+    )
+    business_id = uuid.uuid4()
+    rows = [row(business_id, *KATHMANDU) for _ in range(5)]
+    await buffer.start()
+    for r in rows:
+        buffer.add(r)
+
+    with anyio.fail_after(5):
+        while len(buffer.written) < len(rows):
+            await asyncio.sleep(0.01)
+    await buffer.stop()
+
+    assert buffer.written == rows
+    assert buffer.failed_flushes == 2
+    assert buffer.stats["buffered"] == 0
+
+
+async def test_check_ins_are_stored_with_their_distance(client, admin_headers):
+    name = f"check-in-business-{uuid.uuid4()}"
+    latitude, longitude = KATHMANDU
+    response = await client.post(
+        "/api/v1/businesses",
+        json={"name": name, "location": {"latitude": latitude, "longitude": longitude}},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    async with app.state.db_session_factory() as session:
+        business_id = (
+            await session.execute(select(Business.id).where(Business.name == name))
+        ).scalar_one()
+
+    response = await client.post(
+        f"/api/v1/businesses/{business_id}/check-ins",
+        json={
+            "latitude": latitude + 500 / METERS_PER_DEGREE_LAT,
+            "longitude": longitude,
+        },
+        headers=admin_headers,
+    )
+    assert response.status_code == 202, response.text
+    await check_in_buffer.flush()
+
+    async with app.state.db_session_factory() as session:
+        stored = (
+            await session.execute(
+                select(CheckIn).where(CheckIn.id == uuid.UUID(response.json()["id"]))
+            )
+        ).scalar_one()
+    assert stored.business_id == business_id
+    assert stored.distance_m == pytest.approx(500, rel=0.01)
+    assert not stored.within_geofence
+
+
+async def test_full_buffer_answers_503(client, admin_headers, monkeypatch):
+    monkeypatch.setattr(check_in_buffer, "max_size", 0)
+
+    response = await client.post(
+        f"/api/v1/businesses/{uuid.uuid4()}/check-ins",
+        json={"latitude": KATHMANDU[0], "longitude": KATHMANDU[1]},
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,271 @@
+import asyncio
+import socket
+
+import anyio
+import pytest
+from aiosmtpd.controller import Controller
+from fakeredis.aioredis import FakeRedis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.jobs import (
+    Job,
+    JobQueue,
+    JobWorker,
+    MemoryJobBackend,
+    RedisJobBackend,
+    job_queue,
+    retry_delay,
+)
+from app.db.engine import build_engine
+from app.services import email
+from app.services.email import SMTPMailer
+
+pytestmark = pytest.mark.anyio
+
+
+class Relay:
+    """
+    aiosmtpd handler: refuses recipients starting with "unknown" and answers
+    DATA with the replies queued per recipient before accepting it.
+    """
+
+    def __init__(self):
+        self.replies: dict[str, list[str]] = {}
+        self.delivered: list[str] = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("unknown"):
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        address = envelope.rcpt_tos[0]
+        replies = self.replies.get(address)
+        if replies:
+            return replies.pop(0)
+        self.delivered.append(address)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def relay(monkeypatch):
+    handler = Relay()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(
+        email,
+        "mailer",
+        SMTPMailer("127.0.0.1", controller.port, None, None, False, 5, 30),
+    )
+    yield handler
+    email.mailer.close()
+    controller.stop()
+
+
+@pytest.fixture
+def backend(monkeypatch) -> MemoryJobBackend:
+    monkeypatch.setattr(settings, "JOBS_POLL_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "JOBS_RETRY_BASE_SECONDS", 0.01)
+    backend = MemoryJobBackend(dead_letter_size=100)
+    monkeypatch.setattr(job_queue, "backend", backend)
+    return backend
+
+
+@pytest.fixture
+async def worker(backend, relay):
+    stop = asyncio.Event()
+    task = asyncio.create_task(JobWorker(job_queue, ["email"]).run(stop))
+    yield
+    stop.set()
+    await task
+
+
+async def settled(backend: MemoryJobBackend, finished: int) -> dict:
+    """Email queue stats once ``finished`` jobs are done or dead-lettered."""
+    with anyio.fail_after(10):
+        while True:
+            stats = await backend.stats("email")
+            if stats["completed"] + stats["dead_lettered"] >= finished:
+                return stats
+            await asyncio.sleep(0.02)
+
+
+def message(to: str) -> dict:
+    return {"to": to, "subject": "Test", "body": "Hello"}
+
+
+def test_retry_delay_backs_off_exponentially_with_jitter(monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_RETRY_BASE_SECONDS", 5)
+    monkeypatch.setattr(settings, "JOBS_RETRY_MAX_SECONDS", 600)
+
+    for attempts, delay in ((1, 5), (2, 10), (3, 20), (8, 600), (20, 600)):
+        for _ in range(50):
+            assert delay / 2 <= retry_delay(attempts) <= delay
+
+
+async def test_temporary_failures_are_retried(backend, relay, worker):
+    relay.replies["busy@test.com"] = ["451 4.3.0 Try again later"] * 2
+
+    await job_queue.enqueue("send_email", message("busy@test.com"))
+    stats = await settled(backend, 1)
+
+    assert relay.delivered == ["busy@test.com"]
+    assert stats["completed"] == 1
+    assert stats["retried"] == 2
+    assert stats["dead_lettered"] == 0
+
+
+async def test_retries_stop_at_max_attempts(backend, relay, worker):
+    relay.replies["down@test.com"] = ["451 4.3.0 Try again later"] * 100
+
+    await job_queue.enqueue("send_email", message("down@test.com"))
+    stats = await settled(backend, 1)
+
+    attempts = job_queue.handlers["send_email"].max_attempts
+    assert stats["retried"] == attempts - 1
+    [dead] = await backend.dead_letters("email", 10)
+    assert dead.attempts == attempts
+    assert relay.delivered == []
+
+
+async def test_5xx_replies_are_dead_lettered_without_retrying(backend, relay, worker):
+    relay.replies["full@test.com"] = ["552 5.2.2 Mailbox full"]
+
+    await job_queue.enqueue_many(
+        [
+            ("send_email", message("unknown@test.com")),
+            ("send_email", message("full@test.com")),
+            ("send_email", message("ok@test.com")),
+        ]
+    )
+    stats = await settled(backend, 3)
+
+    assert relay.delivered == ["ok@test.com"]
+    assert stats["retried"] == 0
+    assert stats["dead_lettered"] == 2
+    dead = await backend.dead_letters("email", 10)
+    assert sorted(job.payload["to"] for job in dead) == [
+        "full@test.com",
+        "unknown@test.com",
+    ]
+    assert all(job.attempts == 1 for job in dead)
+    assert all(job.error.startswith("PermanentJobError") for job in dead)
+
+
+async def test_jobs_without_a_result_are_failed():
+    queue = JobQueue()
+
+    @queue.handler("short", batch_size=3)
+    async def short(payloads: list[dict]) -> list[Exception | None]:
+        return [None]
+
+    jobs = [Job("short", {"n": n}) for n in range(3)]
+    outcome = await JobWorker(queue, ["default"])._process(jobs)
+
+    assert [job.payload["n"] for job in outcome.done] == [0]
+    assert [job.payload["n"] for job, _ in outcome.retry] == [1, 2]
+    assert all(job.error.startswith("RuntimeError") for job, _ in outcome.retry)
+
+
+@pytest.fixture
+async def session_factory(database):
+    engine = build_engine(database)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_enqueue_after_commit_waits_for_commit(backend, session_factory):
+    async with session_factory() as session:
+        await session.execute(text("SELECT 1"))
+        job_queue.enqueue_after_commit(session, "send_email", message("later@test.com"))
+        assert (await backend.stats("email"))["ready"] == 0
+        await session.commit()
+    await asyncio.gather(*job_queue._pending)
+
+    assert (await backend.stats("email"))["ready"] == 1
+
+
+async def test_enqueue_after_commit_drops_jobs_on_rollback(backend, session_factory):
+    async with session_factory() as session:
+        await session.execute(text("SELECT 1"))
+        job_queue.enqueue_after_commit(session, "send_email", message("never@test.com"))
+        await session.rollback()
+        # A later commit of the same session must not send it either
+        await session.execute(text("SELECT 1"))
+        await session.commit()
+    await asyncio.gather(*job_queue._pending)
+
+    assert (await backend.stats("email"))["ready"] == 0
+
+
+async def test_jobs_of_a_dead_worker_are_recovered():
+    backend = RedisJobBackend(
+        FakeRedis(decode_responses=True), dead_letter_size=100, heartbeat_ttl=0.1
+    )
+    await backend.push("email", [Job("send_email", {"n": n}) for n in range(3)])
+    await backend.heartbeat("crashed")
+    held = await backend.pop("email", "crashed", max_jobs=3, timeout=0.1)
+    assert len(held) == 3
+
+    # Still beating: its jobs are left alone
+    assert await backend.recover("email") == 0
+    await asyncio.sleep(0.2)
+    assert await backend.recover("email") == 3
+
+    stats = await backend.stats("email")
+    assert (stats["ready"], stats["processing"]) == (3, 0)
+    # Found through the queue's worker set, which no longer lists it
+    assert await backend._processing_keys("email") == {}
+    jobs = await backend.pop("email", "survivor", max_jobs=3, timeout=0.1)
+    assert [job.payload["n"] for job in jobs] == [0, 1, 2]
+
+
+async def test_malformed_jobs_are_dead_lettered():
+    redis = FakeRedis(decode_responses=True)
+    backend = RedisJobBackend(redis, dead_letter_size=100, heartbeat_ttl=1)
+    await backend.push("email", [Job("send_email", {"n": 0})])
+    await redis.lpush(backend._key("email", "ready"), "not json", '{"n": 1}')
+    await backend.push("email", [Job("send_email", {"n": 2})])
+
+    jobs = await backend.pop("email", "worker", max_jobs=10, timeout=0.1)
+
+    assert [job.payload["n"] for job in jobs] == [0, 2]
+    stats = await backend.stats("email")
+    assert (stats["processing"], stats["dead"], stats["dead_lettered"]) == (2, 2, 2)
+    dead = await backend.dead_letters("email", 10)
+    assert sorted(job.payload["raw"] for job in dead) == ["not json", '{"n": 1}']
+
+
+async def test_worker_survives_unexpected_errors(backend, relay, monkeypatch):
+    finish = backend.finish
+    failures = [RuntimeError("boom")]
+
+    async def flaky_finish(queue, worker_id, outcome):
+        if failures:
+            raise failures.pop()
+        await finish(queue, worker_id, outcome)
+
+    monkeypatch.setattr(backend, "finish", flaky_finish)
+    stop = asyncio.Event()
+    task = asyncio.create_task(JobWorker(job_queue, ["email"]).run(stop))
+
+    await job_queue.enqueue("send_email", message("first@test.com"))
+    with anyio.fail_after(10):
+        while failures:
+            await asyncio.sleep(0.02)
+    await job_queue.enqueue("send_email", message("second@test.com"))
+    stats = await settled(backend, 1)
+    stop.set()
+    await task
+
+    assert relay.delivered == ["first@test.com", "second@test.com"]
+    assert stats["completed"] == 1
@@ -0,0 +1,22 @@
+import pytest
+
+from app.core import logger as logging
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_dropped_records_are_on_metrics(client, monkeypatch):
+    monkeypatch.setattr(logging.log_sink, "dropped", 3)
+    monkeypatch.setattr(logging.log_filter, "sampled_out", 5)
+    monkeypatch.setattr(logging.log_filter, "rate_limited", 7)
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    name = "complycenter_log_records_dropped_total"
+    for line in (
+        f'{name}{{reason="queue_full"}} 3',
+        f'{name}{{reason="sampled_out"}} 5',
+        f'{name}{{reason="rate_limited"}} 7',
+    ):
+        assert line in response.text.splitlines()
@@ -0,0 +1,106 @@
+import uuid
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from app.core.cache import RedisHealth
+from app.core.config import settings
+from app.core.rate_limit import Bucket, LocalBuckets, RateLimiter, rate_limiter
+
+pytestmark = pytest.mark.anyio
+
+IP = Bucket(capacity=2, per_second=0.001)
+EMAIL = Bucket(capacity=1, per_second=0.001)
+GLOBAL = Bucket(capacity=10, per_second=0.001)
+
+
+def login(email: str) -> list[tuple[str, Bucket]]:
+    return [("global", GLOBAL), ("ip:1.2.3.4", IP), (f"email:{email}", EMAIL)]
+
+
+def limiter(redis: FakeRedis | None, healthy: bool = True) -> RateLimiter:
+    health = RedisHealth()
+    health.healthy = healthy
+    limiter = RateLimiter(fallback_size=100)
+    limiter.bind(redis, health)
+    return limiter
+
+
+@pytest.fixture(params=["redis", "in process"])
+def buckets(request) -> RateLimiter:
+    return limiter(FakeRedis() if request.param == "redis" else None)
+
+
+async def test_requests_are_charged_to_every_bucket_or_none(buckets):
+    first = await buckets.hit(login("a"))
+    assert first.allowed
+    assert (first.limit, first.remaining) == (1, 0)
+
+    # The empty email bucket refuses it, and the others are not charged
+    refused = await buckets.hit(login("a"))
+    assert not refused.allowed
+    assert refused.retry_after_ms > 0
+
+    assert (await buckets.hit(login("b"))).allowed
+    # Now the IP bucket is empty, whatever the email
+    refused = await buckets.hit(login("c"))
+    assert not refused.allowed
+    assert (refused.limit, refused.remaining) == (2, 0)
+
+    shared = await buckets.hit([("global", GLOBAL)])
+    assert shared.allowed
+    assert shared.remaining == GLOBAL.capacity - 3
+    assert buckets.stats["rejected"] == 2
+
+
+async def test_lua_buckets_refill_and_expire():
+    redis = FakeRedis(decode_responses=True)
+    buckets = limiter(redis)
+    fast = Bucket(capacity=1, per_second=1000)
+
+    assert (await buckets.hit([("fast", fast)])).allowed
+    state = await redis.hgetall(RateLimiter.PREFIX + "fast")
+    assert float(state["tokens"]) == pytest.approx(0)
+    assert 0 < await redis.pttl(RateLimiter.PREFIX + "fast") <= 1001
+    assert buckets.stats["fallback_hits"] == 0
+
+
+async def test_unhealthy_redis_falls_back_to_local_buckets():
+    redis = FakeRedis(decode_responses=True)
+    buckets = limiter(redis, healthy=False)
+
+    assert (await buckets.hit(login("a"))).allowed
+    assert not (await buckets.hit(login("a"))).allowed
+
+    assert buckets.stats == {"rejected": 1, "fallback_hits": 2}
+    assert await redis.keys("*") == []
+
+
+async def test_failing_redis_falls_back_to_local_buckets():
+    buckets = limiter(FakeRedis(connected=False))
+
+    assert (await buckets.hit(login("a"))).allowed
+    assert not (await buckets.hit(login("a"))).allowed
+
+    assert buckets.stats == {"rejected": 1, "fallback_hits": 2}
+
+
+async def test_auth_over_the_limit_gets_429(client, admin_headers, monkeypatch):
+    # Fresh buckets, so earlier sign-ins from this address do not count
+    monkeypatch.setattr(rate_limiter, "_local", LocalBuckets(100))
+    monkeypatch.setattr(rate_limiter, "_script", None)
+    credentials = {"email": "admin@complycenter.com", "password": "AdminPassword123!"}
+    burst = settings.AUTH_RATE_LIMIT_EMAIL_BURST
+
+    for remaining in range(burst - 1, -1, -1):
+        response = await client.post("/api/v1/token", json=credentials)
+        assert response.status_code == 200, response.text
+        assert response.headers["X-RateLimit-Limit"] == str(burst)
+        assert response.headers["X-RateLimit-Remaining"] == str(remaining)
+
+    response = await client.post("/api/v1/token", json=credentials)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.headers["X-RateLimit-Limit"] == str(burst)
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+    assert int(response.headers["X-RateLimit-Reset"]) >= 1
@@ -0,0 +1,99 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.core.security import password_hasher
+from app.db.models import Business
+from app.db.utils import count_queries
+from app.main import app
+from app.services.business_cache import business_cache
+from app.services.membership_cache import membership_cache
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_batch_invite_larger_than_hashing_queue(client, admin_headers):
+    count = password_hasher.max_pending + 6
+    users = [
+        {
+            "full_name": f"Batch User {i}",
+            "email": f"batch-{i}@test.complycenter.com",
+            "user_role": "cleaner",
+        }
+        for i in range(count)
+    ]
+
+    response = await client.post(
+        "/api/v1/users/batch", json=users, headers=admin_headers
+    )
+
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert [result["status"] for result in results] == ["created"] * count
+    assert password_hasher.rejected == 0
+
+
+async def test_profile_revalidation_is_one_statement(client, admin_headers):
+    profile = await client.get("/api/v1/profile", headers=admin_headers)
+    user_id = profile.json()["id"]
+    location = {"latitude": 27.7172, "longitude": 85.324}
+    names = [f"profile-business-{uuid.uuid4()}" for _ in range(3)]
+    for name in names:
+        response = await client.post(
+            "/api/v1/businesses",
+            json={"name": name, "location": location},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200, response.text
+    async with app.state.db_session_factory() as session:
+        business_ids = (
+            await session.execute(select(Business.id).where(Business.name.in_(names)))
+        ).scalars()
+        members = [
+            f"/api/v1/businesses/{business_id}/members/{user_id}"
+            for business_id in business_ids
+        ]
+    for path in members:
+        response = await client.put(path, headers=admin_headers)
+        assert response.status_code == 204, response.text
+
+    async def get_profile(etag: str):
+        return await client.get(
+            "/api/v1/profile", headers={**admin_headers, "If-None-Match": etag}
+        )
+
+    response = await get_profile(profile.headers["ETag"])
+    assert response.status_code == 200
+    assert sorted(b["name"] for b in response.json()["businesses"]) == sorted(names)
+    etag = response.headers["ETag"]
+
+    # Cold business cache: still one statement, however many businesses
+    business_cache.clear()
+    membership_cache.clear()
+    with count_queries(app.state.db_engine) as statements:
+        response = await get_profile(etag)
+    assert response.status_code == 304
+    assert len(statements) == 1, statements
+
+    # Renaming a business changes the profile
+    renamed = f"{names[0]}-renamed"
+    business_id = members[0].split("/")[4]
+    response = await client.put(
+        f"/api/v1/businesses/{business_id}",
+        json={"name": renamed, "location": location},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200, response.text
+    response = await get_profile(etag)
+    assert response.status_code == 200
+    assert renamed in [b["name"] for b in response.json()["businesses"]]
+    etag = response.headers["ETag"]
+
+    # And so does removing an assignment
+    for path in members:
+        response = await client.delete(path, headers=admin_headers)
+        assert response.status_code == 204, response.text
+    response = await get_profile(etag)
+    assert response.status_code == 200
+    assert response.json()["businesses"] == []